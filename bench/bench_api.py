@@ -0,0 +1,149 @@
+"""
+bench/bench_api.py
+Load test of `python -m scraper serve`: requests/s and latency per endpoint.
+
+    python -m bench.bench_api [--rows 1000000] [--clients 50] [--requests 3000] [--cores 1]
+
+Needs aiohttp. The server runs in its own process, pinned to `--cores` CPUs
+(Linux), over a synthetic jobs.db; the clients share this process. Each
+endpoint gets one warm-up request, then `--requests` requests from
+`--clients` concurrent clients. The last table compares OFFSET and keyset
+pagination for a deep page directly in SQLite.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from bench.synthetic import build_db
+
+PAGE = 50
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, port, cores):
+    def pin():
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, set(range(cores)))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "scraper", "--db", db_path, "serve", "--port", str(port)],
+        preexec_fn=pin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("server did not start")
+
+
+async def load(session, base, path, requests, clients, etag=None):
+    """(requests/s, p50 ms, status counts) for `requests` GETs of path(i)."""
+    latencies, statuses = [], {}
+    limit = asyncio.Semaphore(clients)
+    headers = {"If-None-Match": etag} if etag else {}
+
+    async def one(i):
+        async with limit:
+            started = time.perf_counter()
+            async with session.get(base + path(i), headers=headers) as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return requests / elapsed, latencies[len(latencies) // 2] * 1000, statuses
+
+
+async def run_load(base, rows, requests, clients):
+    deep = rows // 10  # 90% of the way down the newest-first listing
+    cases = [
+        (f"`/jobs?limit={PAGE}`", lambda i: f"/jobs?limit={PAGE}", False),
+        (f"`/jobs?limit={PAGE}` with `If-None-Match` (304)", lambda i: f"/jobs?limit={PAGE}", True),
+        (f"`/jobs?after=<deep>&limit={PAGE}` (cache misses)", lambda i: f"/jobs?after={deep + i}&limit={PAGE}", False),
+        ("`/jobs/{source}/{key}`", lambda i: f"/jobs/indeed/{(i * 194) % rows:08x}", False),
+        ("`/stats`", lambda i: "/stats", False),
+    ]
+    results = []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=clients)) as session:
+        for label, path, revalidate in cases:
+            async with session.get(base + path(requests)) as response:  # warm up, outside the timed range
+                await response.read()
+                etag = response.headers.get("ETag") if revalidate else None
+            results.append((label, *await load(session, base, path, requests, clients, etag)))
+    return results
+
+
+def deep_page_ms(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    offset = rows * 9 // 10
+    after = conn.execute("SELECT id FROM postings ORDER BY id DESC LIMIT 1 OFFSET ?", (offset - 1,)).fetchone()[0]
+    timings = {}
+    for label, sql, params in (
+        ("OFFSET", "SELECT * FROM postings ORDER BY id DESC LIMIT ? OFFSET ?", (PAGE, offset)),
+        ("keyset", "SELECT * FROM postings WHERE id < ? ORDER BY id DESC LIMIT ?", (after, PAGE)),
+    ):
+        best = None
+        for _ in range(5):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[label] = best * 1000
+    conn.close()
+    return offset, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--cores", type=int, default=1, help="CPUs the server may use")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "jobs.db")
+        build_db(db_path, args.rows).close()
+        port = free_port()
+        server = start_server(db_path, port, args.cores)
+        try:
+            results = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.rows, args.requests, args.clients))
+        finally:
+            server.terminate()
+            server.wait()
+        offset, timings = deep_page_ms(db_path, args.rows)
+
+    print(f"{args.rows:,} postings, {args.clients} concurrent clients, server on {args.cores} core(s)\n")
+    print("| request | req/s | p50 | statuses |")
+    print("|---|---|---|---|")
+    for label, rate, p50, statuses in results:
+        print(f"| {label} | {rate:,.0f} | {p50:.0f} ms | {statuses} |")
+    print(f"\n| page at OFFSET {offset:,} | time |")
+    print("|---|---|")
+    for label, ms in timings.items():
+        print(f"| {label} | {ms:.1f} ms |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+bench/bench_delta.py
+Delta export after a cursor vs a full export, and what the change log costs bulk inserts.
+
+    python -m bench.bench_delta [--rows 1000000] [--changes 2000] [--insert-rows 200000]
+
+The delta is a mix of new, updated and deleted postings written after the
+cursor (half inserts, 40% updates, 10% deletes), exported as JSON Lines the
+way `python -m scraper changes --cursor-file` does (best of 3); the full
+export is the same call from cursor 0, once. The insert overhead compares
+500-row insert_jobs batches into a fresh jobs.db with and without the insert
+trigger.
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from bench.synthetic import build_db, synthetic_jobs
+from scraper.db import delete_postings, ensure_db, insert_jobs
+from scraper.delta import current_cursor, export_changes
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def write_delta(conn, rows, changes):
+    """Insert, update and delete `changes` postings in total."""
+    inserts, updates = changes // 2, changes * 2 // 5
+    deletes = changes - inserts - updates
+    new = [{**job, "url": f"https://example.com/new/{i}", "key": f"new{i}"}
+           for i, job in enumerate(synthetic_jobs(inserts, seed=2))]
+    insert_jobs(conn, "", new)
+    step = rows // (updates + deletes)
+    ids = list(range(1, rows + 1, step))
+    with conn:
+        conn.executemany("UPDATE postings SET title = title || ' (updated)' WHERE id = ?",
+                         [(i,) for i in ids[:updates]])
+    delete_postings(conn, ids[updates:updates + deletes])
+
+
+def insert_seconds(path, rows, log):
+    conn = ensure_db(path)
+    if not log:
+        conn.execute("DROP TRIGGER postings_log_insert")
+    jobs = list(synthetic_jobs(rows))
+    _, seconds = timed(lambda: [insert_jobs(conn, "", jobs[i:i + 500]) for i in range(0, rows, 500)])
+    conn.close()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=2000)
+    parser.add_argument("--insert-rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_db(os.path.join(tmp, "jobs.db"), args.rows)
+        cursor = current_cursor(conn)
+        write_delta(conn, args.rows, args.changes)
+        delta_rows, delta_s = 0, None
+        for _ in range(3):  # warm: the updated postings are spread over the whole table
+            (delta_rows, _), seconds = timed(lambda: export_changes(conn, io.StringIO(), since=cursor))
+            delta_s = seconds if delta_s is None else min(delta_s, seconds)
+        with open(os.path.join(tmp, "full.jsonl"), "w", encoding="utf-8") as out:
+            (full_rows, _), full_s = timed(lambda: export_changes(conn, out, since=0))
+        conn.close()
+
+        with_log = insert_seconds(os.path.join(tmp, "log.db"), args.insert_rows, log=True)
+        without_log = insert_seconds(os.path.join(tmp, "nolog.db"), args.insert_rows, log=False)
+
+    print(f"{args.rows:,} postings\n")
+    print("| | rows | time |")
+    print("|---|---|---|")
+    print(f"| delta of {args.changes:,} changes | {delta_rows:,} | {delta_s * 1000:.0f} ms |")
+    print(f"| full export | {full_rows:,} | {full_s:.1f} s |")
+    print(f"| bulk insert of {args.insert_rows:,}, change log vs none | | "
+          f"{with_log:.1f} s vs {without_log:.1f} s ({with_log / without_log:.2f}x) |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+bench/bench_dimensions.py
+Company/location names stored inline vs in the companies/locations tables.
+
+    python -m bench.bench_dimensions [--rows 300000]
+
+The flat layout is `postings` as it would be without migration 2: the same
+columns, indexes and change-log trigger, with company and location as text.
+Both sides are loaded through the same parsed parameters in 500-row batches;
+measured are insert time, file size after VACUUM and a jobs-per-company
+aggregate.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from bench.synthetic import synthetic_jobs
+from scraper.db import ensure_db, insert_jobs
+from scraper.records import NO_SALARY
+from scraper.salary import parse_salary
+
+BATCH = 500
+
+FLAT_SCHEMA = """
+CREATE TABLE postings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT, title TEXT, company TEXT, location TEXT, posted TEXT, salary TEXT,
+    url TEXT UNIQUE, snippet TEXT, scraped_at TEXT,
+    salary_currency TEXT, salary_min REAL, salary_max REAL, salary_period TEXT, job_key TEXT
+);
+CREATE INDEX idx_postings_salary_min ON postings(salary_min);
+CREATE INDEX idx_postings_salary_max ON postings(salary_max);
+CREATE INDEX idx_postings_company ON postings(company);
+CREATE INDEX idx_postings_job_key ON postings(job_key, source);
+CREATE TABLE job_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, posting_id INTEGER NOT NULL, op TEXT NOT NULL, changed_at TEXT);
+CREATE TRIGGER postings_log_insert AFTER INSERT ON postings
+BEGIN
+    INSERT INTO job_changes (posting_id, op, changed_at) VALUES (NEW.id, 'insert', NEW.scraped_at);
+END;
+"""
+FLAT_INSERT = """
+INSERT OR IGNORE INTO postings (
+    source, title, company, location, posted, salary, url, snippet, scraped_at,
+    salary_currency, salary_min, salary_max, salary_period, job_key
+) VALUES (?, ?, ?, ?, ?, ?, ?, '', ?, ?, ?, ?, ?, ?)
+"""
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def bench_flat(path, jobs):
+    conn = sqlite3.connect(path)
+    conn.executescript(FLAT_SCHEMA)
+
+    def insert():
+        for i in range(0, len(jobs), BATCH):
+            with conn:
+                conn.executemany(FLAT_INSERT, [
+                    (j["source"], j["title"], j["company"], j["location"], j["posted"], j["salary"], j["url"],
+                     j["scraped_at"], *(parse_salary(j["salary"]) or NO_SALARY), j["key"])
+                    for j in jobs[i:i + BATCH]
+                ])
+
+    insert_s = timed(insert)
+    conn.execute("VACUUM")
+    query_s = timed(lambda: conn.execute("SELECT company, count(*) FROM postings GROUP BY company").fetchall())
+    conn.close()
+    return insert_s, os.path.getsize(path), query_s
+
+
+def bench_normalized(path, jobs):
+    conn = ensure_db(path)
+
+    def insert():
+        for i in range(0, len(jobs), BATCH):
+            insert_jobs(conn, "indeed", jobs[i:i + BATCH])
+
+    insert_s = timed(insert)
+    conn.execute("VACUUM")
+    query_s = timed(lambda: conn.execute("""
+        SELECT c.name, s.n
+        FROM (SELECT company_id, count(*) AS n FROM postings GROUP BY company_id) s
+        JOIN companies c ON c.id = s.company_id
+    """).fetchall())
+    conn.close()
+    return insert_s, os.path.getsize(path), query_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+    jobs = list(synthetic_jobs(args.rows))
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = bench_flat(os.path.join(tmp, "flat.db"), jobs)
+        normalized = bench_normalized(os.path.join(tmp, "normalized.db"), jobs)
+    print(f"{args.rows:,} rows\n")
+    print("| | names inline | `postings` + dimensions |")
+    print("|---|---|---|")
+    print(f"| DB size after VACUUM | {flat[1] / 1e6:.1f} MB | {normalized[1] / 1e6:.1f} MB |")
+    print(f"| jobs per company | {flat[2] * 1000:.0f} ms | {normalized[2] * 1000:.0f} ms |")
+    print(f"| bulk insert, {BATCH}-row batches | {flat[0]:.1f} s | {normalized[0]:.1f} s |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bench/bench_export.py
+Parquet export vs the CSV the scrapers write: size on disk and pandas read time.
+
+    python -m bench.bench_export [--rows 300000]
+
+Needs pandas and pyarrow. Reads are timed warm (best of 3).
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from bench.synthetic import build_db
+from scraper.export import export_parquet
+
+CSV_COLUMNS = ["id", "source", "title", "company", "location", "posted", "salary", "url", "snippet", "scraped_at"]
+
+
+def best_of(fn, runs=3):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, csv_path, out = (os.path.join(tmp, name) for name in ("jobs.db", "jobs.csv", "exports"))
+        conn = build_db(db_path, args.rows)
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(conn.execute(f"SELECT {', '.join(CSV_COLUMNS)} FROM jobs"))
+        conn.close()
+
+        started = time.perf_counter()
+        exported, _ = export_parquet(db_path, out)
+        export_s = time.perf_counter() - started
+        started = time.perf_counter()
+        export_parquet(db_path, out)
+        incremental_s = time.perf_counter() - started
+
+        two = ["title", "company"]
+        csv_s = best_of(lambda: pd.read_csv(csv_path))
+        csv_two_s = best_of(lambda: pd.read_csv(csv_path, usecols=two))
+        parquet_s = best_of(lambda: pd.read_parquet(out))
+        parquet_two_s = best_of(lambda: pd.read_parquet(out, columns=two))
+
+        print(f"{args.rows:,} rows\n")
+        print("| | size on disk | `read_*` time | 2 columns only |")
+        print("|---|---|---|---|")
+        print(f"| CSV (`pd.read_csv`) | {os.path.getsize(csv_path) / 1e6:.0f} MB | {csv_s:.2f} s | {csv_two_s:.2f} s |")
+        print(f"| Parquet (`pd.read_parquet`) | {tree_size(out) / 1e6:.1f} MB | {parquet_s:.2f} s | {parquet_two_s:.3f} s |")
+        print(f"\nexport of {exported:,} rows: {export_s:.1f} s; incremental run with nothing new: {incremental_s * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+bench/bench_fingerprints.py
+Pages parsed vs skipped as unchanged over three sharded runs on the same jobs.db.
+
+    python -m bench.bench_fingerprints [--queries 6] [--pages 3] [--workers 2]
+
+bench/fake_fetcher.py serves every query PAGE_SIZE jobs per page, a page
+load costs 0.05 s and parsing it 0.2 s. The second run sees the same
+results; before the third, one new job is posted at the top of every query,
+which shifts every page. "page time" is the time workers spent on pages
+(the shards' seconds, summed), without spawning and the politeness delay.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from functools import partial
+
+from bench.fake_fetcher import PAGE_SIZE, FakeFetcher
+from scraper.scheduler import QuerySpec
+from scraper.sinks import build_sinks
+from scraper.workers import run_sharded
+
+
+def board(query, location, new=0, pages=3):
+    """`new` jobs posted on top of the query's results since the first run."""
+    return [f"{query}-{i}" for i in range(-new, pages * PAGE_SIZE - new)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--queries", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["DOWNLOAD_DELAY"] = "0"  # read by the spawned workers
+
+    specs = [QuerySpec("indeed", f"query{i}", "Remote") for i in range(args.queries)]
+    runs = [("first run", 0), ("same results again", 0), ("one new job per query", 1)]
+    print(f"{args.queries} queries × {args.pages} pages, {args.workers} workers\n")
+    print("| run | pages parsed | unchanged | skipped | page time |")
+    print("|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "jobs.db")
+        for label, new in runs:
+            fetcher = partial(FakeFetcher, board=partial(board, new=new, pages=args.pages), load=0.05, parse=0.2)
+            stats = run_sharded(
+                specs, workers=args.workers, pages=args.pages, sinks=build_sinks("sqlite", db_path),
+                queue_path=os.path.join(tmp, "queue.db"), fetcher_cls=fetcher, db_path=db_path,
+            )
+            print(f"| {label} | {stats['done']} | {stats['unchanged']} | {stats['skipped']} | {stats['page_seconds']:.1f} s |")
+
+
+if __name__ == "__main__":
+    main()
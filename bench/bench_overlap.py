@@ -0,0 +1,64 @@
+"""
+bench/bench_overlap.py
+Pages fetched and unique jobs per page over repeated runs of an overlapping query matrix.
+
+    python -m bench.bench_overlap [--runs 3] [--pages 4] [--workers 2]
+
+Three queries × two locations, PAGE_SIZE jobs per page: "python" and
+"python developer" return the same jobs, and every search returns the same
+jobs in both locations, so only 2 of the 6 combinations are worth crawling
+in full. The runs share one jobs.db, where `query_overlap` keeps each
+combination's unique ratio for the next run. The fetcher is
+bench/fake_fetcher.py; fingerprints are ignored (--refresh) so every run
+fetches what the overlap plan gives it.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from functools import partial
+
+from bench.fake_fetcher import FakeFetcher
+from scraper.scheduler import QuerySpec
+from scraper.sinks import build_sinks
+from scraper.workers import run_sharded
+
+QUERIES = ["python", "python developer", "golang"]
+LOCATIONS = ["Remote", "New York, NY"]
+SAME_JOBS = {"python developer": "python"}
+
+
+def overlapping_board(query, location, jobs=40):
+    group = SAME_JOBS.get(query, query)
+    return [f"{group}-{i}" for i in range(jobs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["DOWNLOAD_DELAY"] = "0"  # read by the spawned workers
+
+    specs = [QuerySpec("indeed", query, location) for query in QUERIES for location in LOCATIONS]
+    board = partial(overlapping_board, jobs=args.pages * 10)
+    fetcher = partial(FakeFetcher, board=board, load=0.01, parse=0.01)
+    print(f"{len(QUERIES)} queries × {len(LOCATIONS)} locations × {args.pages} pages, {args.workers} workers\n")
+    print("| run | pages fetched | unique jobs | unique jobs per page |")
+    print("|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "jobs.db")
+        for run in range(1, args.runs + 1):
+            stats = run_sharded(
+                specs, workers=args.workers, pages=args.pages, sinks=build_sinks("sqlite", db_path),
+                queue_path=os.path.join(tmp, "queue.db"), fetcher_cls=fetcher, db_path=db_path, refresh=True,
+            )
+            fetched = stats["done"] + stats["unchanged"]
+            print(f"| {run} | {fetched} | {stats['unique']} | {stats['unique_per_page']:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+bench/bench_records.py
+Old job dicts vs JobRecord: memory, construction and the conversions sinks use.
+
+    python -m bench.bench_records [--rows 1000000]
+
+Cards are built from fresh str objects, the way JSON comes back from the
+browser. Memory is what stays allocated while every job is held (tracemalloc,
+strings included). The pickle row is the worker -> parent hop of
+`crawl --workers`: jobs are pickled in batches and held by the parent.
+"""
+
+import argparse
+import csv
+import gc
+import io
+import pickle
+import time
+import tracemalloc
+from datetime import datetime
+
+from scraper.records import NO_SALARY, JobRecord, row_getter
+from scraper.salary import parse_salary
+
+LOCATIONS = ["New York, NY", "Remote", "Austin, TX", "San Francisco, CA", "Anywhere in the World"]
+SALARIES = ["$120,000 - $150,000 a year", "Not disclosed", "$45 an hour", "$"]
+POSTED = datetime.now().strftime("%Y-%m-%d")
+SINK_FIELDS = ("source", "title", "company", "location", "posted", "salary", "url")
+INDEED_FIELDS = ["title", "company", "location", "posted", "salary", "url", "fetched_at"]
+BATCH = 500
+
+
+def cards(rows):
+    for i in range(rows):
+        # (x + "#")[:-1]: a new string object per card, not the shared literal
+        yield i, "Acme " + str(i % 2000), (LOCATIONS[i % 5] + "#")[:-1], (SALARIES[i % 4] + "#")[:-1]
+
+
+def as_dict(i, company, location, salary):
+    return {
+        "source": "indeed", "key": f"jk{i:08x}", "title": "Senior C++ Engineer", "company": company,
+        "location": location, "salary": salary, "posted": POSTED, "url": f"https://www.indeed.com/viewjob?jk={i:08x}",
+    }
+
+
+def as_record(i, company, location, salary):
+    return JobRecord(
+        source="indeed", key=f"jk{i:08x}", title="Senior C++ Engineer", company=company,
+        location=location, salary=salary, posted=POSTED, url=f"https://www.indeed.com/viewjob?jk={i:08x}",
+    )
+
+
+class Dimension:
+    def __init__(self):
+        self.ids = {}
+
+    def id_for(self, name):
+        return self.ids.setdefault(name, len(self.ids) + 1)
+
+
+def dict_params(job, now, companies, locations):
+    """What insert_jobs built from a dict before JobRecord."""
+    salary = job.get("salary") or "Not disclosed"
+    return (
+        "indeed", job.get("title"), companies.id_for(job.get("company")), locations.id_for(job.get("location")),
+        job.get("posted") or "", salary, job["url"], (job.get("snippet") or "")[:2000],
+        now, *(parse_salary(salary) or NO_SALARY), job.get("key") or None,
+    )
+
+
+def record_params(job, now, companies, locations):
+    return job.db_params("indeed", now, companies, locations)
+
+
+def held_bytes(make):
+    gc.collect()
+    tracemalloc.start()
+    jobs = make()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return jobs, size
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def through_pickle(jobs):
+    """Jobs as the parent holds them after BATCH-sized pickled hops."""
+    out = []
+    for i in range(0, len(jobs), BATCH):
+        out.extend(pickle.loads(pickle.dumps(jobs[i:i + BATCH])))
+    return out
+
+
+def measure(rows, build, params, indeed_row, indeed_writer, sink_row, sink_writer):
+    jobs, memory = held_bytes(lambda: [build(*card) for card in cards(rows)])
+    raw = list(cards(rows))
+    results = {
+        "memory": memory / rows,
+        "construction": timed(lambda: [build(*card) for card in raw]),
+    }
+    del raw
+    now = datetime.utcnow().isoformat()
+    companies, locations = Dimension(), Dimension()
+    results["db params"] = timed(lambda: [params(job, now, companies, locations) for job in jobs])
+    write = indeed_writer(io.StringIO())
+    results["indeed csv"] = timed(lambda: [write(indeed_row(job)) for job in jobs])
+    write = sink_writer(io.StringIO())
+    results["csv sink"] = timed(lambda: [write(sink_row(job)) for job in jobs])
+    results["pickle"] = timed(lambda: through_pickle(jobs))
+    del jobs
+    _, pickled = held_bytes(lambda: through_pickle([build(*card) for card in cards(rows)]))
+    results["pickled memory"] = pickled / rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    def fetched_at():
+        return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+    def indeed_dict(job):
+        return {**job, "url": f"https://www.indeed.com/viewjob?jk={job['key']}", "fetched_at": fetched_at()}
+
+    fields = row_getter(tuple(INDEED_FIELDS[:-2]))
+
+    def indeed_record(job):
+        return (*fields(job), f"https://www.indeed.com/viewjob?jk={job.key}", fetched_at())
+
+    old = measure(
+        args.rows, as_dict, dict_params,
+        indeed_dict, lambda out: csv.DictWriter(out, fieldnames=INDEED_FIELDS, extrasaction="ignore").writerow,
+        lambda job: job, lambda out: csv.DictWriter(out, fieldnames=SINK_FIELDS, extrasaction="ignore").writerow,
+    )
+    new = measure(
+        args.rows, as_record, record_params,
+        indeed_record, lambda out: csv.writer(out).writerow,
+        row_getter(SINK_FIELDS), lambda out: csv.writer(out).writerow,
+    )
+
+    print(f"{args.rows:,} Indeed-shaped jobs\n")
+    print("| | dict | JobRecord |")
+    print("|---|---|---|")
+    for label, key, unit in (
+        ("memory per job (incl. strings)", "memory", "B"),
+        ("memory per job after pickled worker batches", "pickled memory", "B"),
+        ("construction", "construction", "s"),
+        ("DB parameter tuples", "db params", "s"),
+        ("CSV sink rows", "csv sink", "s"),
+        ("Indeed CSV rows (normalized url + fetched_at)", "indeed csv", "s"),
+        (f"pickle round trip, {BATCH}-job batches", "pickle", "s"),
+    ):
+        fmt = "{:.0f} B" if unit == "B" else "{:.2f} s"
+        print(f"| {label} | {fmt.format(old[key])} | {fmt.format(new[key])} |")
+
+
+if __name__ == "__main__":
+    main()
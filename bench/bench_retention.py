@@ -0,0 +1,72 @@
+"""
+bench/bench_retention.py
+`maintain` on a year of postings: archive size, run time, jobs.db size and scan time.
+
+    python -m bench.bench_retention [--rows 600000]
+
+Synthetic postings (bench/synthetic.py) with a 240-character snippet, scraped
+evenly over the 365 days up to yesterday. Two runs: `--older-than 90`, which
+also pays for the one-time VACUUM into auto_vacuum=INCREMENTAL, then
+`--older-than 60` as a later, regular run. The scan is a LIKE over every
+title, which reads the whole table.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from bench.synthetic import build_db
+from scraper.retention import db_size, run_maintenance
+
+SNIPPET = "lorem ipsum " * 20
+SCAN = "SELECT count(*) FROM postings WHERE title LIKE '%Engineer 42%'"
+MB = 1024 * 1024
+
+
+def scan_ms(conn, runs=3):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(SCAN).fetchone()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=600_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = (date.today() - timedelta(days=365)).isoformat()
+        conn = build_db(os.path.join(tmp, "jobs.db"), args.rows, days=365, start=start, snippet=SNIPPET)
+        size, _ = db_size(conn)
+        print(f"{args.rows:,} postings over 12 months ({size / MB:.0f} MB)\n")
+        print("| run | archived | time | jobs.db | reclaimed | title LIKE scan |")
+        print("|---|---|---|---|---|---|")
+        print(f"| before | | | {size / MB:.0f} MB | | {scan_ms(conn):.0f} ms |")
+        archived_bytes = 0
+        for days, label in ((90, "`--older-than 90` (incl. one-time VACUUM)"), (60, "`--older-than 60`")):
+            archive_dir = os.path.join(tmp, "archive")
+            started = time.perf_counter()
+            stats = run_maintenance(conn, older_than_days=days, archive_dir=archive_dir)
+            elapsed = time.perf_counter() - started
+            written = tree_size(archive_dir) - archived_bytes
+            archived_bytes += written
+            print(
+                f"| {label} | {stats['archived'] / 1000:.0f}k rows → {stats['files']} files, {written / MB:.1f} MB "
+                f"| {elapsed:.1f} s | {stats['size_after_mb']:.0f} MB | {stats['reclaimed_mb']:.0f} MB "
+                f"| {scan_ms(conn):.0f} ms |"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+bench/bench_salary.py
+Salary parsing throughput, the migration-1 backfill and the salary_max index.
+
+    python -m bench.bench_salary [--rows 1000000]
+
+The corpus repeats a few tens of thousands of distinct salary strings, the
+way scraped salaries do.
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+from scraper.db import JOBS_SCHEMA, _add_salary_columns
+from scraper.salary import normalize_batch, parse_salary
+
+FORMATS = [
+    "${lo:,} - ${hi:,} a year",
+    "${lo:,} a year",
+    "From ${h} an hour",
+    "${h} - ${h2} an hour",
+    "Up to ${lo:,} a year",
+    "${k}k - ${k2}k",
+    "€{lo:,} a year",
+    "£{m:,} a month",
+    "${lo:,} or more USD",
+]
+NO_AMOUNT = ["Not disclosed", "$", "hour", "year", "Competitive"]
+
+
+def salary_corpus(rows, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(rows):
+        if rng.random() < 0.3:
+            out.append(rng.choice(NO_AMOUNT))
+            continue
+        lo = rng.randrange(40, 250) * 1000
+        h = rng.randrange(15, 90)
+        k = rng.randrange(40, 250)
+        out.append(rng.choice(FORMATS).format(
+            lo=lo, hi=lo + rng.randrange(5, 60) * 1000, h=h, h2=h + rng.randrange(5, 30),
+            k=k, k2=k + rng.randrange(5, 60), m=rng.randrange(20, 120) * 100,
+        ))
+    return out
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def best_of(fn, runs=5):
+    return min(timed(fn)[0] for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    corpus = salary_corpus(args.rows)
+    distinct = sorted(set(corpus))
+
+    uncached_s, _ = timed(lambda: [parse_salary.__wrapped__(text) for text in distinct])
+    parse_salary.cache_clear()
+    batch_s, _ = timed(lambda: normalize_batch(corpus))
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute(JOBS_SCHEMA)
+    with conn:
+        conn.executemany(
+            "INSERT INTO jobs (title, salary, url) VALUES ('Engineer', ?, ?)",
+            ((salary, f"https://example.com/jobs/{i}") for i, salary in enumerate(corpus)),
+        )
+    parse_salary.cache_clear()
+    backfill_s, _ = timed(lambda: _add_salary_columns(conn))
+    conn.commit()
+
+    query = "SELECT title, salary FROM jobs {} WHERE salary_max >= ?"
+    results = []
+    for threshold in (250_000, 150_000):
+        matches = len(conn.execute(query.format(""), (threshold,)).fetchall())
+        indexed_s = best_of(lambda: conn.execute(query.format(""), (threshold,)).fetchall())
+        scan_s = best_of(lambda: conn.execute(query.format("NOT INDEXED"), (threshold,)).fetchall())
+        results.append((threshold, matches, indexed_s, scan_s))
+
+    print(f"{args.rows:,} salary strings, {len(distinct):,} distinct\n")
+    print("| | |")
+    print("|---|---|")
+    print(f"| uncached parse | {len(distinct) / uncached_s / 1000:.0f}k strings/s |")
+    print(f"| `normalize_batch` over every string (cold cache) | {batch_s:.2f} s |")
+    print(f"| migration 1 backfill of {args.rows:,} rows | {backfill_s:.1f} s |")
+    for threshold, matches, indexed_s, scan_s in results:
+        print(f"| `salary_max >= {threshold}` ({matches:,} rows): index / full scan "
+              f"| {indexed_s * 1000:.0f} ms / {scan_s * 1000:.0f} ms |")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+bench/bench_workers.py
+Pages per second of `crawl --workers` for 1, 2 and 4 workers, with simulated page latency.
+
+    python -m bench.bench_workers [--queries 8] [--pages 5] [--load 0.25] [--parse 0.25]
+
+Every query returns its own jobs (no overlap, no unchanged pages), so each
+shard is loaded and parsed once. The fetcher is bench/fake_fetcher.py: the
+latency is awaited, not computed, which is what a browser page costs a
+worker. Times include spawning the workers and writing to a fresh jobs.db.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from functools import partial
+
+from bench.fake_fetcher import FakeFetcher
+from scraper.scheduler import QuerySpec
+from scraper.sinks import build_sinks
+from scraper.workers import run_sharded
+
+WORKER_COUNTS = (1, 2, 4)
+
+
+def distinct_jobs(query, location):
+    return [f"{query}-{i:03d}" for i in range(200)]
+
+
+def crawl(tmp, workers, specs, pages, fetcher):
+    db_path = os.path.join(tmp, f"jobs-{workers}.db")
+    return run_sharded(
+        specs, workers=workers, pages=pages, sinks=build_sinks("sqlite", db_path),
+        queue_path=os.path.join(tmp, f"queue-{workers}.db"), fetcher_cls=fetcher, db_path=db_path,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--load", type=float, default=0.25, help="seconds per page load")
+    parser.add_argument("--parse", type=float, default=0.25, help="seconds to parse a page's cards")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["DOWNLOAD_DELAY"] = "0"  # read by the spawned workers; the politeness delay is not measured here
+
+    specs = [QuerySpec("indeed", f"query{i}", "Remote") for i in range(args.queries)]
+    fetcher = partial(FakeFetcher, board=distinct_jobs, load=args.load, parse=args.parse)
+    print(f"{len(specs) * args.pages} pages ({args.queries} queries × {args.pages}), "
+          f"{args.load + args.parse:.2f} s per page\n")
+    print("| workers | seconds | pages/s | jobs written | speedup |")
+    print("|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = None
+        for workers in WORKER_COUNTS:
+            stats = crawl(tmp, workers, specs, args.pages, fetcher)
+            rate = stats["done"] / stats["seconds"]
+            base = base or rate
+            print(f"| {workers} | {stats['seconds']:.1f} | {rate:.2f} | {stats['written']:,} | {rate / base:.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
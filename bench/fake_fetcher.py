@@ -0,0 +1,56 @@
+"""
+bench/fake_fetcher.py
+A stand-in for workers.BrowserFetcher: listing pages from a simulated board, no browser.
+
+    run_sharded(specs, fetcher_cls=partial(FakeFetcher, board=board, load=0.25), ...)
+
+`board(query, location)` returns the job keys of a search in result order,
+PAGE_SIZE per page; it must be a module-level function (or a partial of one)
+because workers are spawned and get the fetcher class pickled. Loading a page
+costs `load` seconds and parsing the cards a shard claimed costs `parse`
+seconds; both are awaited like the browser round trips they replace.
+"""
+
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+from scraper.fingerprints import fingerprint
+from scraper.records import JobRecord
+from scraper.workers import FetchedPage
+
+PAGE_SIZE = 10
+
+
+def page_keys(board, url):
+    """Job keys of the Indeed result page at `url`."""
+    params = parse_qs(urlsplit(url).query)
+    start = int(params.get("start", ["0"])[0])
+    keys = board(params.get("q", [""])[0], params.get("l", [""])[0])
+    return keys[start:start + PAGE_SIZE]
+
+
+class FakeFetcher:
+    def __init__(self, headless=True, board=None, load=0.05, parse=0.2):
+        self.board, self.load, self.parse = board, load, parse
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def fetch(self, source, url, previous=None, claim=None):
+        await asyncio.sleep(self.load)
+        keys = page_keys(self.board, url)
+        value = fingerprint(keys)
+        if previous is not None and value == previous:
+            return FetchedPage(value, len(keys), None)
+        owned = set(keys) if claim is None else claim(keys)
+        jobs = [
+            JobRecord(source.name, key, title=f"Job {key}", company="Acme", location="Remote",
+                      url=f"https://www.indeed.com/viewjob?jk={key}")
+            for key in keys if key in owned
+        ]
+        if jobs:
+            await asyncio.sleep(self.parse)
+        return FetchedPage(value, len(keys), jobs)
@@ -0,0 +1,70 @@
+"""
+bench/synthetic.py
+Deterministic synthetic postings shared by the benchmarks in this directory.
+
+Every benchmark is run from the repository root as a module, e.g.
+
+    python -m bench.bench_dimensions --rows 300000
+
+and prints a markdown table; README figures come from these runs.
+"""
+
+import random
+from datetime import date, timedelta
+
+START = "2025-10-01"  # first scrape date
+SOURCES = ["indeed", "weworkremotely"]
+SALARIES = [
+    "Not disclosed", "$120,000 - $150,000 a year", "$45 - $60 an hour", "$100,000 or more USD",
+    "From $25 an hour", "€60,000 a year", "$", "year",
+]
+
+
+def companies(count=3000):
+    return [f"Company Number {i} Technologies Inc" for i in range(count)]
+
+
+def locations(count=300):
+    return ["Remote", "New York, NY", "San Francisco, CA", "Anywhere in the World"] + [
+        f"City {i}, ST" for i in range(count - 4)
+    ]
+
+
+def synthetic_jobs(rows, days=30, seed=1, company_count=3000, location_count=300, start=START, snippet=""):
+    """Yield `rows` job dicts spread over `days` scrape dates (`start` onwards)."""
+    rng = random.Random(seed)
+    names, places = companies(company_count), locations(location_count)
+    for i in range(rows):
+        day = (date.fromisoformat(start) + timedelta(days=i * days // rows)).isoformat()
+        yield {
+            "source": SOURCES[i % len(SOURCES)],
+            "key": f"{i:08x}",
+            "title": f"Senior Engineer {rng.randint(1, 500)}",
+            "company": rng.choice(names),
+            "location": rng.choice(places),
+            "posted": day,
+            "salary": rng.choice(SALARIES),
+            "url": f"https://example.com/jobs/{i}",
+            "snippet": snippet,
+            "scraped_at": f"{day}T02:00:00",
+        }
+
+
+def build_db(path, rows, days=30, batch=5000, start=START, snippet=""):
+    """jobs.db at `path` holding `rows` synthetic postings, scraped_at spread over `days` days from `start`."""
+    from scraper.db import ensure_db, insert_jobs
+
+    conn = ensure_db(path)
+    jobs = synthetic_jobs(rows, days=days, start=start, snippet=snippet)
+    while True:
+        chunk = [job for _, job in zip(range(batch), jobs)]
+        if not chunk:
+            break
+        insert_jobs(conn, "", chunk)
+    # insert_jobs stamps the current time; spread the rows the way daily runs would
+    with conn:
+        conn.execute(
+            "UPDATE postings SET scraped_at = strftime('%Y-%m-%dT02:00:00', ?, printf('+%d days', (id - 1) * ? / ?))",
+            (start, days, rows),
+        )
+    return conn
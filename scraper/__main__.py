@@ -0,0 +1,5 @@
+from scraper.cli import main
+
+# guarded: spawned worker processes (scraper.workers) re-import this module
+if __name__ == "__main__":
+    main()
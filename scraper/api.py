@@ -0,0 +1,289 @@
+"""
+scraper/api.py
+Read-only HTTP API over jobs.db (aiohttp).
+
+    pip install aiohttp
+    python -m scraper serve [--host 127.0.0.1] [--port 8080]
+
+    GET /jobs                  newest first; ?source= &q= &since= &until= &min_salary= &limit= &after=
+    GET /jobs/{id}
+    GET /jobs/{source}/{key}   by the board's own id (Indeed jk, WWR slug)
+    GET /stats
+
+Pagination is keyset, not OFFSET: every page carries "next" (the last id on
+it); pass it back as ?after= and the next page starts with an index seek, so
+page 500 costs the same as page 1.
+
+Every response has an ETag derived from the data version: the change log's
+high-water mark (max job_changes.seq), which moves on any insert, update or
+delete. A client sending it back in If-None-Match gets a 304 without the query
+being run. Each connection re-reads the mark only when PRAGMA data_version says
+another connection has committed since, so polling an unchanged database costs
+one pragma.
+
+Rendered bodies are also cached per URL and data version (API_CACHE_SIZE
+entries), so clients that do not revalidate and expensive endpoints like
+/stats are served from memory until the data changes.
+
+Queries run in threads on a small pool of read-only connections
+(API_POOL_SIZE); the crawler keeps writing through its own connection. jobs.db
+is in WAL mode (set by ensure_db), so readers see the last committed data
+while a write is in progress instead of waiting for it.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from scraper.cli import readonly_uri
+from scraper.config import (
+    API_CACHE_SIZE,
+    API_HOST,
+    API_MAX_PAGE_SIZE,
+    API_PAGE_SIZE,
+    API_POOL_SIZE,
+    API_PORT,
+    DB_PATH,
+)
+
+try:
+    from aiohttp import web
+except ImportError:  # optional
+    web = None
+
+COLUMNS = [
+    "id", "source", "key", "title", "company", "location", "posted", "salary", "url", "scraped_at",
+    "salary_currency", "salary_min", "salary_max", "salary_period",
+]
+
+# postings + dimension names; the `jobs` view does not carry job_key
+SELECT_JOBS = """
+SELECT p.id, p.source, p.job_key, p.title, co.name, lo.name, p.posted, p.salary, p.url, p.scraped_at,
+       p.salary_currency, p.salary_min, p.salary_max, p.salary_period
+FROM postings p
+LEFT JOIN companies co ON co.id = p.company_id
+LEFT JOIN locations lo ON lo.id = p.location_id
+"""
+
+
+# -------------------- Connections -------------------- #
+class ReadConnection(sqlite3.Connection):
+    """Read-only connection that remembers the data version it last saw."""
+
+    _data_version = None
+    _version = 0
+
+    def version(self):
+        data_version = self.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._version = self.execute("SELECT coalesce(max(seq), 0) FROM job_changes").fetchone()[0]
+        return self._version
+
+
+class ReadPool:
+    def __init__(self, path=DB_PATH, size=API_POOL_SIZE):
+        self._idle = asyncio.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(readonly_uri(path), uri=True, factory=ReadConnection, check_same_thread=False)
+            self._idle.put_nowait(conn)
+        self.size = size
+
+    async def run(self, fn, *args):
+        """fn(conn, *args) in a worker thread on an idle connection."""
+        conn = await self._idle.get()
+        try:
+            return await asyncio.to_thread(fn, conn, *args)
+        finally:
+            self._idle.put_nowait(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class ResponseCache:
+    """LRU of url -> (data version, JSON bytes); shared by the pool threads."""
+
+    def __init__(self, maxsize=API_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, body):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# -------------------- Queries -------------------- #
+def job_dict(row):
+    return dict(zip(COLUMNS, row))
+
+
+def list_jobs(conn, filters, after, limit):
+    where, params = [], []
+    if after is not None:
+        where.append("p.id < ?")
+        params.append(after)
+    if filters.get("source"):
+        where.append("p.source = ?")
+        params.append(filters["source"])
+    if filters.get("q"):
+        where.append("(p.title LIKE ? OR co.name LIKE ?)")
+        params += [f"%{filters['q']}%"] * 2
+    if filters.get("since"):
+        where.append("p.scraped_at >= ?")
+        params.append(filters["since"])
+    if filters.get("until"):
+        where.append("p.scraped_at < ?")
+        params.append(filters["until"])
+    if filters.get("min_salary"):
+        where.append("p.salary_max >= ?")
+        params.append(float(filters["min_salary"]))
+    sql = SELECT_JOBS + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY p.id DESC LIMIT ?"
+    rows = conn.execute(sql, (*params, limit)).fetchall()
+    return {
+        "jobs": [job_dict(row) for row in rows],
+        # a short page is the last one
+        "next": rows[-1][0] if len(rows) == limit else None,
+    }
+
+
+def get_job(conn, job_id):
+    row = conn.execute(SELECT_JOBS + " WHERE p.id = ?", (job_id,)).fetchone()
+    return job_dict(row) if row else None
+
+
+def get_job_by_key(conn, source, key):
+    row = conn.execute(
+        SELECT_JOBS + " WHERE p.job_key = ? AND p.source = ? ORDER BY p.id LIMIT 1", (key, source)
+    ).fetchone()
+    return job_dict(row) if row else None
+
+
+def job_stats(conn):
+    return {
+        "jobs": conn.execute("SELECT count(*) FROM postings").fetchone()[0],
+        "sources": {
+            source: {"jobs": count, "last_scraped_at": last}
+            for source, count, last in conn.execute(
+                "SELECT source, count(*), max(scraped_at) FROM postings GROUP BY source"
+            )
+        },
+    }
+
+
+# -------------------- HTTP -------------------- #
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+NOT_MODIFIED = object()
+NOT_FOUND = b"null"
+
+
+async def respond(request, load, *args):
+    """JSON for load(conn, *args), or 304 when the client already has this data version."""
+    if_none_match = request.headers.get("If-None-Match")
+    cache, key = request.app["cache"], request.path_qs
+
+    def work(conn):
+        version = conn.version()
+        etag = f'"{version}"'
+        if _etag_matches(if_none_match, etag):
+            return etag, NOT_MODIFIED
+        body = cache.get(key, version)
+        if body is None:
+            body = json.dumps(load(conn, *args)).encode()
+            cache.put(key, version, body)
+        return etag, body
+
+    etag, body = await request.app["pool"].run(work)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is NOT_MODIFIED:
+        return web.Response(status=304, headers=headers)
+    if body == NOT_FOUND:
+        raise web.HTTPNotFound(headers=headers)
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+def _int_param(request, name, default=None):
+    value = request.query.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an integer")
+
+
+async def jobs_handler(request):
+    limit = min(max(_int_param(request, "limit", API_PAGE_SIZE), 1), API_MAX_PAGE_SIZE)
+    after = _int_param(request, "after")
+    filters = {k: request.query.get(k) for k in ("source", "q", "since", "until", "min_salary")}
+    if filters["min_salary"]:
+        try:
+            float(filters["min_salary"])
+        except ValueError:
+            raise web.HTTPBadRequest(text="min_salary must be a number")
+    return await respond(request, list_jobs, filters, after, limit)
+
+
+async def job_handler(request):
+    try:
+        job_id = int(request.match_info["id"])
+    except ValueError:
+        raise web.HTTPNotFound()
+    return await respond(request, get_job, job_id)
+
+
+async def job_by_key_handler(request):
+    return await respond(request, get_job_by_key, request.match_info["source"], request.match_info["key"])
+
+
+async def stats_handler(request):
+    return await respond(request, job_stats)
+
+
+def create_app(db_path=DB_PATH, pool_size=API_POOL_SIZE):
+    if web is None:
+        raise SystemExit("The read API needs aiohttp: pip install aiohttp")
+    app = web.Application()
+    app["cache"] = ResponseCache()
+    app.router.add_get("/jobs", jobs_handler)
+    app.router.add_get("/jobs/{id}", job_handler)
+    app.router.add_get("/jobs/{source}/{key}", job_by_key_handler)
+    app.router.add_get("/stats", stats_handler)
+
+    async def pool_context(app):
+        app["pool"] = ReadPool(db_path, pool_size)
+        yield
+        app["pool"].close()
+
+    app.cleanup_ctx.append(pool_context)
+    return app
+
+
+def serve(db_path=DB_PATH, host=API_HOST, port=API_PORT, pool_size=API_POOL_SIZE):
+    from scraper.db import ensure_db
+
+    app = create_app(db_path, pool_size)
+    ensure_db(db_path).close()  # read-only connections cannot run migrations
+    web.run_app(app, host=host, port=port)
@@ -0,0 +1,309 @@
+"""
+scraper/cli.py
+One entry point for everything: `python -m scraper <command>`.
+
+    python -m scraper crawl [indeed weworkremotely] [--headed] [--refresh]
+    python -m scraper crawl --workers 4 --queries queries.json
+    python -m scraper export [--full]
+    python -m scraper query --search python --min-salary 120000 --format csv
+    python -m scraper stats
+    python -m scraper dedup [--dry-run]
+    python -m scraper changes --cursor-file .jobs_cursor [--format csv] [-o delta.csv]
+    python -m scraper maintain [--older-than 180] [--dry-run]
+    python -m scraper serve [--host 127.0.0.1] [--port 8080]
+
+Only the standard library and scraper.config are imported up front. Every
+command imports what it needs inside its handler, so Playwright/asyncio are
+only loaded by `crawl`, pyarrow only by `export` and aiohttp only by `serve`
+(tests/test_cli_import.py keeps it that way). `query` and `stats` open
+jobs.db read-only and exit with an error when it does not exist.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from scraper.config import (
+    API_HOST,
+    API_POOL_SIZE,
+    API_PORT,
+    ARCHIVE_DIR,
+    DB_PATH,
+    EXPORT_DIR,
+    QUERIES_FILE,
+    RETENTION_DAYS,
+    SINKS,
+)
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+QUERY_COLUMNS = ["id", "source", "title", "company", "location", "salary", "posted", "url", "scraped_at"]
+
+
+# -------------------- crawl -------------------- #
+def cmd_crawl(args):
+    import time
+
+    from scraper.sinks import build_sinks
+
+    if args.workers is not None:
+        from scraper.scheduler import load_queries
+        from scraper.workers import run_sharded
+
+        specs = [s for s in load_queries(args.queries) if not args.sources or s.source in args.sources]
+        run_sharded(
+            specs, args.workers, args.pages, build_sinks(args.sinks, args.db),
+            headless=not args.headed, db_path=args.db, refresh=args.refresh,
+        )
+        return
+
+    import asyncio
+
+    from scraper.orchestrator import run_sources
+    from scraper.sources import get_sources
+
+    sources = get_sources(args.sources)
+    started = time.monotonic()
+    asyncio.run(run_sources(
+        sources, build_sinks(args.sinks, args.db), headless=not args.headed, db_path=args.db, refresh=args.refresh,
+    ))
+    logging.info("⏱️ All sources finished in %.1fs", time.monotonic() - started)
+
+
+# -------------------- export -------------------- #
+def cmd_export(args):
+    from scraper.export import export_parquet
+
+    options = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    export_parquet(args.db, args.out, full=args.full, **options)
+
+
+# -------------------- query -------------------- #
+def readonly_uri(path):
+    """SQLite URI opening `path` read-only; quoted, so names with ?, # or % stay a path."""
+    from urllib.parse import quote
+
+    return f"file:{quote(os.path.abspath(path))}?mode=ro"
+
+
+def open_readonly(path):
+    """Read-only connection to an existing jobs.db: query/stats never create or migrate it."""
+    import sqlite3
+
+    if not os.path.exists(path):
+        sys.exit(f"{path} not found (crawl first, or pass --db)")
+    return sqlite3.connect(readonly_uri(path), uri=True)
+
+
+def read_failed(path, error):
+    sys.exit(f"{path}: {error} (an older schema is migrated by any writing command, e.g. `dedup --dry-run`)")
+
+
+def build_query(args):
+    where, params = [], []
+    if args.source:
+        where.append("source = ?")
+        params.append(args.source)
+    if args.search:
+        where.append("(title LIKE ? OR company LIKE ?)")
+        params += [f"%{args.search}%"] * 2
+    if args.company:
+        where.append("company LIKE ?")
+        params.append(f"%{args.company}%")
+    if args.location:
+        where.append("location LIKE ?")
+        params.append(f"%{args.location}%")
+    if args.min_salary is not None:
+        where.append("salary_max >= ?")
+        params.append(args.min_salary)
+    if args.since:
+        where.append("scraped_at >= ?")
+        params.append(args.since)
+    sql = f"SELECT {', '.join(QUERY_COLUMNS)} FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(args.limit)
+    return sql, params
+
+
+def cmd_query(args):
+    import sqlite3
+
+    conn = open_readonly(args.db)
+    try:
+        rows = conn.execute(*build_query(args)).fetchall()
+    except sqlite3.OperationalError as e:
+        read_failed(args.db, e)
+    finally:
+        conn.close()
+
+    if args.format == "jsonl":
+        import json
+
+        for row in rows:
+            print(json.dumps(dict(zip(QUERY_COLUMNS, row)), ensure_ascii=False))
+    elif args.format == "csv":
+        import csv
+
+        writer = csv.writer(sys.stdout)
+        writer.writerow(QUERY_COLUMNS)
+        writer.writerows(rows)
+    else:
+        for job_id, source, title, company, location, salary, *_ in rows:
+            print(f"{job_id:>7}  {source:<15} {title or ''} @ {company or '?'} ({location or '?'}) {salary or ''}")
+        print(f"{len(rows)} row(s)", file=sys.stderr)
+
+
+# -------------------- stats -------------------- #
+def cmd_stats(args):
+    import sqlite3
+
+    conn = open_readonly(args.db)
+    try:
+        print_stats(args.db, conn)
+    except sqlite3.OperationalError as e:
+        read_failed(args.db, e)
+    finally:
+        conn.close()
+
+
+def print_stats(path, conn):
+    total = conn.execute("SELECT count(*) FROM postings").fetchone()[0]
+    print(f"jobs.db: {os.path.abspath(path)} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    print(f"schema version: {conn.execute('PRAGMA user_version').fetchone()[0]}")
+    print(f"jobs: {total}")
+    for source, count, salaried, first, last in conn.execute("""
+        SELECT source, count(*), count(salary_min), min(scraped_at), max(scraped_at)
+        FROM postings GROUP BY source ORDER BY count(*) DESC
+    """):
+        print(f"  {source or '?':<15} {count:>8}  with salary {salaried:>7}  {(first or '?')[:10]} .. {(last or '?')[:10]}")
+    for table in ("companies", "locations"):
+        print(f"{table}: {conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0]}")
+
+
+# -------------------- dedup -------------------- #
+def cmd_dedup(args):
+    from scraper.db import delete_postings, ensure_db, find_duplicates
+
+    conn = ensure_db(args.db)
+    duplicates = find_duplicates(conn)
+    if args.dry_run:
+        print(f"{len(duplicates)} duplicate job(s) would be removed")
+    else:
+        print(f"🧹 Removed {delete_postings(conn, duplicates)} duplicate job(s)")
+    conn.close()
+
+
+# -------------------- changes -------------------- #
+def cmd_changes(args):
+    from scraper.db import ensure_db
+    from scraper.delta import export_changes, read_cursor, write_cursor
+
+    since = args.since if args.since is not None else read_cursor(args.cursor_file) if args.cursor_file else 0
+    conn = ensure_db(args.db)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            count, cursor = export_changes(conn, out, since, args.format)
+    else:
+        count, cursor = export_changes(conn, sys.stdout, since, args.format)
+    conn.close()
+    if args.cursor_file:
+        write_cursor(args.cursor_file, cursor)
+    logging.info("🔺 %d changed job(s) after cursor %d, new cursor %d", count, since, cursor)
+
+
+# -------------------- maintain -------------------- #
+def cmd_maintain(args):
+    from scraper.db import ensure_db
+    from scraper.retention import run_maintenance
+
+    conn = ensure_db(args.db)
+    stats = run_maintenance(conn, args.older_than, args.archive_dir, args.dry_run, vacuum=not args.no_vacuum)
+    conn.close()
+    if args.dry_run:
+        print(f"{stats['archived']} job(s) scraped before {stats['cutoff'][:10]} would be archived")
+    else:
+        print(
+            f"🗄️ Archived {stats['archived']} job(s) into {stats['files']} file(s); "
+            f"{stats['size_before_mb']} MB -> {stats['size_after_mb']} MB ({stats['reclaimed_mb']} MB reclaimed)"
+        )
+
+
+# -------------------- serve -------------------- #
+def cmd_serve(args):
+    from scraper.api import serve
+
+    serve(args.db, args.host, args.port, args.pool_size)
+
+
+# -------------------- Parser -------------------- #
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scraper", description="Job board scraper")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    crawl = commands.add_parser("crawl", help="crawl sources into the sinks")
+    crawl.add_argument("sources", nargs="*", help="source names (default: all)")
+    crawl.add_argument("--sinks", default=SINKS, help="e.g. sqlite,csv:jobs.csv (default: %(default)s)")
+    crawl.add_argument("--headed", action="store_true")
+    crawl.add_argument("--workers", type=int, nargs="?", const=0,
+                       help="shard pages over N worker processes (no value: one per CPU core)")
+    crawl.add_argument("--queries", default=QUERIES_FILE, help="queries for --workers (default: %(default)s)")
+    crawl.add_argument("--pages", type=int, help="pages per query for --workers (default: source.max_pages)")
+    crawl.add_argument("--refresh", action="store_true", help="parse every page, even ones unchanged since the last run")
+    crawl.set_defaults(func=cmd_crawl)
+
+    export = commands.add_parser("export", help="incremental Parquet export")
+    export.add_argument("--out", default=EXPORT_DIR)
+    export.add_argument("--chunk-size", type=int)
+    export.add_argument("--full", action="store_true", help="ignore the watermark and export every row")
+    export.set_defaults(func=cmd_export)
+
+    query = commands.add_parser("query", help="print matching jobs")
+    query.add_argument("--source")
+    query.add_argument("--search", help="substring of title or company")
+    query.add_argument("--company")
+    query.add_argument("--location")
+    query.add_argument("--min-salary", type=float, help="annualized")
+    query.add_argument("--since", help="scraped_at >= this ISO date")
+    query.add_argument("--limit", type=int, default=50)
+    query.add_argument("--format", choices=["table", "csv", "jsonl"], default="table")
+    query.set_defaults(func=cmd_query)
+
+    stats = commands.add_parser("stats", help="row counts per source")
+    stats.set_defaults(func=cmd_stats)
+
+    dedup = commands.add_parser("dedup", help="drop postings repeating an earlier job key")
+    dedup.add_argument("--dry-run", action="store_true")
+    dedup.set_defaults(func=cmd_dedup)
+
+    changes = commands.add_parser("changes", help="jobs added/changed/deleted after a cursor")
+    changes.add_argument("--since", type=int, help="last change seq already processed (default: 0)")
+    changes.add_argument("--cursor-file", help="read --since from this file and store the new cursor in it")
+    changes.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    changes.add_argument("-o", "--output", help="file to write (default: stdout)")
+    changes.set_defaults(func=cmd_changes)
+
+    maintain = commands.add_parser("maintain", help="archive old jobs, delete them and compact jobs.db")
+    maintain.add_argument("--older-than", type=int, default=RETENTION_DAYS, metavar="DAYS",
+                          help="archive jobs scraped more than DAYS ago (default: %(default)s)")
+    maintain.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    maintain.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    maintain.add_argument("--no-vacuum", action="store_true", help="skip incremental vacuum/analyze")
+    maintain.set_defaults(func=cmd_maintain)
+
+    serve = commands.add_parser("serve", help="read-only HTTP API over jobs.db (needs aiohttp)")
+    serve.add_argument("--host", default=API_HOST)
+    serve.add_argument("--port", type=int, default=API_PORT)
+    serve.add_argument("--pool-size", type=int, default=API_POOL_SIZE, help="read-only connections")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format=LOG_FORMAT)
+    args.func(args)
@@ -0,0 +1,100 @@
+"""
+scraper/config.py
+Shared settings for every source and runner.
+
+Everything here is plain data read from the environment so that importing it
+stays cheap (no Playwright, no DB access).
+"""
+
+import os
+
+DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.db")
+
+USER_AGENT = os.getenv(
+    "USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+PROXY_SERVER = os.getenv("PROXY_SERVER")
+
+MAX_PAGES = int(os.getenv("MAX_PAGES", "3"))
+DOWNLOAD_DELAY = float(os.getenv("DOWNLOAD_DELAY", "1.5"))
+DEFAULT_TIMEOUT = 12000  # ms
+NAVIGATION_TIMEOUT = 90000  # ms
+
+# Chromium flags shared by every scraper (stealth-ish + container friendly)
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-infobars",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--disable-features=IsolateOrigins,site-per-process",
+]
+
+# Scheduler daemon (see scraper/scheduler.py); intervals in seconds
+QUERIES_FILE = os.getenv("QUERIES_FILE", "queries.json")
+MAX_CONCURRENT_CRAWLS = int(os.getenv("MAX_CONCURRENT_CRAWLS", "2"))
+DEFAULT_INTERVAL = float(os.getenv("SCHEDULER_DEFAULT_INTERVAL", str(6 * 3600)))
+MIN_INTERVAL = float(os.getenv("SCHEDULER_MIN_INTERVAL", str(30 * 60)))
+MAX_INTERVAL = float(os.getenv("SCHEDULER_MAX_INTERVAL", str(48 * 3600)))
+TARGET_NEW_PER_RUN = int(os.getenv("SCHEDULER_TARGET_NEW", "10"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))  # +/- fraction of the interval
+
+# Company/location name -> id lookups kept in memory during ingestion
+DIMENSION_CACHE_SIZE = int(os.getenv("DIMENSION_CACHE_SIZE", "50000"))
+
+# Memory watchdog (see scraper/watchdog.py); 0 disables a limit
+RECYCLE_AFTER_NAVIGATIONS = int(os.getenv("RECYCLE_AFTER_NAVIGATIONS", "25"))
+RECYCLE_RSS_MB = int(os.getenv("RECYCLE_RSS_MB", "1200"))
+
+# Sharded crawling (see scraper/workers.py)
+WORK_QUEUE_PATH = os.getenv("WORK_QUEUE_PATH", "work_queue.db")
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "0"))  # 0 = one per CPU core
+LEASE_SECONDS = float(os.getenv("LEASE_SECONDS", "300"))
+SHARD_ATTEMPTS = int(os.getenv("SHARD_ATTEMPTS", "3"))
+# Runs in the work queue older than this are dropped even if they never finished
+WORK_QUEUE_MAX_AGE_HOURS = float(os.getenv("WORK_QUEUE_MAX_AGE_HOURS", "24"))
+# Combinations whose cards are at least this share unique get every page; fewer otherwise
+OVERLAP_FULL_RATIO = float(os.getenv("OVERLAP_FULL_RATIO", "0.5"))
+OVERLAP_DECAY = float(os.getenv("OVERLAP_DECAY", "0.5"))  # weight of the latest run in unique_ratio
+
+# Listing pages whose card keys hash as before are skipped (see scraper/fingerprints.py);
+# a fingerprint is trusted this long after the page was last parsed, 0 disables skipping.
+# Keep it above the crawl interval (daily at 02:00) and away from its multiples:
+# at 60h an unchanged page is skipped by the next two daily runs and parsed in
+# full by the third, with 12h of slack either way for runs starting late.
+PAGE_FINGERPRINT_TTL_HOURS = float(os.getenv("PAGE_FINGERPRINT_TTL_HOURS", "60"))
+
+# Parquet export root (see scraper/export.py)
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join("exports", "jobs"))
+
+# Retention (see scraper/retention.py)
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "180"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+# Read API (see scraper/api.py)
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "4"))  # read-only connections
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "200"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "256"))  # rendered responses kept per data version
+
+# Streaming sinks (see scraper/sinks.py)
+SINKS = os.getenv("SCRAPER_SINKS", "sqlite")
+SINK_BATCH_SIZE = int(os.getenv("SINK_BATCH_SIZE", "50"))
+FLUSH_INTERVAL = float(os.getenv("SINK_FLUSH_INTERVAL", "2.0"))  # seconds
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "200"))
+CSV_DEDUPE_WINDOW = int(os.getenv("CSV_DEDUPE_WINDOW", "100000"))  # recent urls a CSV sink skips
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# Injected into every context *before any page runs*
+STEALTH_SCRIPT = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+window.navigator.chrome = {runtime: {}};
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
+Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+Object.defineProperty(Notification, 'permission', {get: () => 'default'});
+"""
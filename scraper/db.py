@@ -0,0 +1,488 @@
+"""
+scraper/db.py
+SQLite helpers shared by every runner (schema, migrations, batched inserts).
+
+The base `jobs` table is created as it always was; later schema changes are
+numbered migrations tracked with PRAGMA user_version, so old jobs.db files
+(e.g. downloaded workflow artifacts) are upgraded in place on first open.
+
+Current layout: `postings` holds one row per job with integer company_id /
+location_id into `companies` / `locations`; `jobs` is a view that joins them
+back so existing queries keep working. Triggers record every insert, update
+and delete of a posting in `job_changes` for delta exports.
+"""
+
+import logging
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from functools import lru_cache
+
+from scraper.config import DB_PATH, DIMENSION_CACHE_SIZE
+from scraper.records import as_record
+from scraper.salary import normalize_batch
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    posted TEXT,
+    salary TEXT,
+    url TEXT UNIQUE,
+    snippet TEXT,
+    scraped_at TEXT
+)
+"""
+
+# Since migration 2, `jobs` is a view over `postings` + the dimension tables;
+# writers go straight to `postings` with cached dimension ids.
+INSERT_JOB = """
+INSERT OR IGNORE INTO postings (
+    source, title, company_id, location_id, posted, salary, url, snippet, scraped_at,
+    salary_currency, salary_min, salary_max, salary_period, job_key
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# -------------------- Migrations -------------------- #
+def backfill_salaries(conn, batch_size=5000):
+    """Parse jobs.salary into the numeric salary_* columns, batch_size rows at a time."""
+    last_id, updated = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, salary FROM jobs WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        parsed = normalize_batch([salary for _, salary in rows])
+        params = [(*sal, job_id) for (job_id, _), sal in zip(rows, parsed) if sal]
+        conn.executemany(
+            "UPDATE jobs SET salary_currency = ?, salary_min = ?, salary_max = ?, salary_period = ? WHERE id = ?",
+            params,
+        )
+        updated += len(params)
+        last_id = rows[-1][0]
+    return updated
+
+
+def _add_salary_columns(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for column, kind in (
+        ("salary_currency", "TEXT"),
+        ("salary_min", "REAL"),  # annualized
+        ("salary_max", "REAL"),  # annualized
+        ("salary_period", "TEXT"),  # unit the posting was quoted in
+    ):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary_min ON jobs(salary_min)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary_max ON jobs(salary_max)")
+    logging.info("Backfilled structured salary for %d rows", backfill_salaries(conn))
+
+
+NORMALIZED_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS companies (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS locations (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS postings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT,
+        title TEXT,
+        company_id INTEGER REFERENCES companies(id),
+        location_id INTEGER REFERENCES locations(id),
+        posted TEXT,
+        salary TEXT,
+        url TEXT UNIQUE,
+        snippet TEXT,
+        scraped_at TEXT,
+        salary_currency TEXT,
+        salary_min REAL,
+        salary_max REAL,
+        salary_period TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_postings_salary_min ON postings(salary_min)",
+    "CREATE INDEX IF NOT EXISTS idx_postings_salary_max ON postings(salary_max)",
+    "CREATE INDEX IF NOT EXISTS idx_postings_company ON postings(company_id)",
+]
+
+# Compatibility layer: existing `SELECT ... FROM jobs` / `INSERT INTO jobs`
+# keep working.
+JOBS_VIEW = """
+CREATE VIEW jobs AS
+SELECT p.id, p.source, p.title, c.name AS company, l.name AS location,
+       p.posted, p.salary, p.url, p.snippet, p.scraped_at,
+       p.salary_currency, p.salary_min, p.salary_max, p.salary_period,
+       p.company_id, p.location_id
+FROM postings p
+LEFT JOIN companies c ON c.id = p.company_id
+LEFT JOIN locations l ON l.id = p.location_id
+"""
+
+# As created by migration 2; it only trim()s names (replaced by migration 5)
+JOBS_INSERT_TRIGGER_V2 = """
+CREATE TRIGGER jobs_insert INSTEAD OF INSERT ON jobs
+BEGIN
+    INSERT OR IGNORE INTO companies (name) SELECT trim(NEW.company) WHERE trim(NEW.company) <> '';
+    INSERT OR IGNORE INTO locations (name) SELECT trim(NEW.location) WHERE trim(NEW.location) <> '';
+    INSERT INTO postings (
+        source, title, company_id, location_id, posted, salary, url, snippet, scraped_at,
+        salary_currency, salary_min, salary_max, salary_period
+    ) VALUES (
+        NEW.source, NEW.title,
+        (SELECT id FROM companies WHERE name = trim(NEW.company)),
+        (SELECT id FROM locations WHERE name = trim(NEW.location)),
+        NEW.posted, NEW.salary, NEW.url, NEW.snippet, NEW.scraped_at,
+        NEW.salary_currency, NEW.salary_min, NEW.salary_max, NEW.salary_period
+    );
+END
+"""
+
+
+def _normalize_dimensions(conn):
+    """Move company/location strings into dimension tables keyed by integer ids."""
+    conn.create_function("canonical_name", 1, canonical_name, deterministic=True)
+    for statement in NORMALIZED_SCHEMA:
+        conn.execute(statement)
+    for table, column in (("companies", "company"), ("locations", "location")):
+        conn.execute(
+            f"INSERT OR IGNORE INTO {table} (name) "
+            f"SELECT canonical_name({column}) FROM jobs WHERE canonical_name({column}) IS NOT NULL"
+        )
+    conn.execute("""
+        INSERT INTO postings (
+            id, source, title, company_id, location_id, posted, salary, url, snippet, scraped_at,
+            salary_currency, salary_min, salary_max, salary_period
+        )
+        SELECT j.id, j.source, j.title, c.id, l.id, j.posted, j.salary, j.url, j.snippet, j.scraped_at,
+               j.salary_currency, j.salary_min, j.salary_max, j.salary_period
+        FROM jobs j
+        LEFT JOIN companies c ON c.name = canonical_name(j.company)
+        LEFT JOIN locations l ON l.name = canonical_name(j.location)
+        ORDER BY j.id
+    """)
+    conn.execute("DROP TABLE jobs")
+    conn.execute(JOBS_VIEW)
+    conn.execute(JOBS_INSERT_TRIGGER_V2)
+
+
+LOG_UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS postings_log_update AFTER UPDATE ON postings
+BEGIN
+    INSERT INTO job_changes (posting_id, op, changed_at)
+    VALUES (NEW.id, 'update', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+END
+"""
+
+# Every write to postings leaves a row here; `seq` is the cursor delta
+# consumers resume from (see scraper/delta.py).
+CHANGE_LOG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS job_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        posting_id INTEGER NOT NULL,
+        op TEXT NOT NULL,  -- insert | update | delete
+        changed_at TEXT
+    )
+    """,
+    # No index on posting_id and no strftime() for inserts: together they
+    # doubled the cost of bulk inserts. Inserts reuse scraped_at instead.
+    """
+    CREATE TRIGGER IF NOT EXISTS postings_log_insert AFTER INSERT ON postings
+    BEGIN
+        INSERT INTO job_changes (posting_id, op, changed_at)
+        VALUES (NEW.id, 'insert', coalesce(NEW.scraped_at, strftime('%Y-%m-%dT%H:%M:%f', 'now')));
+    END
+    """,
+    LOG_UPDATE_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS postings_log_delete AFTER DELETE ON postings
+    BEGIN
+        INSERT INTO job_changes (posting_id, op, changed_at)
+        VALUES (OLD.id, 'delete', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+    END
+    """,
+]
+
+
+def _add_change_log(conn):
+    """Log writes to postings; existing rows are logged as inserts so cursor 0 means everything."""
+    for statement in CHANGE_LOG_SCHEMA:
+        conn.execute(statement)
+    conn.execute("""
+        INSERT INTO job_changes (posting_id, op, changed_at)
+        SELECT id, 'insert', coalesce(scraped_at, strftime('%Y-%m-%dT%H:%M:%f', 'now')) FROM postings ORDER BY id
+    """)
+
+
+def _add_job_keys(conn):
+    """postings.job_key: the board's own id (Indeed jk, WWR slug), indexed for lookups."""
+    conn.execute("ALTER TABLE postings ADD COLUMN job_key TEXT")
+    # a backfill is not a change of the job: keep it out of the change log
+    conn.execute("DROP TRIGGER postings_log_update")
+    conn.execute("UPDATE postings SET job_key = source_job_key(source, url)")
+    conn.execute(LOG_UPDATE_TRIGGER)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_job_key ON postings(job_key, source)")
+
+
+# As created by migration 5 (replaced by migration 6, which adds job_key)
+JOBS_INSERT_TRIGGER_V5 = """
+CREATE TRIGGER jobs_insert INSTEAD OF INSERT ON jobs
+BEGIN
+    INSERT OR IGNORE INTO companies (name)
+        SELECT canonical_name(NEW.company) WHERE canonical_name(NEW.company) IS NOT NULL;
+    INSERT OR IGNORE INTO locations (name)
+        SELECT canonical_name(NEW.location) WHERE canonical_name(NEW.location) IS NOT NULL;
+    INSERT INTO postings (
+        source, title, company_id, location_id, posted, salary, url, snippet, scraped_at,
+        salary_currency, salary_min, salary_max, salary_period
+    ) VALUES (
+        NEW.source, NEW.title,
+        (SELECT id FROM companies WHERE name = canonical_name(NEW.company)),
+        (SELECT id FROM locations WHERE name = canonical_name(NEW.location)),
+        NEW.posted, NEW.salary, NEW.url, NEW.snippet, NEW.scraped_at,
+        NEW.salary_currency, NEW.salary_min, NEW.salary_max, NEW.salary_period
+    );
+END
+"""
+
+
+# Names go through the same canonical_name() as Python writers and job_key
+# through the source's job_key() (both registered on every connection by
+# ensure_db), so both paths store the same rows.
+JOBS_INSERT_TRIGGER = """
+CREATE TRIGGER jobs_insert INSTEAD OF INSERT ON jobs
+BEGIN
+    INSERT OR IGNORE INTO companies (name)
+        SELECT canonical_name(NEW.company) WHERE canonical_name(NEW.company) IS NOT NULL;
+    INSERT OR IGNORE INTO locations (name)
+        SELECT canonical_name(NEW.location) WHERE canonical_name(NEW.location) IS NOT NULL;
+    INSERT INTO postings (
+        source, title, company_id, location_id, posted, salary, url, snippet, scraped_at,
+        salary_currency, salary_min, salary_max, salary_period, job_key
+    ) VALUES (
+        NEW.source, NEW.title,
+        (SELECT id FROM companies WHERE name = canonical_name(NEW.company)),
+        (SELECT id FROM locations WHERE name = canonical_name(NEW.location)),
+        NEW.posted, NEW.salary, NEW.url, NEW.snippet, NEW.scraped_at,
+        NEW.salary_currency, NEW.salary_min, NEW.salary_max, NEW.salary_period,
+        source_job_key(NEW.source, NEW.url)
+    );
+END
+"""
+
+
+def _replace_jobs_insert_trigger(conn, trigger=JOBS_INSERT_TRIGGER):
+    conn.execute("DROP TRIGGER IF EXISTS jobs_insert")
+    conn.execute(trigger)
+
+
+def _canonical_dimensions(conn):
+    """Merge names the old trim()-only trigger stored into their canonical_name() rows."""
+    for table, column in (("companies", "company_id"), ("locations", "location_id")):
+        conn.execute(
+            f"INSERT OR IGNORE INTO {table} (name) "
+            f"SELECT canonical_name(name) FROM {table} WHERE canonical_name(name) IS NOT NULL"
+        )
+        conn.execute(f"""
+            UPDATE postings SET {column} = (
+                SELECT canon.id FROM {table} old JOIN {table} canon ON canon.name = canonical_name(old.name)
+                WHERE old.id = postings.{column}
+            )
+            WHERE {column} IN (SELECT id FROM {table} WHERE canonical_name(name) IS NOT name)
+        """)
+        conn.execute(f"DELETE FROM {table} WHERE canonical_name(name) IS NOT name")
+    _replace_jobs_insert_trigger(conn, JOBS_INSERT_TRIGGER_V5)
+
+
+def _job_keys_everywhere(conn):
+    """Set job_key on view inserts too, and fill the rows earlier view inserts left NULL."""
+    _replace_jobs_insert_trigger(conn)
+    conn.execute("DROP TRIGGER postings_log_update")
+    conn.execute("UPDATE postings SET job_key = source_job_key(source, url) WHERE job_key IS NULL")
+    conn.execute(LOG_UPDATE_TRIGGER)
+
+
+# Position in this list + 1 is the schema version (PRAGMA user_version)
+MIGRATIONS = [
+    _add_salary_columns,
+    _normalize_dimensions,
+    _add_change_log,
+    _add_job_keys,
+    _canonical_dimensions,
+    _job_keys_everywhere,
+]
+
+
+def register_functions(conn):
+    """SQL functions the schema's triggers call; needed on every connection that writes."""
+    from scraper.sources import source_job_key
+
+    conn.create_function("canonical_name", 1, canonical_name, deterministic=True)
+    conn.create_function("source_job_key", 2, source_job_key, deterministic=True)
+
+
+def migrate(conn):
+    register_functions(conn)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            conn.execute("BEGIN")  # DDL included: a migration applies fully or not at all
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+
+def ensure_db(path=DB_PATH, check_same_thread=True):
+    conn = sqlite3.connect(path, factory=JobsConnection, check_same_thread=check_same_thread)
+    # readers (the API, `query`) keep reading while a crawl writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    register_functions(conn)
+    conn.execute(JOBS_SCHEMA)
+    conn.commit()
+    migrate(conn)
+    return conn
+
+
+# -------------------- Dimensions -------------------- #
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=DIMENSION_CACHE_SIZE)
+def canonical_name(value):
+    """Whitespace-normalized, interned company/location name ('' -> None)."""
+    if not value:
+        return None
+    name = _WHITESPACE_RE.sub(" ", value).strip()
+    return sys.intern(name) if name else None
+
+
+class DimensionCache:
+    """LRU-bounded name -> id lookups for one dimension table on one connection.
+
+    A miss costs one SELECT (plus one INSERT for a brand new name); every
+    repeat of the same company/location during ingestion is a dict hit.
+    """
+
+    def __init__(self, conn, table, maxsize=DIMENSION_CACHE_SIZE):
+        self.conn = conn
+        self.table = table
+        self.id_for_name = lru_cache(maxsize=maxsize)(self._lookup)
+
+    def _lookup(self, name):
+        row = self.conn.execute(f"SELECT id FROM {self.table} WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute(f"INSERT INTO {self.table} (name) VALUES (?)", (name,)).lastrowid
+
+    def id_for(self, value):
+        name = canonical_name(value)
+        return self.id_for_name(name) if name else None
+
+    def clear(self):
+        self.id_for_name.cache_clear()
+
+
+class JobsConnection(sqlite3.Connection):
+    """sqlite3 connection that carries its dimension caches (see ensure_db)."""
+
+    _dimensions = None
+
+    @property
+    def dimensions(self):
+        if self._dimensions is None:
+            self._dimensions = (DimensionCache(self, "companies"), DimensionCache(self, "locations"))
+        return self._dimensions
+
+
+def dimension_caches(conn):
+    """(companies, locations) caches for `conn`; plain connections get fresh ones per call."""
+    if isinstance(conn, JobsConnection):
+        return conn.dimensions
+    return DimensionCache(conn, "companies"), DimensionCache(conn, "locations")
+
+
+# -------------------- Inserts -------------------- #
+def url_exists(conn, url):
+    return conn.execute("SELECT 1 FROM postings WHERE url = ?", (url,)).fetchone() is not None
+
+
+def job_known(conn, source, url):
+    """Whether `source` already stored the job at `url`, by its job_key when it has one.
+
+    Indeed urls carry per-session params (bb=, xkcb=), so the same job comes
+    back under a new url on every visit; only urls without a key fall back to
+    url_exists().
+    """
+    from scraper.sources import source_job_key
+
+    key = source_job_key(source, url)
+    if key is None:
+        return url_exists(conn, url)
+    row = conn.execute("SELECT 1 FROM postings WHERE job_key = ? AND source = ?", (key, source)).fetchone()
+    return row is not None
+
+
+def insert_jobs(conn, source, rows):
+    """Insert a batch of JobRecords (or job dicts) in ONE transaction; duplicates (by url) are skipped.
+
+    Returns (inserted, skipped).
+    """
+    rows = [as_record(r, source) for r in rows]
+    now = datetime.utcnow().isoformat()
+    companies, locations = dimension_caches(conn)
+    try:
+        with conn:
+            params = [r.db_params(source, now, companies, locations) for r in rows if r.url]
+            inserted = conn.executemany(INSERT_JOB, params).rowcount
+    except Exception:
+        # ids of names inserted in the rolled back transaction are gone too
+        companies.clear()
+        locations.clear()
+        raise
+    skipped = len(rows) - len(params)
+    return inserted, skipped + len(params) - inserted
+
+
+# -------------------- Maintenance -------------------- #
+def find_duplicates(conn):
+    """ids of postings that repeat an earlier posting's (source, job key).
+
+    The same Indeed job shows up under several URLs (vjk=/jk=, tracking
+    params); the oldest row is kept.
+    """
+    from scraper.sources import get_sources
+
+    sources = {s.name: s for s in get_sources()}
+    first, duplicates = {}, []
+    for job_id, source, url in conn.execute("SELECT id, source, url FROM postings ORDER BY id"):
+        src = sources.get(source)
+        key = (source, src.job_key(url) if src else url)
+        if key in first:
+            duplicates.append(job_id)
+        else:
+            first[key] = job_id
+    return duplicates
+
+
+def delete_postings(conn, ids, batch_size=500):
+    with conn:
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            conn.execute(f"DELETE FROM postings WHERE id IN ({','.join('?' * len(batch))})", batch)
+    return len(ids)
+
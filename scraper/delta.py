@@ -0,0 +1,113 @@
+"""
+scraper/delta.py
+Delta exports: only the jobs added, changed or deleted after a cursor.
+
+Every write to `postings` is logged in `job_changes` (see db.py) with an
+increasing `seq`. A consumer remembers the last seq it processed (its
+high-water mark) and asks for everything after it:
+
+    python -m scraper changes --since 41200 --format jsonl > delta.jsonl
+    python -m scraper changes --cursor-file .jobs_cursor --format csv -o delta.csv
+
+With --cursor-file the mark is read from and written back to that file, so
+repeated calls pick up where the last one stopped. A posting changed several
+times since the cursor is emitted once, with its latest state; deleted
+postings come out as {"seq", "op": "delete", "id"} only, and postings moved
+to the archive by `maintain` (see retention.py) as op "archive".
+
+Cost is proportional to the delta: `seq` is the change log's rowid, the
+latest change per posting is picked among the delta's rows only, and each
+one is joined to its posting by primary key.
+"""
+
+import csv
+import json
+import os
+
+# job columns emitted after "seq" and "op"
+COLUMNS = [
+    "id", "source", "title", "company", "location", "posted", "salary", "url", "snippet", "scraped_at",
+    "salary_currency", "salary_min", "salary_max", "salary_period",
+]
+
+# Joins postings directly: through the `jobs` view SQLite would materialize
+# the whole table for a LEFT JOIN.
+_SELECT = {"company": "co.name", "location": "lo.name"}
+CHANGES_SQL = f"""
+WITH latest AS (
+    SELECT max(seq) AS seq FROM job_changes WHERE seq > ? AND seq <= ? GROUP BY posting_id
+)
+SELECT c.seq, c.op, {", ".join(_SELECT.get(col, "p." + col) for col in COLUMNS[1:])}, c.posting_id
+FROM latest
+JOIN job_changes c ON c.seq = latest.seq
+LEFT JOIN postings p ON p.id = c.posting_id AND c.op IN ('insert', 'update')
+LEFT JOIN companies co ON co.id = p.company_id
+LEFT JOIN locations lo ON lo.id = p.location_id
+ORDER BY c.seq
+"""
+
+
+def current_cursor(conn):
+    """Highest change seq so far (0 for an empty log)."""
+    return conn.execute("SELECT coalesce(max(seq), 0) FROM job_changes").fetchone()[0]
+
+
+def changes_since(conn, since=0, until=None, batch_size=1000):
+    """Yield (seq, op, job dict) for postings changed after `since`, in seq order.
+
+    `until` (default: the current cursor) bounds the delta, so rows written
+    while the caller is reading are left for the next call.
+    """
+    until = current_cursor(conn) if until is None else until
+    cur = conn.execute(CHANGES_SQL, (since, until))
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        for seq, op, *values, posting_id in rows:
+            if op in ("delete", "archive"):
+                yield seq, op, {"id": posting_id}
+            else:
+                yield seq, op, dict(zip(COLUMNS, (posting_id, *values)))
+
+
+# -------------------- Cursor files -------------------- #
+def read_cursor(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_cursor(path, seq):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"{seq}\n")
+    os.replace(tmp, path)
+
+
+# -------------------- Output -------------------- #
+def write_jsonl(changes, out):
+    count = 0
+    for seq, op, job in changes:
+        out.write(json.dumps({"seq": seq, "op": op, **job}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(changes, out):
+    writer = csv.writer(out)
+    writer.writerow(["seq", "op", *COLUMNS])
+    count = 0
+    for seq, op, job in changes:
+        writer.writerow([seq, op, *(job.get(c) for c in COLUMNS)])
+        count += 1
+    return count
+
+
+def export_changes(conn, out, since=0, fmt="jsonl"):
+    """Write the delta after `since` to `out`; returns (rows written, new cursor)."""
+    until = current_cursor(conn)
+    writer = write_csv if fmt == "csv" else write_jsonl
+    return writer(changes_since(conn, since, until), out), until
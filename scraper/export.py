@@ -0,0 +1,207 @@
+"""
+scraper/export.py
+Columnar export of jobs.db to Parquet, partitioned by scrape date and source.
+
+Layout (Hive style, readable by pandas/pyarrow/duckdb/spark as one dataset):
+
+    exports/jobs/scrape_date=2025-10-30/source=indeed/part-00000001-00000420.parquet
+
+A watermark (last exported jobs.id) is stored in jobs.db, so each run only
+reads rows added since the previous export and writes them as new part files.
+Rows are streamed out of SQLite in chunks; memory is bounded by the chunk size.
+A --full export is built in a sibling directory and then replaces the whole
+dataset, so it never sits beside (and duplicates) the incremental parts.
+
+Run:
+    pip install pyarrow
+    python -m scraper.export                 # incremental
+    python -m scraper.export --full          # ignore the watermark, re-export everything
+"""
+
+import argparse
+import logging
+import os
+import shutil
+from datetime import datetime
+
+from scraper.config import DB_PATH, EXPORT_DIR
+from scraper.db import ensure_db
+
+CHUNK_SIZE = 5000
+WATERMARK_NAME = "parquet"
+
+WATERMARK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    updated_at TEXT
+)
+"""
+
+# (column, arrow type name); `source` is a partition key so it is not stored in the files
+COLUMNS = [
+    ("id", "int64"),
+    ("title", "string"),
+    ("company", "string"),
+    ("location", "string"),
+    ("posted", "string"),
+    ("salary", "string"),
+    ("url", "string"),
+    ("snippet", "string"),
+    ("scraped_at", "timestamp"),
+    ("salary_currency", "string"),
+    ("salary_min", "float64"),
+    ("salary_max", "float64"),
+    ("salary_period", "string"),
+]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise SystemExit("Parquet export needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def get_watermark(conn, name=WATERMARK_NAME):
+    conn.execute(WATERMARK_SCHEMA)
+    row = conn.execute("SELECT last_id FROM export_watermarks WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def set_watermark(conn, last_id, name=WATERMARK_NAME):
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO export_watermarks (name, last_id, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at
+            """,
+            (name, last_id, datetime.utcnow().isoformat()),
+        )
+
+
+def _parse_ts(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def iter_chunks(conn, after_id, chunk_size=CHUNK_SIZE):
+    """Yield lists of rows with id > after_id, in id order, chunk_size at a time."""
+    cols = ", ".join(c for c, _ in COLUMNS)
+    cur = conn.execute(
+        f"SELECT {cols}, source, substr(scraped_at, 1, 10) FROM jobs WHERE id > ? ORDER BY id",
+        (after_id,),
+    )
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _staging_dir(out_dir):
+    """Dot-prefixed sibling of out_dir, where a full export is built."""
+    parent, name = os.path.split(os.path.abspath(out_dir))
+    return os.path.join(parent, f".{name}.full")
+
+
+def _replace_dir(new, old):
+    """Move directory `new` to `old`, replacing it; `old` is missing only between two renames."""
+    if not os.path.exists(old):
+        os.rename(new, old)
+        return
+    trash = f"{new}.old"
+    shutil.rmtree(trash, ignore_errors=True)
+    os.rename(old, trash)
+    os.rename(new, old)
+    shutil.rmtree(trash)
+
+
+def export_parquet(db_path=DB_PATH, out_dir=EXPORT_DIR, chunk_size=CHUNK_SIZE, full=False):
+    """Export rows added since the last watermark. Returns (rows, files written).
+
+    With `full`, every row is exported into a new dataset that replaces out_dir.
+    """
+    pa, pq = _require_pyarrow()
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "timestamp": pa.timestamp("us")}
+    schema = pa.schema([(c, types[t]) for c, t in COLUMNS])
+    ts_index = [c for c, _ in COLUMNS].index("scraped_at")
+
+    conn = ensure_db(db_path)
+    after_id = 0 if full else get_watermark(conn)
+    target = out_dir
+    if full:
+        out_dir = _staging_dir(target)
+        shutil.rmtree(out_dir, ignore_errors=True)  # left over by an interrupted full export
+        os.makedirs(out_dir)
+    writers = {}  # (date, source) -> [path, ParquetWriter]
+    exported, last_id = 0, after_id
+
+    try:
+        for rows in iter_chunks(conn, after_id, chunk_size):
+            partitions = {}
+            for row in rows:
+                *values, source, scrape_date = row
+                values[ts_index] = _parse_ts(values[ts_index])
+                partitions.setdefault((scrape_date or "unknown", source or "unknown"), []).append(values)
+
+            for key, values in partitions.items():
+                if key not in writers:
+                    part_dir = os.path.join(out_dir, f"scrape_date={key[0]}", f"source={key[1]}")
+                    os.makedirs(part_dir, exist_ok=True)
+                    # dot-prefixed so dataset readers ignore it until it is complete
+                    path = os.path.join(part_dir, f".part-{after_id + 1:08d}.tmp")
+                    writers[key] = [path, pq.ParquetWriter(path, schema, compression="zstd")]
+                columns = list(zip(*values))
+                table = pa.Table.from_arrays(
+                    [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                    schema=schema,
+                )
+                writers[key][1].write_table(table)
+
+            exported += len(rows)
+            last_id = rows[-1][0]
+    except BaseException:
+        for path, writer in writers.values():
+            writer.close()
+            os.remove(path)
+        if full:
+            shutil.rmtree(out_dir)
+        raise
+
+    # Files only become visible (renamed) once every chunk has been written
+    files = []
+    for path, writer in writers.values():
+        writer.close()
+        final = os.path.join(os.path.dirname(path), f"part-{after_id + 1:08d}-{last_id:08d}.parquet")
+        os.replace(path, final)
+        files.append(final)
+    if full:
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        _replace_dir(out_dir, target)
+        files = [os.path.join(target, os.path.relpath(path, out_dir)) for path in files]
+
+    if exported or full:
+        set_watermark(conn, last_id)
+    conn.close()
+    logging.info("📦 Exported %d rows into %d partition files under %s (watermark=%d)", exported, len(files), target, last_id)
+    return exported, files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export jobs.db to partitioned Parquet")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and export every row")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    export_parquet(args.db, args.out, args.chunk_size, args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+scraper/fingerprints.py
+Skip listing pages that have not changed since the last run.
+
+Right after a listing page is ready, the crawler reads the job key of every
+card on it in one round trip (Source.key_script) and hashes the ordered keys.
+The hash is kept per (source, query, location, page) in jobs.db
+(`page_fingerprints`). When a page hashes to the value stored for it, its
+cards are not parsed, nothing is written and the query's later pages are not
+visited: a quiet query costs one page load per run. Skipped pages are
+counted as "unchanged" in the crawl stats.
+
+A fingerprint is only trusted for PAGE_FINGERPRINT_TTL_HOURS after the page
+was last parsed (0 turns skipping off). Skipping does not refresh parsed_at,
+so with the default 60h and a daily crawl a page is skipped twice and parsed
+in full on the third run. A page whose jobs never reached the database (a
+crash between parse and flush) is therefore parsed again within three days.
+The TTL has to be longer than the crawl interval, or nothing is ever skipped,
+and should not be a multiple of it: a run that starts a few minutes early or
+late would then flip between skipping and parsing.
+`python -m scraper crawl --refresh` parses every page regardless.
+"""
+
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+from scraper.config import PAGE_FINGERPRINT_TTL_HOURS
+
+FINGERPRINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_fingerprints (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    cards INTEGER NOT NULL,
+    parsed_at TEXT NOT NULL,  -- last time the page was parsed in full
+    checked_at TEXT NOT NULL,  -- last time it was loaded
+    skips INTEGER NOT NULL DEFAULT 0,  -- runs that found it unchanged
+    PRIMARY KEY (source, query, location, page)
+)
+"""
+
+
+def fingerprint(keys):
+    """Short hash of an ordered sequence of job keys (None when there are none)."""
+    keys = [key for key in keys if key]
+    if not keys:
+        return None
+    return hashlib.blake2b("\n".join(keys).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class PageFingerprints:
+    """Stored page fingerprints in jobs.db, read and written through `conn`.
+
+    Crawls call it from worker threads (asyncio.to_thread): `conn` must then be
+    opened with check_same_thread=False. Calls are serialized, so concurrent
+    crawls never interleave statements inside each other's transactions.
+    """
+
+    def __init__(self, conn, ttl_hours=PAGE_FINGERPRINT_TTL_HOURS, refresh=False):
+        self.conn = conn
+        self.ttl_hours = ttl_hours
+        self.refresh = refresh
+        self._lock = threading.RLock()
+        conn.execute(FINGERPRINT_SCHEMA)
+
+    def _cutoff(self):
+        return (datetime.utcnow() - timedelta(hours=self.ttl_hours)).isoformat()
+
+    def load(self):
+        """{(source, query, location, page): fingerprint} for every page that may be skipped."""
+        if self.refresh or self.ttl_hours <= 0:
+            return {}
+        with self._lock:
+            return {
+                (source, query, location, page): value
+                for source, query, location, page, value in self.conn.execute(
+                    "SELECT source, query, location, page, fingerprint FROM page_fingerprints WHERE parsed_at >= ?",
+                    (self._cutoff(),),
+                )
+            }
+
+    def unchanged(self, source, query, location, page, value):
+        """True when `value` matches the page's trusted fingerprint; the check is recorded."""
+        if value is None or self.refresh or self.ttl_hours <= 0:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT 1 FROM page_fingerprints
+                WHERE source = ? AND query = ? AND location = ? AND page = ? AND fingerprint = ? AND parsed_at >= ?
+                """,
+                (source, query, location, page, value, self._cutoff()),
+            ).fetchone()
+            if row:
+                self.record_unchanged([(source, query, location, page)])
+        return row is not None
+
+    def record_parsed(self, rows):
+        """Store (source, query, location, page, fingerprint, cards) for fully parsed pages."""
+        now = datetime.utcnow().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO page_fingerprints (source, query, location, page, fingerprint, cards, parsed_at, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, query, location, page) DO UPDATE SET
+                    fingerprint = excluded.fingerprint, cards = excluded.cards,
+                    parsed_at = excluded.parsed_at, checked_at = excluded.checked_at
+                """,
+                [(*row, now, now) for row in rows if row[4] is not None],
+            )
+
+    def record_unchanged(self, pages):
+        """Bump checked_at/skips for (source, query, location, page) found unchanged."""
+        now = datetime.utcnow().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                UPDATE page_fingerprints SET checked_at = ?, skips = skips + 1
+                WHERE source = ? AND query = ? AND location = ? AND page = ?
+                """,
+                [(now, *page) for page in pages],
+            )
@@ -4,37 +4,37 @@ Pure Playwright scraper for Indeed (no ScraperAPI).
 
 - Mirrors the structure of weworkremotely_playwright.py
 - Uses the same HTML selectors and fallback logic from your Scrapy spider
-- Saves results directly into jobs.db
+- Streams results into sinks (jobs.db + CSV by default) as cards are parsed
 """
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-from urllib.parse import urljoin, urlencode
+from urllib.parse import urljoin
 import time
 import random
 import logging
 from datetime import datetime
 import os
-import csv
-import sqlite3
+
+from scraper import config
+from scraper.sinks import CSVSink, SQLiteSink
+from scraper.sources import IndeedSource
+from scraper.watchdog import MemoryWatchdog
 
 # --- Config ---
-BASE = "https://www.indeed.com"
-SEARCH_QUERY ="C++ Remote"
-LOCATION = "New York, NY"
-LISTING_PATH = f"/jobs?{urlencode({'q': SEARCH_QUERY, 'l': LOCATION, 'fromage': 1})}"
+SOURCE = IndeedSource()
+BASE = SOURCE.base
+SEARCH_QUERY = SOURCE.default_query
+LOCATION = SOURCE.default_location
+LISTING_PATH = SOURCE.listing_url(SEARCH_QUERY, LOCATION)
 OUTPUT_CSV = "indeed_playwright_jobs.csv"
-USER_AGENT = os.getenv(
-    "INDEED_USER_AGENT",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-)
-
-MAX_PAGES = int(os.getenv("MAX_PAGES", "3"))
-DOWNLOAD_DELAY = float(os.getenv("DOWNLOAD_DELAY", "1.5"))
-DEFAULT_TIMEOUT = 12000  # ms
-DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.db")
+CSV_FIELDS = ["title", "company", "location", "posted", "salary", "url", "fetched_at"]
+RECORD_FIELDS = CSV_FIELDS[:-2]  # copied from the JobRecord as is; url/fetched_at are computed
+USER_AGENT = os.getenv("INDEED_USER_AGENT", config.USER_AGENT)
 
-# Logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+MAX_PAGES = SOURCE.max_pages
+DOWNLOAD_DELAY = config.DOWNLOAD_DELAY
+DEFAULT_TIMEOUT = config.DEFAULT_TIMEOUT
+DB_PATH = config.DB_PATH
 
 
 def random_sleep(min_s=0.5, max_s=1.0):
@@ -42,105 +42,62 @@ def random_sleep(min_s=0.5, max_s=1.0):
 
 
 class IndeedPlaywright:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, sinks=None):
         self.headless = headless
         self.page_count = 0
         self.visited_pages = set()
         self.seen_urls = set()
-        self.results = []  # ✅ store parsed jobs for CSV
-        self.conn = self.ensure_db()
-
-    # -------------------- Database Setup -------------------- #
-    def ensure_db(self):
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source TEXT,
-                title TEXT,
-                company TEXT,
-                location TEXT,
-                posted TEXT,
-                salary TEXT,
-                url TEXT UNIQUE,
-                snippet TEXT,
-                scraped_at TEXT
-            )
-            """
-        )
-        conn.commit()
-        return conn
+        self.watchdog = MemoryWatchdog()
+        # ✅ parsed jobs stream straight into these (nothing is kept in memory)
+        self.sinks = sinks if sinks is not None else self.default_sinks()
 
-    def upsert_job(self, job):
-        cur = self.conn.cursor()
-        try:
-            cur.execute(
-                """
-                INSERT OR IGNORE INTO jobs
-                (source, title, company, location, posted, salary, url, snippet, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    "indeed",
-                    job.get("title", ""),
-                    job.get("company", ""),
-                    job.get("location", ""),
-                    job.get("posted", ""),
-                    job.get("salary", ""),
-                    job.get("url", ""),
-                    "",
-                    datetime.utcnow().isoformat(),
-                ),
-            )
-            self.conn.commit()
-        except Exception as e:
-            logging.warning("DB insert failed for %s: %s", job.get("url"), e)
+    def default_sinks(self):
+        return [
+            SQLiteSink(DB_PATH),
+            CSVSink(OUTPUT_CSV, fields=CSV_FIELDS, transform=self.csv_row),
+        ]
 
     # -------------------- Browser Setup -------------------- #
     def start_browser(self):
         self._p = sync_playwright().start()
 
         # Launch Chromium with stealthy args
-        proxy_server = os.getenv("PROXY_SERVER")
-        proxy = {"server": proxy_server} if proxy_server else None
-
+        proxy = {"server": config.PROXY_SERVER} if config.PROXY_SERVER else None
         self._browser = self._p.chromium.launch(
             headless=self.headless,
             proxy=proxy,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-infobars",
-                "--window-size=1920,1080",
-                "--start-maximized",
-                "--disable-features=IsolateOrigins,site-per-process",
-            ],
+            args=config.LAUNCH_ARGS,
         )
+        self.open_context()
+        logging.info("Browser started (headless=%s)", self.headless)
+        return self._page
 
-
+    def open_context(self, cookies=None):
         # Create context with realistic user agent and viewport
         self._context = self._browser.new_context(
             user_agent=USER_AGENT,
-            viewport={"width": 1920, "height": 1080},
+            viewport=config.VIEWPORT,
         )
 
         # Inject stealth JavaScript *before any page runs*
-        self._context.add_init_script("""
-        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-        window.navigator.chrome = {runtime: {}};
-        Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
-        Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-        Object.defineProperty(Notification, 'permission', {get: () => 'default'});
-        """)
+        self._context.add_init_script(config.STEALTH_SCRIPT)
+        if cookies:
+            self._context.add_cookies(cookies)
 
         self._page = self._context.new_page()
         self._page.set_default_timeout(DEFAULT_TIMEOUT)
-        logging.info("Browser started (headless=%s)", self.headless)
-        return self._page
 
+    def maybe_recycle(self):
+        """Swap in a fresh page/context when the watchdog asks for it (cookies survive)."""
+        reason = self.watchdog.check()
+        if reason == "page":
+            self._page.close()
+            self._page = self._context.new_page()
+            self._page.set_default_timeout(DEFAULT_TIMEOUT)
+        elif reason == "context":
+            cookies = self._context.cookies()
+            self._context.close()
+            self.open_context(cookies)
 
     def close_browser(self):
         try:
@@ -151,8 +108,7 @@ class IndeedPlaywright:
             self._p.stop()
         except Exception:
             pass
-        self.conn.close()
-        logging.info("Browser closed and DB connection closed")
+        logging.info("Browser closed")
 
     def clean_url(self, url):
         """Remove tracking query params for consistent deduping."""
@@ -169,9 +125,11 @@ class IndeedPlaywright:
             logging.info("Max pages reached (%d). Stopping.", MAX_PAGES)
             return False
 
+        self.maybe_recycle()
         logging.info("Visiting page #%d: %s", self.page_count + 1, url)
         try:
             self._page.goto(url, wait_until="domcontentloaded", timeout=45000)
+            self.watchdog.note_navigation()
     
             # Simulate real interaction
             self._page.mouse.move(300, 300)
@@ -182,21 +140,12 @@ class IndeedPlaywright:
             time.sleep(2)
             self._page.keyboard.press("ArrowDown")
     
-            # Broaden our selector to anything that looks like a job card
-            possible_selectors = [
-                "div.job_seen_beacon",
-                "a.tapItem",
-                "div.slider_container",
-                "div.jobsearch-SerpJobCard",
-            ]
-            found = False
-            for sel in possible_selectors:
-                try:
-                    self._page.wait_for_selector(sel, timeout=8000)
-                    found = True
-                    break
-                except PlaywrightTimeout:
-                    continue
+            # Anything that looks like a job card
+            found = True
+            try:
+                self._page.wait_for_selector(SOURCE.ready_selector, timeout=20000)
+            except PlaywrightTimeout:
+                found = False
     
             if not found:
                 logging.warning("⚠️ Still no job cards visible after full scroll.")
@@ -217,92 +166,25 @@ class IndeedPlaywright:
 
     # -------------------- Extract and Parse -------------------- #
     def extract_job_cards(self):
-        sel = "div.job_seen_beacon, a.tapItem"
-        nodes = self._page.query_selector_all(sel)
-        logging.info("Found %d job cards", len(nodes))
-        return nodes
+        """Raw card dicts for the whole page, pulled in one browser round trip."""
+        raws = self._page.eval_on_selector_all(SOURCE.card_selector, SOURCE.card_script)
+        logging.info("Found %d job cards", len(raws))
+        return raws
 
-    def parse_job_card(self, node):
+    def parse_job_card(self, raw):
         try:
-            # Title
-            title_el = node.query_selector("h2.jobTitle span, h2 span, a[aria-label]")
-            title = title_el.inner_text().strip() if title_el else ""
-
-            # Company
-            company_el = node.query_selector("span.companyName, span[data-testid='company-name']")
-            company = company_el.inner_text().strip() if company_el else ""
-
-            # Location (can have multiple text parts)
-            location_parts = []
-            loc_nodes = node.query_selector_all("div.companyLocation *, div[data-testid='text-location'] *")
-            for loc in loc_nodes:
-                txt = loc.inner_text().strip()
-                if txt:
-                    location_parts.append(txt)
-            location = " ".join(location_parts)
-
-            # Salary (primary set)
-            salary_parts = []
-            salary_nodes = node.query_selector_all(
-                "div[id='salaryInfoAndJobType'] span, "
-                "div[data-testid='attribute_snippet_text'], "
-                "div[data-testid='jobsearch-OtherJobDetailsContainer'] span, "
-                "div[data-testid='salary-snippet-container'] span, "
-                "span.css-1oc7tea, "
-                "span[data-testid='attribute_snippet_text']"
-            )
-            for s in salary_nodes:
-                txt = s.inner_text().strip()
-                if txt:
-                    salary_parts.append(txt)
-            salary = " ".join(salary_parts)
-
-            # Fallback salary extraction
-            if not salary:
-                # try to find visible text with $ or 'year' or 'hour'
-                text_content = node.inner_text()
-                for keyword in ["$", "hour", "year"]:
-                    if keyword in text_content:
-                        salary = keyword
-                        break
-
-            if not salary:
-                salary = "Not disclosed"
-
-            # URL
-            link_el = node.query_selector("a")
-            job_url = link_el.get_attribute("href") if link_el else None
-            if not job_url:
-                return None
-
-            if job_url.startswith("/pagead/clk"):
-                logging.debug("Skipping ad URL: %s", job_url)
-                return None
-            elif job_url.startswith("/"):
-                job_url = urljoin(BASE, job_url)
-
-            if job_url in self.seen_urls:
+            job = SOURCE.build_job(raw)
+            if not job or job.url in self.seen_urls:
                 return None
-            self.seen_urls.add(job_url)
-
-            job = {
-                "title": title,
-                "company": company,
-                "location": location,
-                "salary": salary,
-                "posted": datetime.now().strftime("%Y-%m-%d"),
-                "url": job_url,
-            }
-
-            self.upsert_job(job)
-            self.results.append(job)  # ✅ collect job for CSV export
-            logging.info("📝 Saved: %s - %s", job["title"], job["company"])
+            self.seen_urls.add(job.url)
+            logging.info("📝 Parsed: %s - %s", job.title, job.company)
             return job
         except Exception as e:
             logging.debug("parse_job_card error: %s", e)
             return None
 
     def parse_listing_page(self):
+        """Yield the new jobs on the current page."""
         nodes = self.extract_job_cards()
         items_scraped = 0
         for node in nodes:
@@ -310,20 +192,20 @@ class IndeedPlaywright:
             if not job:
                 continue
             items_scraped += 1
+            yield job
             random_sleep(0.3, 0.8)
         logging.info("Items scraped from page: %d", items_scraped)
-        return items_scraped
 
     # -------------------- Pagination -------------------- #
     def find_next_page(self):
         try:
-            next_btn = self._page.query_selector("a[aria-label='Next'], a[rel='next']")
+            next_btn = self._page.query_selector(SOURCE.next_selector)
             if not next_btn:
                 return None
             href = next_btn.get_attribute("href") or ""
             if not href:
                 return None
-            next_url = urljoin(BASE, href)
+            next_url = SOURCE.next_page_url(href)
             if next_url in self.visited_pages:
                 return None
             return next_url
@@ -335,58 +217,20 @@ class IndeedPlaywright:
         if not url:
             return ""
         # Keep only the job ID (jk= or vjk=)
-        if "jk=" in url:
-            job_id = url.split("jk=")[-1].split("&")[0]
-        elif "vjk=" in url:
-            job_id = url.split("vjk=")[-1].split("&")[0]
-        else:
-            job_id = url.split("?")[0].rstrip("/").split("/")[-1]
-        return f"{BASE}/viewjob?jk={job_id}"
+        return f"{BASE}/viewjob?jk={SOURCE.job_key(url)}"
 
             
-    def save_to_csv(self, filename=OUTPUT_CSV):
-        keys = ["title", "company", "location", "posted", "salary", "url", "fetched_at"]
-
-        # --- Step 1: Load existing jobs (if file exists) ---
-        existing_jobs = []
-        if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                existing_jobs = list(reader)
-
-        # --- Step 2: Build a set of existing URLs to prevent duplicates ---
-        existing_urls = {self.normalize_url(job["url"]) for job in existing_jobs if job.get("url")}
-
-        # --- Step 3: Filter new jobs (skip ones already in file) ---
-        new_jobs = []
-        for job in self.results:
-            norm_url = self.normalize_url(job["url"])
-            if norm_url not in existing_urls:
-                job["url"] = norm_url
-                job["fetched_at"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                new_jobs.append(job)
-                existing_urls.add(norm_url)
-
-        if not new_jobs:
-            logging.info("No new jobs found. CSV unchanged.")
-            return
-
-        logging.info("🆕 %d new jobs found.", len(new_jobs))
-
-        # --- Step 4: Add new jobs at the TOP ---
-        combined_jobs = new_jobs + existing_jobs
-
-        # --- Step 5: Write combined list back to file ---
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(combined_jobs)
-
-        logging.info("✅ CSV updated — %d total jobs, %d newly added.", len(combined_jobs), len(new_jobs))
-
+    def csv_row(self, job):
+        """CSV row of a job: normalized url (from its jk) + fetch time; the record is untouched."""
+        return (
+            *job.csv_row(RECORD_FIELDS),
+            f"{BASE}/viewjob?jk={job.key}",
+            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        )
 
     # -------------------- Main runner -------------------- #
-    def run(self, headless=True, start_path=LISTING_PATH):
+    def iter_jobs(self, start_path=LISTING_PATH):
+        """Crawl and yield jobs one by one as they are parsed."""
         self.start_browser()
         try:
             start_url = urljoin(BASE, start_path)
@@ -395,10 +239,10 @@ class IndeedPlaywright:
             ok = self.make_request(current)
             if not ok:
                 logging.error("Failed to fetch start page: %s", current)
-                return []
+                return
 
             while True:
-                self.parse_listing_page()
+                yield from self.parse_listing_page()
 
                 if self.page_count >= MAX_PAGES:
                     logging.info("Reached MAX_PAGES (%d). Stopping pagination.", MAX_PAGES)
@@ -416,16 +260,29 @@ class IndeedPlaywright:
                 time.sleep(DOWNLOAD_DELAY)
 
             logging.info("✅ Crawl finished: pages=%d, jobs=%d", self.page_count, len(self.seen_urls))
+            logging.info("Peak memory (MB): %s, recycles: %s", self.watchdog.peak_mb(), self.watchdog.recycles)
         finally:
+            self.watchdog.close()
             self.close_browser()
-        # ✅ Save results to CSV
-        if self.results:
-            self.save_to_csv()
-        else:
-            logging.warning("⚠️ No results to save — CSV not updated.")
+
+    def run(self, headless=True, start_path=LISTING_PATH):
+        """Stream every job into the sinks; returns the number of jobs parsed."""
+        items = 0
+        try:
+            for job in self.iter_jobs(start_path):
+                for sink in self.sinks:
+                    sink.write(job)
+                items += 1
+        finally:
+            for sink in self.sinks:
+                sink.close()
+        if not items:
+            logging.warning("⚠️ No jobs parsed — nothing written.")
+        return items
 
 
 # Run directly
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     crawler = IndeedPlaywright(headless=True)
     crawler.run()
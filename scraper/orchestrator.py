@@ -0,0 +1,276 @@
+"""
+scraper/orchestrator.py
+Run every registered source concurrently in ONE Chromium process.
+
+Each source gets its own browser context (isolated cookies, user agent and
+init script) and its own crawl task. Parsed jobs stream through one bounded
+sinks.Pipeline (SQLite by default, see SCRAPER_SINKS), so the nightly wall
+time is max(sources) instead of sum(sources) and rows land as they are parsed.
+A listing page whose cards are the same as last run stops its crawl before
+anything is parsed (see scraper/fingerprints.py).
+
+Run:
+    python -m scraper.orchestrator                  # all registered sources
+    python -m scraper.orchestrator indeed           # only some of them
+"""
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+import asyncio
+import logging
+import random
+import sys
+import time
+
+from scraper.config import (
+    DB_PATH,
+    DEFAULT_TIMEOUT,
+    DOWNLOAD_DELAY,
+    LAUNCH_ARGS,
+    NAVIGATION_TIMEOUT,
+    PROXY_SERVER,
+    SINKS,
+    STEALTH_SCRIPT,
+    USER_AGENT,
+    VIEWPORT,
+)
+from scraper.db import ensure_db
+from scraper.fingerprints import PageFingerprints, fingerprint
+from scraper.sinks import Pipeline, SQLiteSink, build_sinks
+from scraper.sources import get_sources
+from scraper.watchdog import MemoryWatchdog
+
+
+# -------------------- Browser -------------------- #
+async def launch_browser(playwright, headless=True):
+    proxy = {"server": PROXY_SERVER} if PROXY_SERVER else None
+    browser = await playwright.chromium.launch(headless=headless, proxy=proxy, args=LAUNCH_ARGS)
+    logging.info("Browser started (headless=%s)", headless)
+    return browser
+
+
+async def open_context(browser):
+    context = await browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT, locale="en-US")
+    await context.add_init_script(STEALTH_SCRIPT)
+    page = await context.new_page()
+    page.set_default_timeout(DEFAULT_TIMEOUT)
+    return context, page
+
+
+async def recycle(browser, context, page, reason):
+    """Fresh page ("page") or fresh context ("context"), keeping the session cookies.
+
+    open_context() re-applies the user agent, viewport and init script.
+    """
+    if reason == "page":
+        await page.close()
+        page = await context.new_page()
+        page.set_default_timeout(DEFAULT_TIMEOUT)
+        return context, page
+    cookies = await context.cookies()
+    await context.close()
+    context, page = await open_context(browser)
+    if cookies:
+        await context.add_cookies(cookies)
+    return context, page
+
+
+# -------------------- Navigation -------------------- #
+async def load_listing(page, source, url, attempts=3):
+    """Navigate to a listing page and wait until its cards are rendered."""
+    for attempt in range(attempts):
+        try:
+            await page.goto(url, timeout=NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
+            if source.wait_for_idle:
+                await page.wait_for_load_state("networkidle", timeout=45000)
+            if source.needs_interaction:
+                # Simulate real interaction
+                await page.mouse.move(300, 300)
+                await page.keyboard.press("PageDown")
+                await page.evaluate("window.scrollBy(0, document.body.scrollHeight/2)")
+                await asyncio.sleep(random.uniform(1.5, 3.0))
+                await page.keyboard.press("ArrowDown")
+            await page.wait_for_selector(source.ready_selector, timeout=20000)
+            return True
+        except PlaywrightTimeout:
+            logging.warning("[%s] Timeout on attempt %d for %s", source.name, attempt + 1, url)
+        except Exception as e:
+            logging.warning("[%s] Error visiting %s (attempt %d): %s", source.name, url, attempt + 1, e)
+        await asyncio.sleep(3)
+
+    logging.error("[%s] Failed to fetch page after %d attempts: %s", source.name, attempts, url)
+    return False
+
+
+async def page_fingerprint(page, source):
+    """(fingerprint, card count) of a rendered listing page, in one round trip."""
+    raws = await page.eval_on_selector_all(source.card_selector, source.key_script)
+    return fingerprint(source.card_keys(raws)), len(raws)
+
+
+async def extract_jobs(page, source, seen_urls, indexes=None):
+    """Pull every card on the page in one round trip and yield new jobs.
+
+    With `indexes` (positions among the page's cards) only those cards are parsed.
+    """
+    if indexes is None:
+        raws = await page.eval_on_selector_all(source.card_selector, source.card_script)
+    else:
+        script = f"(nodes, indexes) => ({source.card_script})(indexes.map((i) => nodes[i]).filter(Boolean))"
+        raws = await page.eval_on_selector_all(source.card_selector, script, list(indexes))
+    logging.info("[%s] Found %d job cards", source.name, len(raws))
+    for raw in raws:
+        job = source.build_job(raw)
+        if not job or job.url in seen_urls:
+            continue
+        seen_urls.add(job.url)
+        yield job
+
+
+async def find_next_page(page, source, visited_pages):
+    try:
+        el = await page.query_selector(source.next_selector)
+        href = await el.get_attribute("href") if el else None
+    except Exception:
+        return None
+    next_url = source.next_page_url(href)
+    if next_url in visited_pages:
+        return None
+    return next_url
+
+
+# -------------------- Crawl -------------------- #
+async def crawl_source(browser, source, pipeline, query=None, location=None, max_pages=None, is_known=None,
+                       fingerprints=None):
+    """Crawl one source in its own context, streaming jobs into the pipeline.
+
+    Returns a stats dict; when `is_known(url)` is given, stats["new"] counts
+    jobs that were not stored before this crawl. With `fingerprints`
+    (PageFingerprints) the crawl stops at the first page that has not changed
+    since it was last parsed; stats["unchanged"] counts those pages.
+    """
+    max_pages = max_pages or source.max_pages
+    stats = {
+        "source": source.name, "query": query, "location": location,
+        "pages": 0, "unchanged": 0, "jobs": 0, "new": 0, "seconds": 0.0,
+    }
+    spec = (source.name, query or source.default_query, location or source.default_location)
+    parsed = []  # (*spec, page, fingerprint, cards) of pages parsed in full
+    seen_urls, visited_pages = set(), set()
+    started = time.monotonic()
+    watchdog = MemoryWatchdog()
+
+    context, page = await open_context(browser)
+    try:
+        url = source.listing_url(query, location)
+        while url and stats["pages"] < max_pages:
+            reason = watchdog.check()
+            if reason:
+                context, page = await recycle(browser, context, page, reason)
+            logging.info("[%s] Visiting page #%d: %s", source.name, stats["pages"] + 1, url)
+            loaded = await load_listing(page, source, url)
+            watchdog.note_navigation()
+            if not loaded:
+                break
+            visited_pages.add(url)
+            page_number = stats["pages"]
+            stats["pages"] += 1
+
+            if fingerprints is not None:
+                value, cards = await page_fingerprint(page, source)
+                if await asyncio.to_thread(fingerprints.unchanged, *spec, page_number, value):
+                    stats["unchanged"] += 1
+                    logging.info("[%s] Page #%d unchanged since the last run, skipping the rest", source.name, page_number + 1)
+                    break
+                parsed.append((*spec, page_number, value, cards))
+
+            items_scraped = 0
+            async for job in extract_jobs(page, source, seen_urls):
+                if is_known is not None and not is_known(job.url):
+                    stats["new"] += 1
+                await pipeline.put(job)
+                items_scraped += 1
+            stats["jobs"] += items_scraped
+            logging.info("[%s] Items scraped from page: %d", source.name, items_scraped)
+
+            url = await find_next_page(page, source, visited_pages)
+            if url:
+                await asyncio.sleep(DOWNLOAD_DELAY)
+        if parsed:
+            await asyncio.to_thread(fingerprints.record_parsed, parsed)
+    finally:
+        watchdog.close()
+        await context.close()
+        stats["seconds"] = round(time.monotonic() - started, 1)
+        stats["peak_mb"] = watchdog.peak_mb()
+        stats["recycles"] = dict(watchdog.recycles)
+
+    logging.info("✅ [%s] Crawl finished: %s", source.name, stats)
+    return stats
+
+
+class WarmBrowser:
+    """One long-lived Chromium shared by many crawls (relaunched if it dies)."""
+
+    def __init__(self, headless=True):
+        self.headless = headless
+        self._playwright = None
+        self.browser = None
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self.browser = await launch_browser(self._playwright, headless=self.headless)
+        return self
+
+    async def get(self):
+        if self.browser is None or not self.browser.is_connected():
+            logging.warning("Browser is gone, relaunching")
+            self.browser = await launch_browser(self._playwright, headless=self.headless)
+        return self.browser
+
+    async def close(self):
+        try:
+            await self.browser.close()
+        except Exception:
+            pass
+        await self._playwright.stop()
+
+
+async def run_sources(sources, sinks=None, headless=True, db_path=DB_PATH, refresh=False):
+    """Crawl `sources` once; `refresh` parses every page even when its fingerprint is unchanged."""
+    sinks = build_sinks(SINKS, db_path) if sinks is None else sinks
+    conn = ensure_db(db_path, check_same_thread=False)  # fingerprints are checked from threads
+    fingerprints = PageFingerprints(conn, refresh=refresh)
+    try:
+        async with Pipeline(sinks) as pipeline:
+            async with async_playwright() as p:
+                browser = await launch_browser(p, headless=headless)
+                try:
+                    results = await asyncio.gather(
+                        *(crawl_source(browser, s, pipeline, fingerprints=fingerprints) for s in sources),
+                        return_exceptions=True,
+                    )
+                finally:
+                    await browser.close()
+    finally:
+        conn.close()
+
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            logging.error("❌ [%s] crawl failed: %s", source.name, result)
+    for sink in sinks:
+        if isinstance(sink, SQLiteSink):
+            logging.info("🧾 Database updated: %d inserted, %d skipped", sink.inserted, sink.skipped)
+    return results
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    names = sys.argv[1:] if argv is None else argv
+    sources = get_sources(names)
+    started = time.monotonic()
+    asyncio.run(run_sources(sources))
+    logging.info("⏱️ All sources finished in %.1fs", time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+scraper/records.py
+JobRecord: the one shape a scraped job has on its way from a source to the sinks.
+
+Every Source.build_job() returns one. `key` is the board's own id (Indeed
+`jk`, WWR slug), the same value postings.job_key and the page fingerprints
+use. `source` and `location` are interned (None becomes ""): a crawl repeats
+a handful of sources and locations across thousands of records, so they share
+one string object each. Pickled records are rebuilt through __init__, so
+they are interned again after crossing a process boundary (scraper.workers).
+
+Records convert straight to what their consumers need, without building a
+dict first:
+
+    record.db_params(source, now, companies, locations)   # db.INSERT_JOB parameters
+    record.csv_row(["title", "company", "url"])            # tuple in field order
+    row_getter(("title", "url"))(record)                   # same, lookup hoisted out of a loop
+    record.to_dict()                                       # JSON / legacy callers
+
+JobRecord.from_dict() accepts the old job dicts (and storage/parsers'
+"description"), so code that still produces dicts keeps working.
+"""
+
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+
+from scraper.salary import parse_salary
+
+FIELDS = ("source", "key", "title", "company", "location", "posted", "salary", "url", "snippet")
+
+NO_SALARY = (None, None, None, None)
+
+SNIPPET_LIMIT = 2000  # characters kept in postings.snippet
+
+
+@lru_cache(maxsize=64)
+def row_getter(fields):
+    """record -> tuple of `fields` (a tuple of attribute names); one C call per row."""
+    getter = attrgetter(*fields)
+    return getter if len(fields) > 1 else lambda record: (getter(record),)
+
+
+@dataclass(slots=True)
+class JobRecord:
+    source: str
+    key: str
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    posted: str = ""
+    salary: str = ""
+    url: str = ""
+    snippet: str = ""
+
+    def __post_init__(self):
+        self.source = sys.intern(self.source or "")
+        self.location = sys.intern(self.location or "")
+
+    def __reduce__(self):
+        # unpickled through __init__, so records sent by worker processes are interned again
+        return JobRecord, row_getter(FIELDS)(self)
+
+    @classmethod
+    def from_dict(cls, job, source=""):
+        """Record for an old-style job dict; `source` is used when the dict has none.
+
+        A dict without a key gets the one its source derives from the url.
+        """
+        from scraper.sources import source_job_key
+
+        source = job.get("source") or source
+        url = job.get("url") or ""
+        return cls(
+            source,
+            job.get("key") or source_job_key(source, url) or "",
+            job.get("title") or "",
+            job.get("company") or "",
+            job.get("location") or "",
+            job.get("posted") or "",
+            job.get("salary") or "",
+            url,
+            job.get("snippet") or job.get("description") or "",
+        )
+
+    def db_params(self, source, now, companies, locations):
+        """Parameters for db.INSERT_JOB; companies/locations are db.DimensionCache."""
+        salary = self.salary or "Not disclosed"
+        return (
+            self.source or source,
+            self.title,
+            companies.id_for(self.company),
+            locations.id_for(self.location),
+            self.posted,
+            salary,
+            self.url,
+            self.snippet[:SNIPPET_LIMIT],
+            now,
+            *(parse_salary(salary) or NO_SALARY),
+            self.key or self._derived_key(source),
+        )
+
+    def _derived_key(self, source):
+        from scraper.sources import source_job_key
+
+        return source_job_key(self.source or source, self.url)
+
+    def csv_row(self, fields):
+        """Values of `fields` (a tuple or list of attribute names), in order."""
+        return row_getter(tuple(fields))(self)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+def as_record(job, source=""):
+    """`job` as a JobRecord (dicts from older callers are converted)."""
+    return job if isinstance(job, JobRecord) else JobRecord.from_dict(job, source)
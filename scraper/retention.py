@@ -0,0 +1,159 @@
+"""
+scraper/retention.py
+Keep jobs.db small: archive old postings, delete them, give the space back.
+
+    python -m scraper maintain                       # older than RETENTION_DAYS
+    python -m scraper maintain --older-than 90 --dry-run
+
+Postings scraped before the cutoff are written to gzip-compressed JSON
+Lines, one directory per month (same columns as `jobs`):
+
+    archive/month=2025-06/jobs-00000001-00041200.jsonl.gz
+
+Files are complete before rows are deleted (written under a dot-prefixed
+name, then renamed). They stay queryable with zcat/jq, pandas
+(`read_json(..., lines=True)`), duckdb (`read_json_auto('archive/*/*.gz')`)
+or read_archive() below.
+
+Deleted postings show up in the change log as op "archive" rather than
+"delete", and their older insert/update entries are dropped. The database
+is then switched to auto_vacuum=INCREMENTAL (a one-time full VACUUM), free
+pages are released with PRAGMA incremental_vacuum and statistics refreshed
+with ANALYZE. Company/location rows are kept: live writers cache their ids.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from scraper.config import ARCHIVE_DIR, RETENTION_DAYS
+
+COLUMNS = [
+    "id", "source", "title", "company", "location", "posted", "salary", "url", "snippet", "scraped_at",
+    "salary_currency", "salary_min", "salary_max", "salary_period",
+]
+
+SCRAPED_AT = COLUMNS.index("scraped_at")
+
+# auto_vacuum modes (PRAGMA auto_vacuum)
+INCREMENTAL = 2
+
+
+def db_size(conn):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return pages * page_size, free * page_size
+
+
+# -------------------- Archive -------------------- #
+def archive_postings(conn, cutoff, archive_dir=ARCHIVE_DIR):
+    """Write postings scraped before `cutoff` to per-month files.
+
+    Returns (rows, last archived id, files); nothing is deleted here.
+    """
+    cur = conn.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE scraped_at < ? ORDER BY id", (cutoff,)
+    )
+    months = {}  # month -> [tmp path, file, first id, last id]
+    archived, last_id = 0, 0
+    try:
+        while True:
+            rows = cur.fetchmany(5000)
+            if not rows:
+                break
+            for row in rows:
+                month = (row[SCRAPED_AT] or "unknown")[:7]
+                if month not in months:
+                    month_dir = os.path.join(archive_dir, f"month={month}")
+                    os.makedirs(month_dir, exist_ok=True)
+                    tmp = os.path.join(month_dir, f".jobs-{row[0]:08d}.tmp")
+                    months[month] = [tmp, gzip.open(tmp, "wt", encoding="utf-8"), row[0], row[0]]
+                entry = months[month]
+                entry[1].write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+                entry[3] = row[0]
+            archived += len(rows)
+            last_id = rows[-1][0]
+    except BaseException:
+        for tmp, f, _, _ in months.values():
+            f.close()
+            os.remove(tmp)
+        raise
+
+    files = []
+    for tmp, f, first, last in months.values():
+        f.close()
+        with open(tmp, "rb") as fh:
+            os.fsync(fh.fileno())
+        final = os.path.join(os.path.dirname(tmp), f"jobs-{first:08d}-{last:08d}.jsonl.gz")
+        os.replace(tmp, final)
+        files.append(final)
+    return archived, last_id, files
+
+
+def delete_archived(conn, cutoff, last_id):
+    """Delete archived postings; their change-log entries collapse to one "archive" row each."""
+    with conn:
+        start = conn.execute("SELECT coalesce(max(seq), 0) FROM job_changes").fetchone()[0]
+        deleted = conn.execute(
+            "DELETE FROM postings WHERE scraped_at < ? AND id <= ?", (cutoff, last_id)
+        ).rowcount
+        conn.execute("UPDATE job_changes SET op = 'archive' WHERE seq > ? AND op = 'delete'", (start,))
+        conn.execute("""
+            DELETE FROM job_changes
+            WHERE seq <= ? AND op IN ('insert', 'update') AND posting_id NOT IN (SELECT id FROM postings)
+        """, (start,))
+    return deleted
+
+
+def read_archive(archive_dir=ARCHIVE_DIR, month="*"):
+    """Yield archived jobs (dicts), optionally for one month ("2025-06")."""
+    for path in sorted(glob.glob(os.path.join(archive_dir, f"month={month}", "jobs-*.jsonl.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+# -------------------- Compaction -------------------- #
+def compact(conn, max_pages=None):
+    """Release free pages to the OS and refresh planner statistics."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL:
+        # Only takes effect after a full VACUUM; every later run is incremental
+        logging.info("Switching jobs.db to auto_vacuum=INCREMENTAL (one-time full VACUUM)")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        # frees one page per VM step; execute() stops after the first one,
+        # executescript() runs it to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages or 0)});")
+    conn.execute("ANALYZE")
+
+
+def run_maintenance(conn, older_than_days=RETENTION_DAYS, archive_dir=ARCHIVE_DIR, dry_run=False, vacuum=True):
+    """Archive + delete + compact. Returns a stats dict."""
+    cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+    size_before, _ = db_size(conn)
+    stats = {"cutoff": cutoff, "archived": 0, "deleted": 0, "files": 0,
+             "size_before_mb": round(size_before / 1024 / 1024, 2)}
+
+    if dry_run:
+        stats["archived"] = conn.execute("SELECT count(*) FROM postings WHERE scraped_at < ?", (cutoff,)).fetchone()[0]
+        return stats
+
+    archived, last_id, files = archive_postings(conn, cutoff, archive_dir)
+    stats.update(archived=archived, files=len(files))
+    if archived:
+        stats["deleted"] = delete_archived(conn, cutoff, last_id)
+    if vacuum:
+        compact(conn)
+    size_after, free = db_size(conn)
+    stats.update(
+        size_after_mb=round(size_after / 1024 / 1024, 2),
+        reclaimed_mb=round((size_before - size_after) / 1024 / 1024, 2),
+        free_mb=round(free / 1024 / 1024, 2),
+    )
+    logging.info("🗄️ Maintenance: %s", stats)
+    return stats
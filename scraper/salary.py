@@ -0,0 +1,98 @@
+"""
+scraper/salary.py
+Turn free-text salaries into numbers.
+
+    >>> parse_salary("$120,000 - $150,000 a year")
+    Salary(currency='USD', min=120000.0, max=150000.0, period='year')
+    >>> parse_salary("From $25 an hour")
+    Salary(currency='USD', min=52000.0, max=None, period='hour')
+
+min/max are always annualized (hourly x 2080, daily x 260, weekly x 52,
+monthly x 12) so "jobs over $150k/yr" is a plain range query on an index;
+`period` keeps the unit the posting was quoted in. Strings without an amount
+("Not disclosed", Indeed's "$"/"hour"/"year" fallbacks) parse to None.
+
+Patterns are compiled once and results are memoized: scraped salary strings
+repeat a lot, so most lookups are a dict hit.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+import re
+
+Salary = namedtuple("Salary", "currency min max period")
+
+ANNUAL_FACTOR = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP"}
+
+_NUM = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_MONEY_RE = re.compile(
+    rf"(?P<cur>[$€£])\s?(?P<lo>{_NUM})\s?(?P<lok>[kK]\b)?"
+    rf"(?:\s*(?:-|–|—|to)\s*[$€£]?\s?(?P<hi>{_NUM})\s?(?P<hik>[kK]\b)?)?"
+)
+_CODE_RE = re.compile(r"\b(USD|CAD|AUD|EUR|GBP)\b")
+_PERIOD_RE = re.compile(r"\b(hour|hr|day|daily|week|month|year|yr|annum|annual)", re.IGNORECASE)
+_UP_TO_RE = re.compile(r"\bup\s+to\s*$", re.IGNORECASE)
+_OR_MORE_RE = re.compile(r"^\s*(?:\+|or\s+more|and\s+up)", re.IGNORECASE)
+_FROM_RE = re.compile(r"\b(?:from|starting\s+at)\s*$", re.IGNORECASE)
+
+_PERIOD_ALIASES = {
+    "hour": "hour", "hr": "hour",
+    "day": "day", "daily": "day",
+    "week": "week",
+    "month": "month",
+    "year": "year", "yr": "year", "annum": "year", "annual": "year",
+}
+
+
+def _amount(num, k):
+    value = float(num.replace(",", ""))
+    return value * 1000 if k else value
+
+
+@lru_cache(maxsize=65536)
+def parse_salary(text):
+    """Return a Salary for `text`, or None when it holds no amount."""
+    if not text:
+        return None
+    m = _MONEY_RE.search(text)
+    if not m:
+        return None
+
+    lo_k, hi_k = m.group("lok"), m.group("hik")
+    # "$70-90k" / "$70k-90": one suffix applies to both ends
+    hi = _amount(m.group("hi"), hi_k or lo_k) if m.group("hi") else None
+    lo = _amount(m.group("lo"), lo_k or (hi_k if hi is not None else None))
+    if hi is not None and hi < lo:
+        lo, hi = hi, lo
+
+    tail = text[m.end():]
+    p = _PERIOD_RE.search(tail) or _PERIOD_RE.search(text)
+    if p:
+        period = _PERIOD_ALIASES[p.group(1).lower()]
+    else:
+        # WWR buckets ("$100,000 or more USD") have no unit; small numbers are hourly
+        period = "year" if lo >= 1000 else "hour"
+
+    code = _CODE_RE.search(text)
+    currency = code.group(1) if code else CURRENCY_SYMBOLS[m.group("cur")]
+
+    if hi is None:
+        if _UP_TO_RE.search(text[:m.start()]):
+            lo, hi = None, lo
+        elif not _OR_MORE_RE.match(tail) and not _FROM_RE.search(text[:m.start()]):
+            hi = lo
+
+    factor = ANNUAL_FACTOR[period]
+    return Salary(
+        currency,
+        lo * factor if lo is not None else None,
+        hi * factor if hi is not None else None,
+        period,
+    )
+
+
+def normalize_batch(texts):
+    """parse_salary over a batch of strings (repeats are served from the cache)."""
+    return [parse_salary(text) for text in texts]
@@ -0,0 +1,307 @@
+"""
+scraper/scheduler.py
+Long-running crawl daemon: many queries, one warm browser, adaptive intervals.
+
+Each query (source + search term + location) is recrawled on its own
+interval. After every run the interval is scaled by how many *new* jobs the
+run found compared with TARGET_NEW_PER_RUN: busy queries are revisited sooner,
+quiet ones back off (bounded by MIN_INTERVAL/MAX_INTERVAL, with jitter so
+queries do not synchronize). At most MAX_CONCURRENT_CRAWLS run at once.
+Intervals and due times are stored in jobs.db (`query_schedule`), so a
+restarted daemon picks up where it left off.
+
+queries.json (QUERIES_FILE):
+    [
+      {"source": "indeed", "query": "C++ Remote", "location": "New York, NY"},
+      {"source": "weworkremotely", "query": "Java Developer"},
+      {"source": "indeed", "queries": ["Python", "Go"], "locations": ["Remote", "Austin, TX"]}
+    ]
+
+An entry with "queries"/"locations" lists expands to every combination.
+
+Run:
+    python -m scraper.scheduler [--queries queries.json]
+
+Tests/simulations pass a SimulatedClock and a fake `crawl` coroutine to
+Scheduler; the sources can also be pointed at a local fixture site
+(INDEED_BASE_URL / WWR_BASE_URL).
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from collections import namedtuple
+
+from scraper.config import (
+    DB_PATH,
+    DEFAULT_INTERVAL,
+    MAX_CONCURRENT_CRAWLS,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+    QUERIES_FILE,
+    SCHEDULER_JITTER,
+    TARGET_NEW_PER_RUN,
+)
+
+QuerySpec = namedtuple("QuerySpec", "source query location")
+
+SCHEDULE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_schedule (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    interval REAL NOT NULL,
+    next_run REAL NOT NULL,
+    last_new INTEGER,
+    runs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, query, location)
+)
+"""
+
+# Upper bound on one idle sleep so newly due work is never missed for long
+MAX_IDLE = 60.0
+
+
+# -------------------- Clocks -------------------- #
+class Clock:
+    def now(self):
+        return time.time()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(max(0.0, seconds))
+
+
+class SimulatedClock(Clock):
+    """Virtual time: sleepers wake in deadline order without real waiting.
+
+    Time only advances once every runnable task has yielded, so days of
+    scheduling can be simulated in milliseconds.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self._waiters = []  # heap of (deadline, seq, future)
+        self._seq = itertools.count()
+        self._driver = None
+
+    def now(self):
+        return self._now
+
+    async def sleep(self, seconds):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._now + max(0.0, seconds), next(self._seq), future))
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._drive())
+        await future
+
+    async def _drive(self):
+        while self._waiters:
+            for _ in range(20):  # let everything that can run, run
+                await asyncio.sleep(0)
+            # cancelled sleepers must not move time forward
+            while self._waiters and self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                return
+            deadline, _, future = heapq.heappop(self._waiters)
+            self._now = max(self._now, deadline)
+            future.set_result(None)
+
+
+# -------------------- Queries -------------------- #
+def load_queries(path=QUERIES_FILE):
+    """QuerySpecs from a JSON file, or one default query per source when it is missing."""
+    if not os.path.exists(path):
+        from scraper.sources import get_sources
+
+        return [QuerySpec(s.name, s.default_query, s.default_location) for s in get_sources()]
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    specs = []
+    for e in entries:
+        queries = e.get("queries") or [e.get("query", "")]
+        locations = e.get("locations") or [e.get("location", "")]
+        specs.extend(QuerySpec(e["source"], q, l) for q in queries for l in locations)
+    return list(dict.fromkeys(specs))  # same combination listed twice: crawl it once
+
+
+class QueryState:
+    __slots__ = ("spec", "interval", "next_run", "last_new", "runs", "running")
+
+    def __init__(self, spec, interval, next_run, last_new=None, runs=0):
+        self.spec = spec
+        self.interval = interval
+        self.next_run = next_run
+        self.last_new = last_new
+        self.runs = runs
+        self.running = False
+
+    def __repr__(self):
+        return f"<QueryState {self.spec} every {self.interval / 60:.0f}min, last_new={self.last_new}>"
+
+
+# -------------------- Scheduler -------------------- #
+class Scheduler:
+    """Run `crawl(spec)` for every query on an adaptive interval.
+
+    `crawl` is a coroutine function returning a stats dict with a "new" count.
+    """
+
+    def __init__(self, specs, crawl, clock=None, conn=None, max_concurrent=MAX_CONCURRENT_CRAWLS,
+                 target_new=TARGET_NEW_PER_RUN, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 default_interval=DEFAULT_INTERVAL, jitter=SCHEDULER_JITTER, rng=None):
+        self.crawl = crawl
+        self.clock = clock or Clock()
+        self.conn = conn
+        self.max_concurrent = max_concurrent
+        self.target_new = target_new
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.history = []  # (time, spec, new, interval) per finished run
+        self.states = self._load_states(specs)
+
+    def _load_states(self, specs):
+        saved = {}
+        if self.conn is not None:
+            self.conn.execute(SCHEDULE_SCHEMA)
+            for source, query, location, interval, next_run, last_new, runs in self.conn.execute(
+                "SELECT source, query, location, interval, next_run, last_new, runs FROM query_schedule"
+            ):
+                saved[QuerySpec(source, query, location)] = (interval, next_run, last_new, runs)
+        now = self.clock.now()
+        # New queries start immediately, spread a little so they do not all hit at once
+        return [
+            QueryState(spec, *saved[spec]) if spec in saved
+            else QueryState(spec, self.default_interval, now + i * self.rng.uniform(0, 5))
+            for i, spec in enumerate(specs)
+        ]
+
+    def _save_state(self, state):
+        if self.conn is None:
+            return
+        spec = state.spec
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO query_schedule (source, query, location, interval, next_run, last_new, runs)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, query, location) DO UPDATE SET
+                    interval = excluded.interval, next_run = excluded.next_run,
+                    last_new = excluded.last_new, runs = excluded.runs
+                """,
+                (spec.source, spec.query, spec.location, state.interval, state.next_run, state.last_new, state.runs),
+            )
+
+    def next_interval(self, interval, new_jobs):
+        """Scale the interval by target/new (at most x2 faster, x1.5 slower per run)."""
+        if new_jobs is None:  # failed run: keep the cadence
+            return interval
+        if new_jobs == 0:
+            factor = 1.5
+        else:
+            factor = min(1.5, max(0.5, self.target_new / new_jobs))
+        return min(self.max_interval, max(self.min_interval, interval * factor))
+
+    async def _run_one(self, state, semaphore):
+        async with semaphore:
+            started = self.clock.now()
+            try:
+                stats = await self.crawl(state.spec)
+                new_jobs = stats.get("new", 0)
+            except Exception as e:
+                logging.warning("Crawl failed for %s: %s", state.spec, e)
+                new_jobs = None
+
+        now = self.clock.now()
+        state.interval = self.next_interval(state.interval, new_jobs)
+        jitter = self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        state.next_run = now + state.interval * jitter
+        state.last_new = new_jobs
+        state.runs += 1
+        state.running = False
+        self.history.append((started, state.spec, new_jobs, state.interval))
+        self._save_state(state)
+        logging.info(
+            "🔁 %s: %s new in %.0fs, next run in %.0f min",
+            state.spec, new_jobs, now - started, (state.next_run - now) / 60,
+        )
+
+    async def run(self, until=None):
+        """Schedule forever, or until the clock reaches `until`."""
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        tasks = set()
+        try:
+            while until is None or self.clock.now() < until:
+                now = self.clock.now()
+                for state in self.states:
+                    if not state.running and state.next_run <= now:
+                        state.running = True
+                        tasks.add(asyncio.create_task(self._run_one(state, semaphore)))
+
+                idle = [s.next_run for s in self.states if not s.running]
+                delay = min(min(idle, default=now + MAX_IDLE) - now, MAX_IDLE)
+                if until is not None:
+                    delay = min(delay, until - now)
+                sleeper = asyncio.create_task(self.clock.sleep(delay))
+                done, _ = await asyncio.wait(tasks | {sleeper}, return_when=asyncio.FIRST_COMPLETED)
+                sleeper.cancel()
+                tasks -= done
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# -------------------- Daemon -------------------- #
+async def run_daemon(specs, headless=True):
+    from scraper.db import ensure_db, job_known
+    from scraper.fingerprints import PageFingerprints
+    from scraper.orchestrator import WarmBrowser, crawl_source
+    from scraper.sinks import Pipeline, build_sinks
+    from scraper.config import SINKS
+    from scraper.sources import get_source
+
+    conn = ensure_db(DB_PATH, check_same_thread=False)  # fingerprints are checked from threads
+    fingerprints = PageFingerprints(conn)
+    warm = await WarmBrowser(headless=headless).start()
+    try:
+        async with Pipeline(build_sinks(SINKS, DB_PATH)) as pipeline:
+            async def crawl(spec):
+                browser = await warm.get()
+                return await crawl_source(
+                    browser, get_source(spec.source), pipeline, spec.query, spec.location,
+                    is_known=lambda url: job_known(conn, spec.source, url), fingerprints=fingerprints,
+                )
+
+            await Scheduler(specs, crawl, conn=conn).run()
+    finally:
+        await warm.close()
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Adaptive recrawl daemon")
+    parser.add_argument("--queries", default=QUERIES_FILE, help="JSON list of {source, query, location}")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    specs = load_queries(args.queries)
+    logging.info("Scheduling %d queries (max %d concurrent)", len(specs), MAX_CONCURRENT_CRAWLS)
+    try:
+        asyncio.run(run_daemon(specs, headless=not args.headed))
+    except KeyboardInterrupt:
+        logging.info("Scheduler stopped")
+
+
+if __name__ == "__main__":
+    main()
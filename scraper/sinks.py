@@ -0,0 +1,300 @@
+"""
+scraper/sinks.py
+Where parsed jobs go. Jobs are streamed into sinks as they are parsed instead
+of being collected in a list until the end of the crawl.
+
+Every sink keeps a small bounded buffer and flushes it when it reaches
+`batch_size` rows or `flush_interval` seconds, so memory stays flat on large
+crawls and downstream readers see rows within seconds.
+
+Sync code writes to sinks directly:
+
+    with SQLiteSink("jobs.db") as sink:
+        for job in crawler.iter_jobs():
+            sink.write(job)
+
+Jobs are JobRecords (see scraper/records.py); plain job dicts are converted
+when they are written.
+
+Async code goes through a Pipeline, whose bounded queue applies backpressure
+to the crawl tasks when the sinks fall behind. The Pipeline calls the sinks
+in a worker thread, so their file and SQLite I/O never blocks the event loop.
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+
+from scraper.config import CSV_DEDUPE_WINDOW, DB_PATH, FLUSH_INTERVAL, SINK_BATCH_SIZE, PIPELINE_QUEUE_SIZE
+from scraper.db import ensure_db, insert_jobs
+from scraper.records import as_record, row_getter
+
+CSV_FIELDS = ["title", "company", "location", "posted", "salary", "url"]
+
+
+class Sink:
+    def __init__(self, batch_size=SINK_BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.written = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, job):
+        self.buffer.append(as_record(job))
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.write_batch(batch)
+            self.written += len(batch)
+        self._last_flush = time.monotonic()
+
+    def write_batch(self, jobs):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteSink(Sink):
+    """Batch writer into jobs.db; each flush is one transaction.
+
+    A Pipeline writes from a worker thread: a connection passed in must be
+    opened with check_same_thread=False (the sink's own connection is).
+    """
+
+    def __init__(self, db=DB_PATH, source=None, **kwargs):
+        super().__init__(**kwargs)
+        self._owns_conn = not isinstance(db, sqlite3.Connection)
+        self.conn = ensure_db(db, check_same_thread=False) if self._owns_conn else db
+        self.source = source
+        self.inserted = 0
+        self.skipped = 0
+        self.inserted_by_source = {}
+
+    def write_batch(self, jobs):
+        by_source = {}
+        for job in jobs:
+            by_source.setdefault(job.source or self.source, []).append(job)
+        for source, rows in by_source.items():
+            inserted, skipped = insert_jobs(self.conn, source, rows)
+            self.inserted += inserted
+            self.skipped += skipped
+            self.inserted_by_source[source] = self.inserted_by_source.get(source, 0) + inserted
+
+    def close(self):
+        super().close()
+        if self._owns_conn:
+            self.conn.close()
+
+
+class RecentURLs:
+    """Bounded url set: 8-byte hashes of the last `maxsize` urls added (oldest evicted first)."""
+
+    def __init__(self, maxsize=CSV_DEDUPE_WINDOW):
+        self.maxsize = maxsize
+        self._hashes = set()
+        self._order = deque()
+
+    @staticmethod
+    def _hash(url):
+        return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def __contains__(self, url):
+        return self._hash(url) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, url):
+        h = self._hash(url)
+        if h in self._hashes:
+            return
+        self._hashes.add(h)
+        self._order.append(h)
+        if len(self._order) > self.maxsize:
+            self._hashes.discard(self._order.popleft())
+
+
+class CSVSink(Sink):
+    """Append-only CSV writer; rows whose url was written recently are skipped.
+
+    Only the last CSV_DEDUPE_WINDOW urls of the file are remembered (as
+    hashes), so memory stays flat however large the file grows; a job that
+    reappears after that many newer rows is appended again.
+
+    Rows are the record's `fields`, in order. `transform` can build the row
+    (a sequence in `fields` order) itself; it must not mutate the record,
+    other sinks see the same one.
+    """
+
+    def __init__(self, filename, fields=CSV_FIELDS, transform=None, dedupe_window=CSV_DEDUPE_WINDOW, **kwargs):
+        super().__init__(**kwargs)
+        self.filename = filename
+        self.fields = fields
+        self.row = transform or row_getter(tuple(fields))
+        self._url_index = fields.index("url")
+        self.seen_urls = RecentURLs(dedupe_window)
+        self.skipped = 0
+        needs_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        if not needs_header:
+            with open(filename, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):  # streamed; only the window is kept
+                    if row.get("url"):
+                        self.seen_urls.add(row["url"])
+        self._file = open(filename, "a", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        if needs_header:
+            self._writer.writerow(fields)
+
+    def write_batch(self, jobs):
+        for job in jobs:
+            row = self.row(job)
+            url = row[self._url_index]
+            if url in self.seen_urls:
+                self.skipped += 1
+                continue
+            self.seen_urls.add(url)
+            self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+        logging.info("CSV %s: %d rows appended, %d already present", self.filename, self.written - self.skipped, self.skipped)
+
+
+class JSONLSink(Sink):
+    """One JSON object per line, to a path or an already open text stream."""
+
+    def __init__(self, target, **kwargs):
+        super().__init__(**kwargs)
+        self._owns_file = isinstance(target, (str, os.PathLike))
+        self._file = open(target, "a", encoding="utf-8") if self._owns_file else target
+
+    def write_batch(self, jobs):
+        self._file.write("".join(json.dumps(job.to_dict(), ensure_ascii=False) + "\n" for job in jobs))
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        if self._owns_file:
+            self._file.close()
+
+
+class StdoutSink(JSONLSink):
+    """JSONL on stdout, unbuffered, for piping into other tools."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("batch_size", 1)
+        super().__init__(sys.stdout, **kwargs)
+
+
+def build_sinks(spec, db_path=DB_PATH):
+    """Build sinks from a spec like "sqlite,csv:jobs.csv,jsonl:jobs.jsonl,stdout"."""
+    sinks = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, arg = part.partition(":")
+        if kind == "sqlite":
+            sinks.append(SQLiteSink(arg or db_path))
+        elif kind == "csv":
+            sinks.append(CSVSink(arg or "jobs.csv", fields=["source"] + CSV_FIELDS))
+        elif kind == "jsonl":
+            sinks.append(JSONLSink(arg or "jobs.jsonl"))
+        elif kind == "stdout":
+            sinks.append(StdoutSink())
+        else:
+            raise ValueError(f"Unknown sink: {kind!r} (expected sqlite, csv, jsonl or stdout)")
+    return sinks
+
+
+class Pipeline:
+    """Async fan-out from crawl tasks to sinks through a bounded queue.
+
+    `put()` blocks once `maxsize` jobs are waiting, which slows the crawlers
+    down to the speed of the slowest sink instead of growing memory.
+    """
+
+    _DONE = object()
+
+    def __init__(self, sinks, maxsize=PIPELINE_QUEUE_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.sinks = list(sinks)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.flush_interval = flush_interval
+        self._consumer = None
+
+    async def __aenter__(self):
+        self._consumer = asyncio.create_task(self._drain())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def put(self, job):
+        await self.queue.put(job)
+
+    async def _drain(self):
+        while True:
+            try:
+                job = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self.flush)
+                continue
+            # everything already waiting goes to the thread in one hop
+            batch = [job]
+            while batch[-1] is not self._DONE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            done = batch[-1] is self._DONE
+            if done:
+                batch.pop()
+            if batch:
+                await asyncio.to_thread(self._write, batch)
+            if done:
+                return
+
+    def _write(self, jobs):
+        for job in jobs:
+            for sink in self.sinks:
+                try:
+                    sink.write(job)
+                except Exception as e:
+                    logging.warning("%s failed for %s: %s", type(sink).__name__, getattr(job, "url", job), e)
+
+    def flush(self):
+        for sink in self.sinks:
+            try:
+                sink.flush()
+            except Exception as e:
+                logging.warning("%s flush failed: %s", type(sink).__name__, e)
+
+    async def close(self):
+        if self._consumer is not None:
+            await self.queue.put(self._DONE)
+            await self._consumer
+            self._consumer = None
+        # every sink gets its final flush, even when an earlier one fails
+        error = None
+        for sink in self.sinks:
+            try:
+                await asyncio.to_thread(sink.close)
+            except Exception as e:
+                logging.error("%s close failed: %s", type(sink).__name__, e)
+                error = error or e
+        if error is not None:
+            raise error
@@ -0,0 +1,287 @@
+"""
+scraper/sources.py
+Source plugins: everything that is specific to one job board.
+
+A source describes *what* to crawl, never *how*:
+- listing_url():  build the search URL for a query/location
+- ready_selector: CSS selector that means "cards are rendered"
+- card_selector + card_script: extract every card on a page in ONE round trip
+  (card_script runs in the browser via eval_on_selector_all)
+- key_script:     the same for just what build_job() needs for the job key;
+  used to fingerprint a page before parsing it (see scraper/fingerprints.py)
+- build_job():    turn one raw card dict into a JobRecord (pure Python)
+- next_selector / next_page_url(): pagination
+
+Drivers (scraper.orchestrator, the legacy *_playwright.py scripts) own the
+browser, navigation and storage, so adding a board means adding a class here.
+Base URLs can be pointed at a local fixture site with INDEED_BASE_URL /
+WWR_BASE_URL.
+"""
+
+from urllib.parse import urljoin, urlencode, urlsplit
+from datetime import datetime
+from functools import lru_cache
+import logging
+import os
+
+from scraper.config import MAX_PAGES
+from scraper.records import JobRecord
+
+SOURCES = {}
+
+
+def register_source(cls):
+    """Class decorator: make a Source available to the orchestrator by name."""
+    SOURCES[cls.name] = cls
+    return cls
+
+
+def get_sources(names=None):
+    """Instantiate registered sources (all of them when names is empty)."""
+    if not names:
+        names = list(SOURCES)
+    unknown = [n for n in names if n not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(unknown)} (known: {', '.join(SOURCES)})")
+    return [SOURCES[n]() for n in names]
+
+
+def get_source(name):
+    return get_sources([name])[0]
+
+
+@lru_cache(maxsize=None)
+def _shared_source(name):
+    return SOURCES[name]()
+
+
+def source_job_key(name, url):
+    """Source `name`'s job_key() for `url`; None for unknown sources or without a url."""
+    if name not in SOURCES or not url:
+        return None
+    return _shared_source(name).job_key(url) or None
+
+
+class Source:
+    name = ""
+    base = ""
+    default_query = ""
+    default_location = ""
+    max_pages = MAX_PAGES
+
+    card_selector = ""
+    ready_selector = ""
+    next_selector = "a[rel='next']"
+    card_script = ""
+    key_script = ""
+
+    # Scroll/keyboard nudges before waiting for cards (lazy-loaded boards)
+    needs_interaction = False
+    # Wait for network idle after DOMContentLoaded (slow boards)
+    wait_for_idle = False
+
+    def listing_url(self, query=None, location=None):
+        raise NotImplementedError
+
+    def page_url(self, query=None, location=None, page=0):
+        """URL of result page `page` (0-based) without walking the pagination links.
+
+        Boards that cannot be addressed by page number return None for page > 0.
+        """
+        return self.listing_url(query, location) if page == 0 else None
+
+    def build_job(self, raw):
+        """Return a JobRecord for one raw card, or None to drop it."""
+        raise NotImplementedError
+
+    def job_key(self, url):
+        """Stable per-board identifier for a job URL."""
+        return url.split("?")[0].rstrip("/").split("/")[-1] if url else ""
+
+    def card_keys(self, raws):
+        """Job keys of key_script results, in page order (dropped cards are skipped)."""
+        jobs = (self.build_job(raw) for raw in raws)
+        return [job.key for job in jobs if job]
+
+    def next_page_url(self, href):
+        return urljoin(self.base, href) if href else None
+
+    def __repr__(self):
+        return f"<Source {self.name}>"
+
+
+# -------------------- Indeed -------------------- #
+INDEED_CARD_SCRIPT = """
+(nodes) => nodes.map((node) => {
+  const text = (el) => (el ? el.innerText.trim() : "");
+  const texts = (sel) => Array.from(node.querySelectorAll(sel))
+    .map((el) => el.innerText.trim())
+    .filter(Boolean);
+  const link = node.querySelector("a");
+  return {
+    title: text(node.querySelector("h2.jobTitle span, h2 span, a[aria-label]")),
+    company: text(node.querySelector("span.companyName, span[data-testid='company-name']")),
+    location: texts("div.companyLocation *, div[data-testid='text-location'] *").join(" "),
+    salary: texts(
+      "div[id='salaryInfoAndJobType'] span, " +
+      "div[data-testid='attribute_snippet_text'], " +
+      "div[data-testid='jobsearch-OtherJobDetailsContainer'] span, " +
+      "div[data-testid='salary-snippet-container'] span, " +
+      "span.css-1oc7tea, " +
+      "span[data-testid='attribute_snippet_text']"
+    ).join(" "),
+    text: node.innerText,
+    href: link ? link.getAttribute("href") : null,
+    jk: link ? (link.getAttribute("data-jk") || "") : "",
+  };
+})
+"""
+
+INDEED_KEY_SCRIPT = """
+(nodes) => nodes.map((node) => {
+  const link = node.querySelector("a");
+  return {
+    href: link ? link.getAttribute("href") : null,
+    jk: link ? (link.getAttribute("data-jk") || "") : "",
+  };
+})
+"""
+
+
+@register_source
+class IndeedSource(Source):
+    name = "indeed"
+    base = os.getenv("INDEED_BASE_URL", "https://www.indeed.com")
+    default_query = "C++ Remote"
+    default_location = "New York, NY"
+
+    card_selector = "div.job_seen_beacon, a.tapItem"
+    ready_selector = "div.job_seen_beacon, a.tapItem, div.slider_container, div.jobsearch-SerpJobCard"
+    next_selector = "a[aria-label='Next'], a[rel='next']"
+    card_script = INDEED_CARD_SCRIPT
+    key_script = INDEED_KEY_SCRIPT
+    needs_interaction = True
+
+    def listing_url(self, query=None, location=None):
+        params = {"q": query or self.default_query, "l": location or self.default_location, "fromage": 1}
+        return urljoin(self.base, f"/jobs?{urlencode(params)}")
+
+    def page_url(self, query=None, location=None, page=0):
+        url = self.listing_url(query, location)
+        return f"{url}&start={page * 10}" if page else url
+
+    def job_key(self, url):
+        if not url:
+            return ""
+        for marker in ("vjk=", "jk="):
+            if marker in url:
+                return url.split(marker)[-1].split("&")[0]
+        return super().job_key(url)
+
+    def build_job(self, raw):
+        job_url = raw.get("href")
+        if not job_url:
+            return None
+        if job_url.startswith("/pagead/clk"):
+            logging.debug("Skipping ad URL: %s", job_url)
+            return None
+        if job_url.startswith("/"):
+            job_url = urljoin(self.base, job_url)
+
+        salary = raw.get("salary") or ""
+        if not salary:
+            # try to find visible text with $ or 'year' or 'hour'
+            text_content = raw.get("text") or ""
+            for keyword in ["$", "hour", "year"]:
+                if keyword in text_content:
+                    salary = keyword
+                    break
+
+        return JobRecord(
+            source=self.name,
+            key=raw.get("jk") or self.job_key(job_url),
+            title=raw.get("title") or "",
+            company=raw.get("company") or "",
+            location=raw.get("location") or "",
+            salary=salary or "Not disclosed",
+            posted=datetime.now().strftime("%Y-%m-%d"),
+            url=job_url,
+        )
+
+
+# -------------------- WeWorkRemotely -------------------- #
+WWR_CARD_SCRIPT = """
+(nodes) => nodes.map((node) => {
+  const text = (sel) => {
+    const el = node.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+  };
+  const link = node.querySelector("a[href^='/remote-jobs/']") || node.querySelector("a");
+  return {
+    href: link ? link.getAttribute("href") : null,
+    title: text("h3.new-listing__header__title"),
+    company: text("p.new-listing__company-name"),
+    location: text("p.new-listing__company-headquarters"),
+    posted: text("p.new-listing__header__icons__date"),
+    categories: Array.from(node.querySelectorAll("div.new-listing__categories p"))
+      .map((el) => el.innerText.trim()),
+  };
+})
+"""
+
+WWR_KEY_SCRIPT = """
+(nodes) => nodes.map((node) => {
+  const link = node.querySelector("a[href^='/remote-jobs/']") || node.querySelector("a");
+  return {href: link ? link.getAttribute("href") : null};
+})
+"""
+
+
+@register_source
+class WeWorkRemotelySource(Source):
+    name = "weworkremotely"
+    base = os.getenv("WWR_BASE_URL", "https://weworkremotely.com")
+    default_query = "Java Developer"
+    max_pages = int(os.getenv("MAX_PAGES", "5"))
+
+    card_selector = "li.new-listing-container:not(.feature--ad)"
+    ready_selector = "li.new-listing-container"
+    card_script = WWR_CARD_SCRIPT
+    key_script = WWR_KEY_SCRIPT
+    wait_for_idle = True
+
+    def listing_url(self, query=None, location=None):
+        # WWR search has no location filter; everything is remote
+        term = (query or self.default_query).replace(" ", "+")
+        return urljoin(self.base, f"/remote-jobs/search?term={term}")
+
+    def page_url(self, query=None, location=None, page=0):
+        url = self.listing_url(query, location)
+        return f"{url}&page={page + 1}" if page else url
+
+    def job_key(self, url):
+        return urlsplit(url).path.rstrip("/").split("/")[-1] if url else ""
+
+    def build_job(self, raw):
+        href = raw.get("href")
+        if not href:
+            return None
+        job_url = urljoin(self.base, href)
+
+        # categories block may contain salary info
+        salary = "Not disclosed"
+        for ctext in raw.get("categories") or []:
+            if "$" in ctext:
+                salary = ctext
+                break
+
+        return JobRecord(
+            source=self.name,
+            key=self.job_key(job_url),
+            title=raw.get("title") or "",
+            company=raw.get("company") or "",
+            location=raw.get("location") or "",
+            posted=raw.get("posted") or datetime.now().strftime("%Y-%m-%d"),
+            salary=salary,
+            url=job_url,
+        )
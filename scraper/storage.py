@@ -1,6 +1,8 @@
 import aiosqlite
 import os
 
+from scraper.records import as_record
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB= os.path.join(BASE_DIR, "jobs.db")
@@ -23,11 +25,13 @@ async def init_db():
         await db.commit()
 
 async def upsert_job(job):
+    # JobRecord or dict; parsers.parse_job_page's "description" lands in snippet
+    job = as_record(job)
     async with aiosqlite.connect(DB) as db:
         await db.execute("""
             INSERT INTO jobs (url, title, company, location, description)
             VALUES (?, ?, ?, ?, ?)
             ON CONFLICT(url) DO UPDATE SET
               title=excluded.title, company=excluded.company, location=excluded.location, description=excluded.description, scraped_at=CURRENT_TIMESTAMP
-        """, (job.get("url"), job.get("title"), job.get("company"), job.get("location"), job.get("description")))
+        """, (job.url, job.title, job.company, job.location, job.snippet))
         await db.commit()
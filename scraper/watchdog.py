@@ -0,0 +1,195 @@
+"""
+scraper/watchdog.py
+Keep long crawls inside a flat memory envelope.
+
+Chromium renderer memory grows with every navigation of a long-lived page.
+MemoryWatchdog counts navigations and samples RSS of the Python process and
+of every Chromium process it spawned (browser, renderers, GPU/utility). It
+tells the driver when to recycle:
+
+- "page"    after RECYCLE_AFTER_NAVIGATIONS navigations (cheap: new tab, same
+            context, cookies untouched)
+- "context" when renderer RSS crosses RECYCLE_RSS_MB (drops the renderers and
+            everything cached in the context; the driver re-creates it with the
+            same user agent/init script and copies the cookies over)
+
+Only renderer memory counts towards RECYCLE_RSS_MB: the browser and GPU
+processes are shared by every context and survive a recycle. The budget is
+shared too. All watchdogs of one Python process sample the same Chromium
+tree, and when renderers are over budget only the watchdog whose context has
+navigated the most since its last context recycle (the likeliest owner of
+the growth) asks for one; the others keep going. A context is recycled at
+most once per MIN_CONTEXT_NAVIGATIONS navigations, so a baseline that stays
+over budget cannot turn into a recycle loop.
+
+Peak values are kept for the whole run so they can be logged and compared.
+RSS is read from /proc (Linux); psutil is used instead when installed. On
+platforms with neither, only the navigation limit applies.
+"""
+
+import logging
+import os
+import weakref
+
+from scraper.config import RECYCLE_AFTER_NAVIGATIONS, RECYCLE_RSS_MB
+
+try:
+    import psutil
+except ImportError:  # optional
+    psutil = None
+
+MB = 1024 * 1024
+CHROMIUM_MARKERS = ("chrom", "headless_shell")
+PROC = "/proc"
+MIN_CONTEXT_NAVIGATIONS = 5
+
+# watchdogs of the contexts alive in this process (they share one Chromium tree)
+_live = weakref.WeakSet()
+
+
+# -------------------- RSS sampling -------------------- #
+def _proc_rss(pid, proc=PROC):
+    try:
+        with open(f"{proc}/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _proc_children(proc=PROC):
+    """{ppid: [pid, ...]} for every process visible in /proc."""
+    children = {}
+    for entry in os.listdir(proc):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{proc}/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm may contain spaces/parens: ppid is the 2nd field after the last ')'
+        ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_cmdline(pid, proc=PROC):
+    try:
+        with open(f"{proc}/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+def sample_memory(root_pid=None, proc=PROC):
+    """RSS in bytes: {"python", "browser", "renderer"} for this process tree.
+
+    "browser" is every Chromium process below root_pid (renderers included),
+    "renderer" only the --type=renderer ones. `proc` is read instead of
+    /proc when psutil is not installed.
+    """
+    root_pid = root_pid or os.getpid()
+    sample = {"python": 0, "browser": 0, "renderer": 0}
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            sample["python"] = root.memory_info().rss
+            for proc in root.children(recursive=True):
+                try:
+                    cmdline = " ".join(proc.cmdline())
+                    rss = proc.memory_info().rss
+                except psutil.Error:
+                    continue
+                if any(m in cmdline for m in CHROMIUM_MARKERS):
+                    sample["browser"] += rss
+                    if "--type=renderer" in cmdline:
+                        sample["renderer"] += rss
+        except psutil.Error:
+            pass
+        return sample
+
+    if not os.path.isdir(proc):
+        return sample
+
+    sample["python"] = _proc_rss(root_pid, proc)
+    children = _proc_children(proc)
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        cmdline = _proc_cmdline(pid, proc)
+        if any(m in cmdline for m in CHROMIUM_MARKERS):
+            rss = _proc_rss(pid, proc)
+            sample["browser"] += rss
+            if "--type=renderer" in cmdline:
+                sample["renderer"] += rss
+    return sample
+
+
+# -------------------- Watchdog -------------------- #
+class MemoryWatchdog:
+    """Recycle decisions for one page/context; `sampler` returns sample_memory()-style dicts."""
+
+    def __init__(self, max_navigations=RECYCLE_AFTER_NAVIGATIONS, max_renderer_mb=RECYCLE_RSS_MB,
+                 sampler=sample_memory):
+        self.max_navigations = max_navigations
+        self.max_renderer_bytes = max_renderer_mb * MB if max_renderer_mb else 0
+        self.sampler = sampler
+        self.navigations = 0
+        self.context_navigations = 0  # since the context was (re)created
+        self.recycles = {"page": 0, "context": 0}
+        self.peak = {"python": 0, "browser": 0, "renderer": 0}
+        self.last = None
+        _live.add(self)
+
+    def sample(self):
+        self.last = self.sampler()
+        for key, value in self.last.items():
+            if value > self.peak[key]:
+                self.peak[key] = value
+        return self.last
+
+    def note_navigation(self):
+        self.navigations += 1
+        self.context_navigations += 1
+        self.sample()
+
+    def _over_budget(self):
+        if not (self.max_renderer_bytes and self.last and self.last["renderer"] >= self.max_renderer_bytes):
+            return False
+        if self.context_navigations < MIN_CONTEXT_NAVIGATIONS:
+            return False
+        # one shared budget: only the context that grew the most since its last recycle gives way
+        return all(self.context_navigations >= other.context_navigations for other in list(_live))
+
+    def check(self):
+        """Return "context", "page" or None: what to recycle before the next navigation."""
+        if self._over_budget():
+            reason = "context"
+        elif self.max_navigations and self.navigations >= self.max_navigations:
+            reason = "page"
+        else:
+            return None
+        last = self.last or {}
+        logging.info(
+            "♻️ Recycling %s after %d navigations (browser %.0f MB, renderers %.0f MB, python %.0f MB)",
+            reason, self.navigations,
+            last.get("browser", 0) / MB, last.get("renderer", 0) / MB, last.get("python", 0) / MB,
+        )
+        self.recycles[reason] += 1
+        self.navigations = 0
+        if reason == "context":
+            self.context_navigations = 0
+        self.last = None
+        return reason
+
+    def close(self):
+        """Stop competing for the shared budget (the context is gone)."""
+        _live.discard(self)
+
+    def peak_mb(self):
+        return {key: round(value / MB, 1) for key, value in self.peak.items()}
@@ -5,108 +5,50 @@ Daily runner for the WeWorkRemotely Playwright scraper.
 This script:
  - Runs the Playwright-based WWR scraper
  - (Optionally) runs any other scrapers
- - Writes results into jobs.db (SQLite)
- - Designed to be invoked by GitHub Actions workflow:
+ - Streams results into jobs.db (SQLite) and the WWR CSV as they are parsed
+ - Can be invoked manually:
        python -m scraper.weworkremotely_daily
+
+The nightly workflow runs every source at once via scraper.orchestrator.
 """
 
-import sqlite3
+import logging
 import os
 import sys
-from datetime import datetime
-import importlib
-
-DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.db")
-
-
-def ensure_db(path=DB_PATH):
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source TEXT,
-            title TEXT,
-            company TEXT,
-            location TEXT,
-            posted TEXT,
-            salary TEXT,
-            url TEXT UNIQUE,
-            snippet TEXT,
-            scraped_at TEXT
-        )
-        """
-    )
-    conn.commit()
-    return conn
 
+from scraper.config import DB_PATH
+from scraper.sinks import CSVSink, SQLiteSink
 
-def insert_jobs(conn, source, rows):
-    cur = conn.cursor()
-    inserted, skipped = 0, 0
-    now = datetime.utcnow().isoformat()
-    for r in rows:
-        url = r.get("url")
-        if not url:
-            skipped += 1
-            continue
-        try:
-            cur.execute(
-                """
-                INSERT INTO jobs (source, title, company, location, posted, salary, url, snippet, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    source,
-                    r.get("title"),
-                    r.get("company"),
-                    r.get("location"),
-                    r.get("posted") or "",
-                    r.get("salary") or "Not disclosed",
-                    url,
-                    r.get("snippet", "")[:2000] if r.get("snippet") else "",
-                    now,
-                ),
-            )
-            conn.commit()
-            inserted += 1
-        except sqlite3.IntegrityError:
-            skipped += 1
-    return inserted, skipped
 
+def run_weworkremotely_scraper(sinks):
+    """Run the Playwright-based WWR scraper, streaming jobs into `sinks`.
 
-def run_weworkremotely_scraper():
-    """Run the Playwright-based WWR scraper and return a list of job dicts."""
+    Returns the number of jobs scraped.
+    """
     try:
-        mod = importlib.import_module("scraper.weworkremotely_playwright")
-    except Exception as e:
+        # Playwright is only imported when a crawl actually runs
+        from scraper.weworkremotely_playwright import WeWorkRemotelyPlaywright
+    except ImportError as e:
         print("❌ Could not import weworkremotely_playwright:", e, file=sys.stderr)
-        return []
+        return 0
 
     try:
-        cls = getattr(mod, "WeWorkRemotelyPlaywright", None)
-        if cls:
-            crawler = cls(headless=True)
-            return crawler.run()
+        return WeWorkRemotelyPlaywright(headless=True, sinks=sinks).run()
     except Exception as e:
         print("⚠️ Error running WeWorkRemotelyPlaywright:", e, file=sys.stderr)
-
-    print("⚠️ No valid entry point found in weworkremotely_playwright.py")
-    return []
+        return 0
 
 
 def main():
-    conn = ensure_db(DB_PATH)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    db_sink = SQLiteSink(DB_PATH, source="weworkremotely")
+    csv_sink = CSVSink("weworkremotely_playwright_jobs.csv")
     print("🚀 Starting WeWorkRemotely Playwright daily scrape...")
 
-    jobs = run_weworkremotely_scraper()
-    print(f"✅ Scraped {len(jobs)} jobs from WeWorkRemotely")
-
-    inserted, skipped = insert_jobs(conn, "weworkremotely", jobs)
-    conn.close()
+    scraped = run_weworkremotely_scraper([db_sink, csv_sink])
+    print(f"✅ Scraped {scraped} jobs from WeWorkRemotely")
 
-    print(f"🧾 Database updated: {inserted} inserted, {skipped} skipped (duplicates)")
+    print(f"🧾 Database updated: {db_sink.inserted} inserted, {db_sink.skipped} skipped (duplicates)")
     print(f"📁 jobs.db located at: {os.path.abspath(DB_PATH)}")
 
 
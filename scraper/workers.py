@@ -0,0 +1,626 @@
+"""
+scraper/workers.py
+Sharded crawling across CPU cores: one worker process (and one Chromium) per core.
+
+A run expands every query (source + search + location) into one shard per
+result page and puts them in a small SQLite work queue (WORK_QUEUE_PATH).
+Workers lease a shard, fetch and parse that page, and send the jobs back to
+the parent process, which is the only writer to jobs.db (through the usual
+sinks). Leases expire after LEASE_SECONDS, so the pages of a crashed or
+stuck worker are picked up by the others; a shard is retried at most
+SHARD_ATTEMPTS times. An empty page marks the remaining pages of the same
+query as skipped.
+
+Query combinations overlap a lot ("Python"/"Remote" and "Python"/"New York"
+return many of the same jobs). Every card is claimed by (source, job key) in
+the queue as soon as the page's keys are read (Source.key_script); a shard
+only parses and sends the cards nobody claimed before it in the same run. Per combination, the share of unique cards is kept in
+jobs.db (`query_overlap`, moving average over runs) and used next run:
+combinations are leased most-unique first, and redundant ones get fewer
+pages (down to one, which keeps measuring them). Each run reports unique
+jobs per page fetched.
+
+Every shard carries the fingerprint its page had when last parsed (see
+scraper/fingerprints.py). A worker whose page still hashes the same marks
+the shard "unchanged" without parsing it and drops the query's later pages;
+the parent stores the new fingerprints after the run.
+
+Run:
+    python -m scraper crawl --workers 4 [--queries queries.json] [--pages 5]
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue as queue_errors
+import socket
+import sqlite3
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from scraper.config import (
+    CRAWL_WORKERS,
+    DB_PATH,
+    DOWNLOAD_DELAY,
+    LEASE_SECONDS,
+    OVERLAP_DECAY,
+    OVERLAP_FULL_RATIO,
+    SHARD_ATTEMPTS,
+    SINKS,
+    WORK_QUEUE_MAX_AGE_HOURS,
+    WORK_QUEUE_PATH,
+)
+
+Shard = namedtuple("Shard", "id source query location page previous")
+
+# What a fetcher found on a shard's page: `cards` on it, `jobs` parsed from the
+# cards the shard claimed (None when the page was unchanged)
+FetchedPage = namedtuple("FetchedPage", "fingerprint cards jobs")
+
+QUEUE_VERSION = 4
+
+QUEUE_SCHEMA = ["""
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    priority REAL NOT NULL DEFAULT 1.0,  -- expected share of unique cards
+    previous TEXT,  -- page fingerprint from the last run that parsed it
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | unchanged | failed | skipped
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    jobs INTEGER,  -- cards on the page
+    uniq INTEGER,  -- cards this shard claimed first
+    fingerprint TEXT,
+    seconds REAL,
+    UNIQUE (run_id, source, query, location, page)
+)
+""", """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+)
+""", """
+CREATE TABLE IF NOT EXISTS claims (
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    PRIMARY KEY (run_id, source, key)
+) WITHOUT ROWID
+"""]
+
+# Kept in jobs.db: survives the queue being reset every run
+OVERLAP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_overlap (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    cards INTEGER NOT NULL,
+    unique_cards INTEGER NOT NULL,
+    unique_ratio REAL NOT NULL,  -- moving average, OVERLAP_DECAY weight on the latest run
+    updated_at TEXT,
+    PRIMARY KEY (source, query, location)
+)
+"""
+
+# Result batches waiting for the writer, per worker (backpressure on fast workers)
+RESULTS_PER_WORKER = 4
+# Seconds to wait for a worker to exit before killing it
+WORKER_EXIT_TIMEOUT = 30
+
+
+# -------------------- Work queue -------------------- #
+class WorkQueue:
+    """SQLite-backed shard queue shared by the parent and every worker process."""
+
+    def __init__(self, path=WORK_QUEUE_PATH, lease_seconds=LEASE_SECONDS, max_attempts=SHARD_ATTEMPTS,
+                 max_age_hours=WORK_QUEUE_MAX_AGE_HOURS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_age_hours = max_age_hours
+        # autocommit; every state change is one short transaction
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != QUEUE_VERSION:
+            # nothing in the queue outlives a run, so an old layout is simply rebuilt
+            self.conn.execute("DROP TABLE IF EXISTS shards")
+            self.conn.execute("DROP TABLE IF EXISTS claims")
+            self.conn.execute("DROP TABLE IF EXISTS runs")
+            self.conn.execute(f"PRAGMA user_version = {QUEUE_VERSION}")
+        for statement in QUEUE_SCHEMA:
+            self.conn.execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def fill(self, run_id, specs, pages, ratios=None, previous=None):
+        """One shard per (query, page). Returns the shard count.
+
+        Runs that have finished, or started more than WORK_QUEUE_MAX_AGE_HOURS
+        ago, are dropped; runs still going (another crawl sharing the queue)
+        are left alone.
+
+        `ratios` ({QuerySpec: unique share}) sets lease priority and trims the
+        pages of redundant combinations. `previous` ({(source, query,
+        location, page): fingerprint}) lets workers skip unchanged pages.
+        """
+        from scraper.sources import get_source
+
+        ratios, previous = ratios or {}, previous or {}
+        rows = []
+        for spec in specs:
+            source = get_source(spec.source)
+            ratio = ratios.get(spec, 1.0)
+            for page in range(planned_pages(pages or source.max_pages, ratio)):
+                if source.page_url(spec.query, spec.location, page) is None:
+                    break
+                rows.append((run_id, *spec, page, ratio, previous.get((*spec, page))))
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT run_id FROM runs WHERE run_id <> ? AND (finished_at IS NOT NULL OR started_at < ?)",
+            (run_id, now - self.max_age_hours * 3600),
+        )]
+        for table in ("shards", "claims", "runs"):
+            self.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(stale_id,) for stale_id in stale])
+        self.conn.execute("INSERT OR IGNORE INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, now))
+        self.conn.executemany(
+            """
+            INSERT OR IGNORE INTO shards (run_id, source, query, location, page, priority, previous)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        self.conn.execute("COMMIT")
+        return len(rows)
+
+    def finish(self, run_id):
+        """Mark the run finished; the next fill() drops its shards and claims."""
+        self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def lease(self, run_id, owner):
+        """Claim the next pending (or expired) shard for `owner`, or None."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT id, source, query, location, page, previous FROM shards
+                WHERE run_id = ? AND attempts < ?
+                  AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                ORDER BY page, priority DESC, id LIMIT 1
+                """,
+                (run_id, self.max_attempts, now),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE shards SET status = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (owner, now + self.lease_seconds, row[0]),
+                )
+        finally:
+            self.conn.execute("COMMIT")
+        return Shard(*row) if row else None
+
+    def claim(self, run_id, shard, owner, keys):
+        """Claim job keys for `shard`; returns the keys it owns (first come, first served).
+
+        Returns None when `owner` no longer holds an unexpired lease on the
+        shard: another worker may have it by now, so the batch is dropped.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            held = self.conn.execute(
+                "SELECT 1 FROM shards WHERE id = ? AND owner = ? AND status = 'leased' AND lease_until >= ?",
+                (shard.id, owner, time.time()),
+            ).fetchone()
+            if not held:
+                return None
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO claims (run_id, source, key, shard_id) VALUES (?, ?, ?, ?)",
+                [(run_id, shard.source, key, shard.id) for key in keys],
+            )
+            owned = {row[0] for row in self.conn.execute(
+                "SELECT key FROM claims WHERE run_id = ? AND source = ? AND shard_id = ?",
+                (run_id, shard.source, shard.id),
+            )}
+        finally:
+            self.conn.execute("COMMIT")
+        return owned
+
+    def complete(self, shard, owner, jobs, uniq, seconds, fingerprint=None, status="done"):
+        # Only the current lease holder may finish a shard
+        self.conn.execute(
+            """
+            UPDATE shards SET status = ?, jobs = ?, uniq = ?, seconds = ?, fingerprint = ?
+            WHERE id = ? AND owner = ? AND status = 'leased'
+            """,
+            (status, jobs, uniq, seconds, fingerprint, shard.id, owner),
+        )
+
+    def fail(self, shard, owner):
+        self.conn.execute(
+            """
+            UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, owner = NULL
+            WHERE id = ? AND owner = ? AND status = 'leased'
+            """,
+            (self.max_attempts, shard.id, owner),
+        )
+
+    def skip_rest(self, run_id, shard):
+        """The query ran out of results (or new ones) on `shard`: drop its later pages."""
+        self.conn.execute(
+            """
+            UPDATE shards SET status = 'skipped'
+            WHERE run_id = ? AND source = ? AND query = ? AND location = ? AND page > ? AND status = 'pending'
+            """,
+            (run_id, shard.source, shard.query, shard.location, shard.page),
+        )
+
+    def unfinished(self, run_id):
+        """Shards that may still be processed: pending, held, or expired and retryable."""
+        return self.conn.execute(
+            """
+            SELECT count(*) FROM shards
+            WHERE run_id = ? AND (status = 'pending' OR (status = 'leased' AND (lease_until >= ? OR attempts < ?)))
+            """,
+            (run_id, time.time(), self.max_attempts),
+        ).fetchone()[0]
+
+    def summary(self, run_id):
+        stats = {
+            "shards": 0, "done": 0, "unchanged": 0, "failed": 0, "skipped": 0, "unfinished": 0,
+            "jobs": 0, "unique": 0, "page_seconds": 0.0,
+        }
+        for status, count, jobs, uniq, seconds in self.conn.execute(
+            "SELECT status, count(*), sum(jobs), sum(uniq), sum(seconds) FROM shards WHERE run_id = ? GROUP BY status",
+            (run_id,),
+        ):
+            stats["shards"] += count
+            stats[status if status in ("done", "unchanged", "failed", "skipped") else "unfinished"] += count
+            stats["jobs"] += jobs or 0
+            stats["unique"] += uniq or 0
+            stats["page_seconds"] += seconds or 0.0
+        stats["page_seconds"] = round(stats["page_seconds"], 1)
+        fetched = stats["done"] + stats["unchanged"]
+        stats["unique_per_page"] = round(stats["unique"] / fetched, 2) if fetched else 0.0
+        return stats
+
+    def fingerprints(self, run_id):
+        """(parsed, unchanged) pages of this run, as PageFingerprints records them."""
+        parsed, unchanged = [], []
+        for source, query, location, page, status, value, jobs in self.conn.execute(
+            """
+            SELECT source, query, location, page, status, fingerprint, jobs FROM shards
+            WHERE run_id = ? AND status IN ('done', 'unchanged')
+            """,
+            (run_id,),
+        ):
+            if status == "unchanged":
+                unchanged.append((source, query, location, page))
+            elif value is not None:
+                parsed.append((source, query, location, page, value, jobs))
+        return parsed, unchanged
+
+    def combinations(self, run_id):
+        """{QuerySpec: (pages fetched, cards seen, cards claimed)} for this run."""
+        from scraper.scheduler import QuerySpec
+
+        return {
+            QuerySpec(source, query, location): (pages, cards or 0, uniq or 0)
+            for source, query, location, pages, cards, uniq in self.conn.execute(
+                """
+                SELECT source, query, location, count(*), sum(jobs), sum(uniq) FROM shards
+                WHERE run_id = ? AND status = 'done' GROUP BY source, query, location
+                """,
+                (run_id,),
+            )
+        }
+
+
+# -------------------- Overlap statistics -------------------- #
+def planned_pages(pages, ratio):
+    """Pages worth fetching for a combination whose unique share is `ratio`.
+
+    At or above OVERLAP_FULL_RATIO every page; below it proportionally fewer,
+    never less than the first page (which keeps the ratio up to date).
+    """
+    return max(1, min(pages, math.ceil(pages * ratio / OVERLAP_FULL_RATIO)))
+
+
+def load_unique_ratios(conn):
+    from scraper.scheduler import QuerySpec
+
+    conn.execute(OVERLAP_SCHEMA)
+    return {
+        QuerySpec(source, query, location): ratio
+        for source, query, location, ratio in conn.execute(
+            "SELECT source, query, location, unique_ratio FROM query_overlap"
+        )
+    }
+
+
+def record_overlap(conn, combinations, decay=OVERLAP_DECAY):
+    """Fold one run's per-combination counts into query_overlap."""
+    now = datetime.utcnow().isoformat()
+    conn.execute(OVERLAP_SCHEMA)
+    with conn:
+        for spec, (pages, cards, uniq) in combinations.items():
+            if not cards:
+                continue
+            conn.execute(
+                """
+                INSERT INTO query_overlap
+                    (source, query, location, runs, pages, cards, unique_cards, unique_ratio, updated_at)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, query, location) DO UPDATE SET
+                    runs = runs + 1,
+                    pages = pages + excluded.pages,
+                    cards = cards + excluded.cards,
+                    unique_cards = unique_cards + excluded.unique_cards,
+                    unique_ratio = ? * excluded.unique_ratio + (1 - ?) * unique_ratio,
+                    updated_at = excluded.updated_at
+                """,
+                (*spec, pages, cards, uniq, uniq / cards, now, decay, decay),
+            )
+
+
+# -------------------- Fetchers -------------------- #
+class LeaseLost(Exception):
+    """The worker's lease on a shard expired before it claimed the page's cards."""
+
+
+def card_ids(source, raws):
+    """[(index, job key, claim id)] for key_script results; dropped cards are left out."""
+    cards = []
+    for index, raw in enumerate(raws):
+        job = source.build_job(raw)
+        if job:
+            cards.append((index, job.key, job.key or job.url))
+    return cards
+
+
+class BrowserFetcher:
+    """Fetch one listing page per call with the worker's own Chromium."""
+
+    def __init__(self, headless=True):
+        self.headless = headless
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+
+        from scraper.orchestrator import launch_browser, open_context
+        from scraper.watchdog import MemoryWatchdog
+
+        self._playwright = await async_playwright().start()
+        self.browser = await launch_browser(self._playwright, headless=self.headless)
+        self.context, self.page = await open_context(self.browser)
+        self.watchdog = MemoryWatchdog()
+
+    async def fetch(self, source, url, previous=None, claim=None):
+        """FetchedPage for the page at `url`, or None when it did not load.
+
+        Only the card keys are read first. When the fingerprint equals
+        `previous` nothing is parsed (jobs is None). Otherwise `claim(ids)`
+        returns the card ids this shard owns, and only those cards are parsed.
+        """
+        from scraper.fingerprints import fingerprint
+        from scraper.orchestrator import extract_jobs, load_listing, recycle
+
+        reason = self.watchdog.check()
+        if reason:
+            self.context, self.page = await recycle(self.browser, self.context, self.page, reason)
+        loaded = await load_listing(self.page, source, url)
+        self.watchdog.note_navigation()
+        if not loaded:
+            # a page past the last result loads fine but never shows a card
+            try:
+                state = await self.page.evaluate("document.readyState")
+            except Exception:
+                return None
+            return FetchedPage(None, 0, []) if state == "complete" else None
+        cards = card_ids(source, await self.page.eval_on_selector_all(source.card_selector, source.key_script))
+        value = fingerprint([key for _, key, _ in cards])
+        if previous is not None and value == previous:
+            return FetchedPage(value, len(cards), None)
+        if claim is None:
+            wanted = None  # every card
+        else:
+            owned = claim([card_id for _, _, card_id in cards])
+            wanted = [index for index, _, card_id in cards if card_id in owned]
+        jobs = [job async for job in extract_jobs(self.page, source, set(), wanted)] if wanted != [] else []
+        return FetchedPage(value, len(cards), jobs)
+
+    async def close(self):
+        self.watchdog.close()
+        try:
+            await self.browser.close()
+        finally:
+            await self._playwright.stop()
+        logging.info("Peak memory (MB): %s, recycles: %s", self.watchdog.peak_mb(), self.watchdog.recycles)
+
+
+# -------------------- Worker process -------------------- #
+async def work(run_id, results, queue_path, fetcher):
+    from scraper.sources import get_source
+
+    queue = WorkQueue(queue_path)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    pages = 0
+    await fetcher.start()
+    try:
+        while True:
+            shard = queue.lease(run_id, owner)
+            if shard is None:
+                if not queue.unfinished(run_id):
+                    break
+                await asyncio.sleep(1.0)  # other workers hold the rest; their leases may expire
+                continue
+
+            source = get_source(shard.source)
+            url = source.page_url(shard.query, shard.location, shard.page)
+            started = time.monotonic()
+
+            def claim(ids, shard=shard):
+                owned = queue.claim(run_id, shard, owner, ids)
+                if owned is None:
+                    raise LeaseLost(shard.id)
+                return owned
+
+            try:
+                page = await fetcher.fetch(source, url, shard.previous, claim)
+            except LeaseLost:
+                logging.warning("[%s] lease on shard %d expired, dropping the page", owner, shard.id)
+                continue
+            except Exception as e:
+                logging.warning("[%s] shard %d failed: %s", owner, shard.id, e)
+                page = None
+            if page is None:
+                queue.fail(shard, owner)
+                continue
+
+            seconds = round(time.monotonic() - started, 2)
+            if page.jobs is None:
+                queue.skip_rest(run_id, shard)
+                queue.complete(shard, owner, None, 0, seconds, page.fingerprint, "unchanged")
+                pages += 1
+                logging.info("[%s] %s p%d: unchanged since the last run", owner, shard.source, shard.page)
+                await asyncio.sleep(DOWNLOAD_DELAY)
+                continue
+
+            if page.jobs:
+                results.put(page.jobs)
+            if not page.cards:
+                queue.skip_rest(run_id, shard)
+            queue.complete(shard, owner, page.cards, len(page.jobs), seconds, page.fingerprint)
+            pages += 1
+            logging.info("[%s] %s p%d: %d cards, %d unique parsed", owner, shard.source, shard.page, page.cards, len(page.jobs))
+            await asyncio.sleep(DOWNLOAD_DELAY)
+    finally:
+        await fetcher.close()
+        queue.close()
+    logging.info("[%s] worker finished after %d pages", owner, pages)
+
+
+def worker_main(run_id, results, queue_path, fetcher_cls, headless):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(work(run_id, results, queue_path, fetcher_cls(headless=headless)))
+    finally:
+        results.put(None)  # tell the writer this worker is done
+
+
+# -------------------- Writer (parent process) -------------------- #
+def write_results(results, sinks, processes):
+    """Drain job batches into the sinks until every worker has finished."""
+    finished, written = 0, 0
+    while finished < len(processes):
+        try:
+            batch = results.get(timeout=1.0)
+        except queue_errors.Empty:
+            if not any(p.is_alive() for p in processes):
+                break  # workers died without saying goodbye
+            continue
+        if batch is None:
+            finished += 1
+            continue
+        for job in batch:
+            for sink in sinks:
+                sink.write(job)
+        written += len(batch)
+    return written
+
+
+def stop_workers(processes, timeout=WORKER_EXIT_TIMEOUT):
+    """Join the workers, killing those still running after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    for p in processes:
+        p.join(max(0.0, deadline - time.monotonic()))
+        if p.is_alive():
+            logging.warning("%s did not exit, killing it", p.name)
+            p.kill()
+            p.join()
+
+
+def run_sharded(specs, workers=None, pages=None, sinks=None, headless=True,
+                queue_path=WORK_QUEUE_PATH, fetcher_cls=BrowserFetcher, db_path=DB_PATH, refresh=False):
+    """Crawl `specs` (QuerySpecs) with a pool of worker processes; returns run stats.
+
+    `refresh` parses every page even when its fingerprint is unchanged.
+    """
+    from scraper.db import ensure_db
+    from scraper.fingerprints import PageFingerprints
+    from scraper.sinks import build_sinks
+
+    workers = workers or CRAWL_WORKERS or os.cpu_count() or 1
+    sinks = build_sinks(SINKS, db_path) if sinks is None else sinks
+    run_id = uuid.uuid4().hex
+
+    conn = ensure_db(db_path)
+    ratios = load_unique_ratios(conn)
+    fingerprints = PageFingerprints(conn, refresh=refresh)
+    queue = WorkQueue(queue_path)
+    total = queue.fill(run_id, specs, pages, ratios, fingerprints.load())
+    trimmed = sum(1 for spec in specs if ratios.get(spec, 1.0) < OVERLAP_FULL_RATIO)
+    workers = max(1, min(workers, total))
+    logging.info(
+        "🧩 Run %s: %d shards from %d queries (%d trimmed as redundant), %d workers",
+        run_id, total, len(specs), trimmed, workers,
+    )
+
+    # spawn: Playwright's driver and threads do not survive fork()
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue(maxsize=workers * RESULTS_PER_WORKER)
+    processes = [
+        ctx.Process(
+            target=worker_main,
+            args=(run_id, results, queue_path, fetcher_cls, headless),
+            name=f"worker-{i}",
+        )
+        for i in range(workers)
+    ]
+    started = time.monotonic()
+    for p in processes:
+        p.start()
+    try:
+        written = write_results(results, sinks, processes)
+    except BaseException:
+        # nobody drains `results` any more: workers blocked on put() would never exit
+        for p in processes:
+            p.terminate()
+        raise
+    finally:
+        for sink in sinks:
+            sink.close()
+        stop_workers(processes)
+
+    queue.finish(run_id)
+    stats = queue.summary(run_id)
+    record_overlap(conn, queue.combinations(run_id))
+    parsed, unchanged = queue.fingerprints(run_id)
+    fingerprints.record_parsed(parsed)
+    fingerprints.record_unchanged(unchanged)
+    queue.close()
+    conn.close()
+    elapsed = time.monotonic() - started
+    stats.update(
+        run_id=run_id,
+        workers=workers,
+        trimmed=trimmed,
+        written=written,
+        seconds=round(elapsed, 1),
+        pages_per_minute=round((stats["done"] + stats["unchanged"]) * 60 / elapsed, 1) if elapsed else 0.0,
+    )
+    logging.info("✅ Sharded crawl finished: %s", stats)
+    return stats
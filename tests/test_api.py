@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from scraper.api import create_app  # noqa: E402
+from scraper.db import ensure_db, insert_jobs  # noqa: E402
+
+
+def indeed_job(i):
+    return {"key": f"jk{i}", "title": f"Engineer {i}", "company": "Acme", "url": f"https://www.indeed.com/viewjob?jk=jk{i}"}
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    conn = ensure_db(path)
+    insert_jobs(conn, "indeed", [indeed_job(i) for i in range(5)])
+    yield path, conn
+    conn.close()
+
+
+def with_client(path, test):
+    async def run():
+        async with TestClient(TestServer(create_app(path, pool_size=2))) as client:
+            await test(client)
+
+    asyncio.run(run())
+
+
+def test_keyset_pagination_walks_every_job_once(db):
+    path, _ = db
+
+    async def test(client):
+        ids, after = [], ""
+        while True:
+            response = await client.get(f"/jobs?limit=2{after}")
+            assert response.status == 200
+            page = await response.json()
+            ids += [job["id"] for job in page["jobs"]]
+            if page["next"] is None:
+                break
+            after = f"&after={page['next']}"
+        assert ids == [5, 4, 3, 2, 1]
+
+    with_client(path, test)
+
+
+def test_if_none_match_gets_304_until_data_changes(db):
+    path, conn = db
+
+    async def test(client):
+        first = await client.get("/jobs")
+        etag = first.headers["ETag"]
+        again = await client.get("/jobs", headers={"If-None-Match": etag})
+        assert again.status == 304
+        assert again.headers["ETag"] == etag
+
+        insert_jobs(conn, "indeed", [indeed_job(9)])
+        changed = await client.get("/jobs", headers={"If-None-Match": etag})
+        assert changed.status == 200
+        assert changed.headers["ETag"] != etag
+        assert (await changed.json())["jobs"][0]["key"] == "jk9"
+
+    with_client(path, test)
+
+
+def test_unknown_jobs_are_404(db):
+    path, _ = db
+
+    async def test(client):
+        for url in ("/jobs/999", "/jobs/abc", "/jobs/indeed/nope", "/jobs/nosuchsource/jk1"):
+            assert (await client.get(url)).status == 404, url
+        assert (await client.get("/jobs?limit=x")).status == 400
+
+    with_client(path, test)
+
+
+def test_lookup_by_key_finds_rows_inserted_through_the_view(db):
+    path, conn = db
+    with conn:
+        conn.execute(
+            "INSERT INTO jobs (source, title, company, url) VALUES (?, ?, ?, ?)",
+            ("weworkremotely", "Go dev", "Acme", "https://weworkremotely.com/remote-jobs/acme-go-dev"),
+        )
+    # dicts without a key get the one their source derives from the url
+    insert_jobs(conn, "indeed", [{"title": "No key", "url": "https://www.indeed.com/viewjob?jk=derived1"}])
+
+    async def test(client):
+        response = await client.get("/jobs/weworkremotely/acme-go-dev")
+        assert response.status == 200
+        assert (await response.json())["title"] == "Go dev"
+        response = await client.get("/jobs/indeed/derived1")
+        assert (await response.json())["title"] == "No key"
+
+    with_client(path, test)
+
+
+def test_paths_that_look_like_uri_syntax(tmp_path):
+    path = str(tmp_path / "100% #1?.db")
+    conn = ensure_db(path)
+    insert_jobs(conn, "indeed", [indeed_job(1)])
+    conn.close()
+
+    async def test(client):
+        response = await client.get("/jobs/indeed/jk1")
+        assert response.status == 200
+
+    with_client(path, test)
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from scraper.cli import main
+from scraper.db import JOBS_SCHEMA, ensure_db, insert_jobs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("playwright", "asyncio", "pyarrow", "aiohttp")
+
+
+def python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=30)
+
+
+def test_importing_the_cli_loads_no_heavy_dependency():
+    result = python("-c", f"""
+import sys
+import scraper.cli
+print(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r})))
+""")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["stats"], ["query", "--search", "python"]])
+def test_fast_commands_load_no_heavy_dependency(tmp_path, argv):
+    """What keeps `--help`, `stats` and `query` well under 100 ms: none of them imports a heavy module."""
+    path = str(tmp_path / "jobs.db")
+    ensure_db(path).close()
+    result = python("-c", f"""
+import sys
+from scraper.cli import main
+try:
+    main({["--db", path, *argv]!r})
+except SystemExit:
+    pass
+print(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r})))
+""")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+@pytest.mark.parametrize("command", ["query", "stats"])
+def test_read_commands_do_not_create_a_missing_db(tmp_path, command):
+    path = tmp_path / "jobs.db"
+    with pytest.raises(SystemExit) as exc:
+        main(["--db", str(path), command])
+    assert "not found" in str(exc.value.code)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize("command", ["query", "stats"])
+def test_read_commands_do_not_migrate(tmp_path, command):
+    path = str(tmp_path / "jobs.db")
+    conn = sqlite3.connect(path)
+    conn.execute(JOBS_SCHEMA)
+    conn.close()
+    with pytest.raises(SystemExit):
+        main(["--db", path, command, *(["--min-salary", "1"] if command == "query" else [])])
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+
+
+def test_query_and_stats_read_the_db(tmp_path, capsys):
+    path = str(tmp_path / "jobs.db")
+    conn = ensure_db(path)
+    insert_jobs(conn, "indeed", [{"key": "a1", "title": "Python Dev", "company": "Acme", "url": "https://x/1",
+                                  "salary": "$150,000 a year"}])
+    conn.close()
+
+    main(["--db", path, "query", "--min-salary", "100000", "--format", "csv"])
+    assert "Python Dev" in capsys.readouterr().out
+    main(["--db", path, "stats"])
+    assert "jobs: 1" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+import sqlite3
+
+from scraper.db import MIGRATIONS, _canonical_dimensions, canonical_name, ensure_db, insert_jobs, migrate
+from scraper.records import JobRecord
+
+
+def company_rows(conn):
+    return conn.execute("SELECT name FROM companies ORDER BY name").fetchall()
+
+
+def test_python_and_view_inserts_share_dimension_rows(tmp_path):
+    conn = ensure_db(str(tmp_path / "jobs.db"))
+    insert_jobs(conn, "indeed", [
+        JobRecord(source="indeed", key="a", company=" Acme   Corp ", location="New  York", url="https://x/a"),
+    ])
+    conn.execute(
+        "INSERT INTO jobs (source, title, company, location, url) VALUES ('indeed', 't', 'Acme\tCorp', ' New York', 'https://x/b')"
+    )
+    assert company_rows(conn) == [("Acme Corp",)]
+    assert conn.execute("SELECT count(*) FROM locations").fetchone()[0] == 1
+    assert conn.execute("SELECT DISTINCT company, location FROM jobs").fetchall() == [("Acme Corp", "New York")]
+
+    # the cached id from the Python path still points at the shared row
+    insert_jobs(conn, "indeed", [JobRecord(source="indeed", key="c", company="Acme Corp", url="https://x/c")])
+    assert conn.execute("SELECT count(DISTINCT company_id) FROM postings").fetchone()[0] == 1
+
+
+def test_migration_merges_names_stored_by_the_old_trigger(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    conn = ensure_db(path)
+    # what the trim()-only trigger left behind: inner whitespace kept, whitespace-only names stored
+    conn.execute("INSERT INTO companies (name) VALUES ('Acme Corp'), ('Acme   Corp'), ('  ')")
+    ids = dict(conn.execute("SELECT name, id FROM companies"))
+    conn.executemany(
+        "INSERT INTO postings (source, url, company_id) VALUES ('indeed', ?, ?)",
+        [("https://x/1", ids["Acme Corp"]), ("https://x/2", ids["Acme   Corp"]), ("https://x/3", ids["  "])],
+    )
+    conn.execute(f"PRAGMA user_version = {MIGRATIONS.index(_canonical_dimensions)}")  # re-run it
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(path)  # a plain connection: migrate() registers the functions itself
+    migrate(conn)
+    assert company_rows(conn) == [("Acme Corp",)]
+    assert conn.execute("SELECT url, company FROM jobs ORDER BY url").fetchall() == [
+        ("https://x/1", "Acme Corp"), ("https://x/2", "Acme Corp"), ("https://x/3", None),
+    ]
+
+
+def test_canonical_name():
+    assert canonical_name("  Acme \n Corp ") == "Acme Corp"
+    assert canonical_name("   ") is None
+    assert canonical_name(None) is None
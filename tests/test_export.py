@@ -0,0 +1,53 @@
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from scraper.db import ensure_db, insert_jobs  # noqa: E402
+from scraper.export import export_parquet  # noqa: E402
+
+
+def jobs(start, count):
+    return [{"key": f"jk{i}", "title": f"Engineer {i}", "url": f"https://www.indeed.com/viewjob?jk=jk{i}"}
+            for i in range(start, start + count)]
+
+
+def exported_ids(out_dir):
+    return sorted(pq.read_table(out_dir, columns=["id"]).column("id").to_pylist())
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    conn = ensure_db(path)
+    yield path, conn
+    conn.close()
+
+
+def test_incremental_runs_export_new_rows_once(db, tmp_path):
+    path, conn = db
+    out = str(tmp_path / "exports" / "jobs")
+    insert_jobs(conn, "indeed", jobs(0, 3))
+    assert export_parquet(path, out)[0] == 3
+    assert export_parquet(path, out)[0] == 0
+    insert_jobs(conn, "indeed", jobs(3, 2))
+    assert export_parquet(path, out)[0] == 2
+    assert exported_ids(out) == [1, 2, 3, 4, 5]
+
+
+def test_full_export_replaces_the_incremental_parts(db, tmp_path):
+    path, conn = db
+    out = str(tmp_path / "exports" / "jobs")
+    insert_jobs(conn, "indeed", jobs(0, 3))
+    export_parquet(path, out)
+    insert_jobs(conn, "indeed", jobs(3, 2))
+    export_parquet(path, out)
+
+    rows, files = export_parquet(path, out, full=True)
+    assert rows == 5
+    assert exported_ids(out) == [1, 2, 3, 4, 5]
+    assert all(f.startswith(out) and f.endswith("part-00000001-00000005.parquet") for f in files)
+    assert sorted(p.name for p in (tmp_path / "exports").iterdir()) == ["jobs"]  # no staging left behind
+
+    insert_jobs(conn, "indeed", jobs(5, 1))
+    assert export_parquet(path, out)[0] == 1  # the watermark carries on from the full export
+    assert exported_ids(out) == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from scraper import fingerprints
+from scraper.fingerprints import PageFingerprints, fingerprint
+
+PAGE = ("indeed", "python", "Remote", 0)
+
+
+class Clock:
+    now = datetime(2025, 10, 1, 2, 0)
+
+
+class FakeDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return Clock.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(fingerprints, "datetime", FakeDatetime)
+    Clock.now = datetime(2025, 10, 1, 2, 0)
+    return Clock
+
+
+def store(ttl_hours=72, **options):
+    return PageFingerprints(sqlite3.connect(":memory:"), ttl_hours=ttl_hours, **options)
+
+
+def row(store):
+    return store.conn.execute("SELECT fingerprint, parsed_at, checked_at, skips FROM page_fingerprints").fetchone()
+
+
+def test_fingerprint_depends_on_keys_and_their_order():
+    assert fingerprint([]) is None
+    assert fingerprint(["", None]) is None
+    assert fingerprint(["a", "b"]) == fingerprint(["a", "", "b"])
+    assert fingerprint(["a", "b"]) != fingerprint(["b", "a"])
+
+
+def test_unchanged_only_for_the_stored_value(clock):
+    pages = store()
+    pages.record_parsed([(*PAGE, "abc", 10), (*PAGE[:3], 1, None, 0)])
+    assert pages.conn.execute("SELECT count(*) FROM page_fingerprints").fetchone()[0] == 1
+
+    assert not pages.unchanged(*PAGE, "other")
+    assert not pages.unchanged(*PAGE, None)
+    assert not pages.unchanged(*PAGE[:3], 1, "abc")
+    assert row(pages)[3] == 0
+
+    clock.now += timedelta(hours=1)
+    assert pages.unchanged(*PAGE, "abc")
+    assert row(pages) == ("abc", "2025-10-01T02:00:00", "2025-10-01T03:00:00", 1)
+    assert pages.load() == {PAGE: "abc"}
+
+
+def test_expiry_boundary(clock):
+    pages = store(ttl_hours=72)
+    pages.record_parsed([(*PAGE, "abc", 10)])
+    clock.now += timedelta(hours=72)
+    assert pages.unchanged(*PAGE, "abc")  # exactly at the TTL: still trusted
+    clock.now += timedelta(seconds=1)
+    assert not pages.unchanged(*PAGE, "abc")
+    assert pages.load() == {}
+
+
+def test_skipping_does_not_extend_trust(clock):
+    pages = store(ttl_hours=72)
+    pages.record_parsed([(*PAGE, "abc", 10)])
+    clock.now += timedelta(hours=48)
+    pages.record_unchanged([PAGE])
+    assert row(pages)[1:] == ("2025-10-01T02:00:00", "2025-10-03T02:00:00", 1)
+    clock.now += timedelta(hours=25)
+    assert not pages.unchanged(*PAGE, "abc")
+
+
+def test_default_ttl_skips_daily_runs(clock):
+    """With the default TTL, an unchanged page is skipped by the two daily runs after a full parse."""
+    pages = PageFingerprints(sqlite3.connect(":memory:"))
+    skipped = []
+    for day in range(6):
+        clock.now = datetime(2025, 10, 1 + day, 2, 0)
+        if pages.unchanged(*PAGE, "abc"):
+            skipped.append(day)
+        else:
+            clock.now += timedelta(minutes=5)  # parsing takes a while
+            pages.record_parsed([(*PAGE, "abc", 10)])
+    assert skipped == [1, 2, 4, 5]
+
+
+def test_default_ttl_is_not_a_multiple_of_a_day():
+    assert 24 < fingerprints.PAGE_FINGERPRINT_TTL_HOURS
+    assert fingerprints.PAGE_FINGERPRINT_TTL_HOURS % 24
+
+
+def test_refresh_and_zero_ttl_never_skip(clock):
+    for pages in (store(refresh=True), store(ttl_hours=0)):
+        pages.record_parsed([(*PAGE, "abc", 10)])
+        assert not pages.unchanged(*PAGE, "abc")
+        assert pages.load() == {}
+
+
+def test_crawls_share_the_store_from_threads(clock):
+    """crawl_source calls it through asyncio.to_thread; concurrent crawls share one connection."""
+    pages = PageFingerprints(sqlite3.connect(":memory:", check_same_thread=False), ttl_hours=60)
+
+    async def crawl(query):
+        page = ("indeed", query, "Remote", 0)
+        assert not await asyncio.to_thread(pages.unchanged, *page, "abc")
+        await asyncio.to_thread(pages.record_parsed, [(*page, "abc", 10)])
+        return await asyncio.to_thread(pages.unchanged, *page, "abc")
+
+    async def run():
+        return await asyncio.gather(*(crawl(f"q{i}") for i in range(20)))
+
+    assert asyncio.run(run()) == [True] * 20
+    assert pages.conn.execute("SELECT count(*), sum(skips) FROM page_fingerprints").fetchone() == (20, 20)
@@ -0,0 +1,22 @@
+import pickle
+import sys
+
+from scraper.records import JobRecord, as_record
+
+
+def test_none_source_and_location_become_empty():
+    record = JobRecord(None, "k1", location=None)
+    assert (record.source, record.location) == ("", "")
+
+
+def test_pickled_records_are_interned_again():
+    location = "".join(["New York", ", NY"])  # not the interned object
+    record = pickle.loads(pickle.dumps(JobRecord("indeed", "k1", location=location, url="https://x/1")))
+    assert record == JobRecord("indeed", "k1", location="New York, NY", url="https://x/1")
+    assert record.location is sys.intern("New York, NY")
+
+
+def test_dicts_without_a_key_get_the_source_key():
+    record = as_record({"url": "https://www.indeed.com/viewjob?jk=abc&from=serp"}, "indeed")
+    assert record.key == "abc"
+    assert as_record({"url": "https://x/1"}, "nosuchsource").key == ""
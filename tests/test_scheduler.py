@@ -0,0 +1,113 @@
+import asyncio
+import random
+import sqlite3
+
+from scraper.db import ensure_db, insert_jobs, job_known
+from scraper.scheduler import QuerySpec, Scheduler, SimulatedClock
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+class FakeCrawl:
+    """crawl(spec) that takes `duration` simulated seconds and reports `yields[query](now)` new jobs."""
+
+    def __init__(self, clock, yields, duration=600.0):
+        self.clock, self.yields, self.duration = clock, yields, duration
+        self.active = self.peak = 0
+
+    async def __call__(self, spec):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.clock.sleep(self.duration)
+            return {"new": self.yields[spec.query](self.clock.now())}
+        finally:
+            self.active -= 1
+
+
+def simulate(yields, days, max_concurrent=2, conn=None, clock=None):
+    clock = clock or SimulatedClock()
+    crawl = FakeCrawl(clock, yields)
+    specs = [QuerySpec("indeed", query, "Remote") for query in yields]
+    scheduler = Scheduler(specs, crawl, clock=clock, conn=conn, max_concurrent=max_concurrent, rng=random.Random(7))
+    asyncio.run(scheduler.run(until=clock.now() + days * DAY))
+    return scheduler, crawl
+
+
+def intervals(scheduler, query):
+    return [interval for _, spec, _, interval in scheduler.history if spec.query == query]
+
+
+def test_never_runs_more_crawls_than_the_cap():
+    yields = {f"q{i}": (lambda now: 10) for i in range(8)}
+    scheduler, crawl = simulate(yields, days=3)
+    assert crawl.peak == 2
+    # 8 queries due at once queue up behind the semaphore instead of running together
+    starts = sorted(started for started, *_ in scheduler.history)
+    assert len(starts) > 8
+
+
+def test_intervals_follow_the_yield_of_new_postings():
+    yields = {
+        "busy": lambda now: 40,
+        "quiet": lambda now: 0,
+        # busy on day one, dead afterwards
+        "burst": lambda now: 40 if now < DAY else 0,
+    }
+    scheduler, _ = simulate(yields, days=10)
+
+    busy = intervals(scheduler, "busy")
+    assert busy == sorted(busy, reverse=True)
+    assert busy[-1] == scheduler.min_interval
+
+    quiet = intervals(scheduler, "quiet")
+    assert quiet == sorted(quiet)
+    assert quiet[-1] == scheduler.max_interval
+
+    burst = intervals(scheduler, "burst")
+    low = burst.index(min(burst))
+    assert burst[low] < scheduler.default_interval
+    assert burst[-1] > burst[low] * 4
+    # busy queries are revisited far more often than quiet ones
+    assert len(busy) > 5 * len(quiet)
+
+
+def test_restart_resumes_saved_intervals():
+    conn = sqlite3.connect(":memory:")
+    clock = SimulatedClock()
+    yields = {"quiet": lambda now: 0}
+    first, _ = simulate(yields, days=2, conn=conn, clock=clock)
+    state = first.states[0]
+
+    again = Scheduler([state.spec], None, clock=clock, conn=conn)
+    assert (again.states[0].interval, again.states[0].next_run) == (state.interval, state.next_run)
+
+
+JOB_KEYS = [f"jk{i:02d}" for i in range(15)]  # a page worth more than the target of new jobs
+
+
+def test_same_jobs_under_new_session_params_are_not_new(tmp_path):
+    """Indeed hands out fresh bb=/xkcb= params per visit; the jobs behind them are the same."""
+    conn = ensure_db(str(tmp_path / "jobs.db"))
+    visits = iter(range(10**6))
+
+    def fetch():
+        visit = next(visits)
+        return [{"title": f"Job {jk}", "url": f"https://www.indeed.com/rc/clk?jk={jk}&bb=s{visit}&xkcb=x{visit}"}
+                for jk in JOB_KEYS]
+
+    def crawl_page(now):
+        jobs = fetch()
+        new = sum(not job_known(conn, "indeed", job["url"]) for job in jobs)
+        insert_jobs(conn, "indeed", jobs)
+        return new
+
+    scheduler, _ = simulate({"python": crawl_page}, days=10)
+    seen = intervals(scheduler, "python")
+    # only the first visit finds new jobs; by url every visit would and the interval would collapse
+    assert seen[0] < scheduler.default_interval
+    assert seen[1:] == sorted(seen[1:])
+    assert seen[-1] == scheduler.max_interval
+    assert conn.execute("SELECT count(DISTINCT job_key) FROM postings").fetchone()[0] == len(JOB_KEYS)
+    conn.close()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+
+from scraper.records import JobRecord
+from scraper.sinks import CSVSink, Pipeline, RecentURLs, Sink
+
+
+def job(i):
+    return JobRecord(source="indeed", key=f"k{i}", title=f"t{i}", url=f"https://example.com/{i}")
+
+
+class RecordingSink(Sink):
+    def __init__(self, fail_close=False):
+        super().__init__(batch_size=1000, flush_interval=60)
+        self.rows, self.threads, self.closed = [], set(), False
+        self.fail_close = fail_close
+
+    def write(self, job):
+        self.threads.add(threading.get_ident())
+        super().write(job)
+
+    def write_batch(self, jobs):
+        self.rows.extend(jobs)
+
+    def close(self):
+        super().close()
+        self.closed = True
+        if self.fail_close:
+            raise OSError("disk full")
+
+
+def test_recent_urls_keeps_only_the_window():
+    seen = RecentURLs(maxsize=3)
+    for i in range(5):
+        seen.add(f"u{i}")
+    assert len(seen) == 3
+    assert "u0" not in seen and "u1" not in seen
+    assert all(f"u{i}" in seen for i in (2, 3, 4))
+
+
+def test_csv_sink_skips_recent_urls_across_reopen(tmp_path):
+    path = str(tmp_path / "jobs.csv")
+    with CSVSink(path) as sink:
+        for i in range(3):
+            sink.write(job(i))
+    with CSVSink(path, dedupe_window=2) as sink:
+        for i in (1, 2, 0, 3):
+            sink.write(job(i))
+    # url 0 fell out of the 2-url window, 1 and 2 are still remembered
+    assert sink.skipped == 2
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "title,company,location,posted,salary,url"
+    assert [line.rsplit("/", 1)[1] for line in lines[1:]] == ["0", "1", "2", "0", "3"]
+
+
+def test_pipeline_writes_off_the_event_loop_thread():
+    sink = RecordingSink()
+
+    async def run():
+        async with Pipeline([sink], maxsize=10) as pipeline:
+            for i in range(25):
+                await pipeline.put(job(i))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert [j.key for j in sink.rows] == [f"k{i}" for i in range(25)]
+    assert loop_thread not in sink.threads
+
+
+def test_pipeline_close_closes_every_sink_and_raises_the_first_error():
+    failing, ok = RecordingSink(fail_close=True), RecordingSink()
+
+    async def run():
+        async with Pipeline([failing, ok]) as pipeline:
+            await pipeline.put(job(1))
+
+    with pytest.raises(OSError, match="disk full"):
+        asyncio.run(run())
+    assert failing.closed and ok.closed
+    assert [j.key for j in ok.rows] == ["k1"]
@@ -0,0 +1,93 @@
+from functools import partial
+
+import pytest
+
+from scraper import watchdog
+from scraper.watchdog import MB, MIN_CONTEXT_NAVIGATIONS, MemoryWatchdog, sample_memory
+
+ROOT = 100
+
+
+class FakeProc:
+    """A /proc tree on disk: python root -> chrome browser -> gpu + renderer."""
+
+    def __init__(self, path):
+        self.path = path
+        self.add(ROOT, 1, "python -m scraper", 60 * MB)
+        self.add(101, ROOT, "/opt/chrome/chrome --headless", 700 * MB)
+        self.add(102, 101, "/opt/chrome/chrome --type=gpu-process", 400 * MB)
+        self.add(103, 101, "/opt/chrome/chrome --type=renderer", 100 * MB)
+        self.add(200, 1, "/opt/chrome/chrome --type=renderer", 900 * MB)  # someone else's browser
+
+    def add(self, pid, ppid, cmdline, rss):
+        d = self.path / str(pid)
+        d.mkdir(exist_ok=True)
+        (d / "stat").write_bytes(f"{pid} (some proc) S {ppid} 1 1 0".encode())
+        (d / "cmdline").write_bytes(cmdline.replace(" ", "\0").encode())
+        self.set_rss(pid, rss)
+
+    def set_rss(self, pid, rss):
+        (self.path / str(pid) / "status").write_bytes(f"Name:\tx\nVmRSS:\t{rss // 1024} kB\n".encode())
+
+    def watchdog(self, max_renderer_mb=500):
+        return MemoryWatchdog(
+            max_navigations=0, max_renderer_mb=max_renderer_mb,
+            sampler=partial(sample_memory, ROOT, proc=str(self.path)),
+        )
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(watchdog, "psutil", None)
+    return FakeProc(tmp_path)
+
+
+def navigate(dog, times=1):
+    reasons = []
+    for _ in range(times):
+        reasons.append(dog.check())
+        dog.note_navigation()
+    return reasons
+
+
+def test_sample_memory_walks_only_our_process_tree(proc):
+    assert sample_memory(ROOT, proc=str(proc.path)) == {
+        "python": 60 * MB, "browser": 1200 * MB, "renderer": 100 * MB,
+    }
+
+
+def test_shared_browser_and_gpu_memory_never_recycles_the_context(proc):
+    dog = proc.watchdog(max_renderer_mb=500)  # browser tree alone is 1200 MB
+    assert navigate(dog, 50).count("context") == 0
+
+
+def test_renderer_growth_recycles_once_then_waits(proc):
+    dog = proc.watchdog(max_renderer_mb=500)
+    navigate(dog, MIN_CONTEXT_NAVIGATIONS)
+    proc.set_rss(103, 600 * MB)
+    dog.note_navigation()
+    assert dog.check() == "context"
+
+    # the new context's renderer is still over budget: no recycle loop
+    reasons = navigate(dog, MIN_CONTEXT_NAVIGATIONS)
+    assert reasons.count("context") == 0
+    assert dog.check() == "context"
+    assert dog.recycles["context"] == 2
+    dog.close()
+
+
+def test_contexts_sharing_a_browser_recycle_the_busiest_one(proc):
+    quiet, busy = proc.watchdog(), proc.watchdog()
+    navigate(quiet, MIN_CONTEXT_NAVIGATIONS)
+    navigate(busy, MIN_CONTEXT_NAVIGATIONS * 3)
+    proc.set_rss(103, 600 * MB)
+    quiet.note_navigation()
+    busy.note_navigation()
+
+    assert quiet.check() is None
+    assert busy.check() == "context"
+    # once the busy context is fresh, the quiet one is the biggest consumer left
+    assert quiet.check() == "context"
+
+    busy.close()
+    quiet.close()
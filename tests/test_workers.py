@@ -0,0 +1,199 @@
+import asyncio
+import time
+
+import pytest
+
+from scraper import workers
+from scraper.records import JobRecord
+from scraper.scheduler import QuerySpec
+from scraper.sources import get_source
+from scraper.workers import FetchedPage, WorkQueue, card_ids, work
+
+SPECS = [QuerySpec("indeed", "python", "Remote"), QuerySpec("indeed", "python", "New York, NY")]
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(lease_seconds=300, run_id="run", specs=SPECS, max_attempts=3):
+        queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=lease_seconds, max_attempts=max_attempts)
+        queue.fill(run_id, specs, pages=1)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def shard_row(queue, shard):
+    return queue.conn.execute("SELECT status, owner, attempts FROM shards WHERE id = ?", (shard.id,)).fetchone()
+
+
+def test_expired_lease_goes_to_another_worker(make_queue):
+    queue = make_queue(lease_seconds=0.05)
+    first = queue.lease("run", "a")
+    time.sleep(0.1)
+    again = queue.lease("run", "b")
+    assert again.id == first.id
+    assert shard_row(queue, again) == ("leased", "b", 2)
+
+    # the worker that lost the lease can neither claim nor finish the shard
+    assert queue.claim("run", first, "a", ["k1", "k2"]) is None
+    queue.complete(first, "a", 2, 2, 1.0)
+    assert shard_row(queue, again) == ("leased", "b", 2)
+
+    assert queue.claim("run", again, "b", ["k1", "k2"]) == {"k1", "k2"}
+    queue.complete(again, "b", 2, 2, 1.0)
+    assert shard_row(queue, again)[0] == "done"
+
+
+def test_shard_is_not_leased_again_after_max_attempts(make_queue):
+    queue = make_queue(lease_seconds=0.01, specs=SPECS[:1], max_attempts=2)
+    assert queue.lease("run", "a") is not None
+    time.sleep(0.02)
+    assert queue.lease("run", "b") is not None
+    time.sleep(0.02)
+    assert queue.lease("run", "c") is None
+    assert queue.unfinished("run") == 0
+
+
+def test_overlapping_shards_claim_each_key_once(make_queue):
+    queue = make_queue()
+    a, b = queue.lease("run", "a"), queue.lease("run", "b")
+    assert a.id != b.id
+
+    assert queue.claim("run", a, "a", ["k1", "k2", "k3"]) == {"k1", "k2", "k3"}
+    assert queue.claim("run", b, "b", ["k2", "k3", "k4"]) == {"k4"}
+    # claiming again (a retried batch) returns the same keys
+    assert queue.claim("run", a, "a", ["k1", "k2", "k3"]) == {"k1", "k2", "k3"}
+
+
+def test_worker_cannot_claim_for_a_shard_leased_by_someone_else(make_queue):
+    queue = make_queue()
+    a = queue.lease("run", "a")
+    assert queue.claim("run", a, "b", ["k1"]) is None
+    assert queue.claim("run", a, "a", ["k1"]) == {"k1"}
+
+
+def test_fill_keeps_runs_that_are_still_going(make_queue):
+    first = make_queue(run_id="first")
+    second = make_queue(run_id="second")
+    assert first.lease("first", "a") is not None
+    assert second.unfinished("first") == 2
+
+    first.finish("first")
+    make_queue(run_id="third")
+    assert second.unfinished("first") == 0
+    assert second.unfinished("second") == 2
+
+
+def test_fill_drops_runs_older_than_the_cutoff(make_queue):
+    first = make_queue(run_id="abandoned")
+    first.conn.execute("UPDATE runs SET started_at = started_at - 25 * 3600")
+    make_queue(run_id="next")
+    assert first.unfinished("abandoned") == 0
+    assert first.conn.execute("SELECT run_id FROM runs").fetchall() == [("next",)]
+
+
+class FakeFetcher:
+    """Claims a page's card ids before "parsing", like BrowserFetcher; records what it parsed."""
+
+    def __init__(self, pages, lose_lease=False):
+        self.pages, self.lose_lease = pages, lose_lease  # {query: [job key, ...]}
+        self.parsed = []
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def fetch(self, source, url, previous=None, claim=None):
+        query = next(q for q in self.pages if q.replace(" ", "+") in url)
+        keys = self.pages[query]
+        if self.lose_lease:
+            time.sleep(0.02)
+        owned = claim(keys)
+        jobs = [JobRecord(source.name, key, url=f"https://example.com/{key}") for key in keys if key in owned]
+        self.parsed.extend(job.key for job in jobs)
+        return FetchedPage("fp", len(keys), jobs)
+
+
+class Results(list):
+    put = list.append
+
+
+def run_worker(path, fetcher, monkeypatch, **queue_options):
+    monkeypatch.setattr(workers, "DOWNLOAD_DELAY", 0)
+    queue = WorkQueue(path, **queue_options)
+    queue.fill("run", [QuerySpec("indeed", q, "Remote") for q in fetcher.pages], pages=1)
+    results = Results()
+    asyncio.run(work("run", results, path, fetcher))
+    return queue, results
+
+
+def test_overlapping_pages_parse_each_card_once(tmp_path, monkeypatch):
+    fetcher = FakeFetcher({"python": ["k1", "k2", "k3"], "django": ["k2", "k3", "k4"]})
+    queue, results = run_worker(str(tmp_path / "queue.db"), fetcher, monkeypatch)
+    assert sorted(fetcher.parsed) == ["k1", "k2", "k3", "k4"]
+    assert sum(len(batch) for batch in results) == 4
+    assert queue.summary("run")["jobs"] == 6
+    assert queue.summary("run")["unique"] == 4
+    queue.close()
+
+
+def test_page_is_dropped_when_the_lease_expired_before_the_claim(tmp_path, monkeypatch):
+    init = WorkQueue.__init__
+    # the worker opens its own queue: give it a lease shorter than the fetch, and no retry
+    monkeypatch.setattr(WorkQueue, "__init__", lambda self, path: init(self, path, lease_seconds=0.01, max_attempts=1))
+    fetcher = FakeFetcher({"python": ["k1"]}, lose_lease=True)
+    queue, results = run_worker(str(tmp_path / "queue.db"), fetcher, monkeypatch)
+    assert results == []
+    assert fetcher.parsed == []
+    assert queue.summary("run")["done"] == 0
+    queue.close()
+
+
+class EndlessFetcher:
+    """Ten new jobs on every page, at once: fills the results queue faster than a stalled writer drains it."""
+
+    def __init__(self, headless=True):
+        pass
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def fetch(self, source, url, previous=None, claim=None):
+        keys = [f"{url}#{i}" for i in range(10)]
+        owned = claim(keys)
+        return FetchedPage(None, len(keys), [JobRecord(source.name, key, url=key) for key in keys if key in owned])
+
+
+class FailingSink:
+    def write(self, job):
+        raise RuntimeError("disk full")
+
+    def close(self):
+        pass
+
+
+def test_writer_error_stops_the_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOWNLOAD_DELAY", "0")  # read by the spawned workers
+    specs = [QuerySpec("indeed", f"q{i}", "Remote") for i in range(20)]
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="disk full"):
+        workers.run_sharded(specs, workers=2, pages=5, sinks=[FailingSink()], queue_path=str(tmp_path / "queue.db"),
+                            fetcher_cls=EndlessFetcher, db_path=str(tmp_path / "jobs.db"))
+    assert time.monotonic() - started < workers.WORKER_EXIT_TIMEOUT
+
+
+def test_card_ids_skip_dropped_cards():
+    source = get_source("indeed")
+    raws = [{"href": "/rc/clk?jk=aaa", "jk": "aaa"}, {"href": "/pagead/clk?x=1"}, {"href": None},
+            {"href": "/viewjob?jk=bbb", "jk": ""}]
+    assert card_ids(source, raws) == [(0, "aaa", "aaa"), (3, "bbb", "bbb")]